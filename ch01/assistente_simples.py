@@ -1,16 +1,17 @@
 # assistente_simples.py
-import os
 from dotenv import load_dotenv
 # from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from comum.modelos import obter_modelo
+
 load_dotenv()
 
 def criar_assistente():
     """Cria e retorna uma instância do modelo."""
-    return ChatGoogleGenerativeAI(
-        model=os.getenv("google_model", "gemini-2.5-flash-lite"),
+    return obter_modelo(
+        "gemini-2.5-flash-lite",
+        variavel="google_model",
         temperature=0.7,
         max_output_tokens=1024,
         max_retries=3,
@@ -0,0 +1,54 @@
+# memoria_traducao.py
+# Memória de tradução: segmentos já traduzidos, por correspondência exata, em SQLite
+import sqlite3
+import threading
+from typing import Iterable
+
+# Limite de parâmetros por consulta em versões antigas do SQLite
+LOTE_CONSULTA = 500
+
+
+class MemoriaTraducao:
+    """Cache persistente (texto de origem -> tradução) por par de idiomas."""
+
+    def __init__(self, caminho: str, par_idiomas: str = "pt-BR>en"):
+        self.par_idiomas = par_idiomas
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS traducoes (
+                par_idiomas TEXT NOT NULL,
+                origem TEXT NOT NULL,
+                traducao TEXT NOT NULL,
+                PRIMARY KEY (par_idiomas, origem)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def buscar(self, segmentos: Iterable[str]) -> dict[str, str]:
+        """Traduções conhecidas para os segmentos (os ausentes ficam de fora)."""
+        unicos = list(dict.fromkeys(segmentos))
+        encontradas: dict[str, str] = {}
+        with self._lock:
+            for inicio in range(0, len(unicos), LOTE_CONSULTA):
+                parte = unicos[inicio:inicio + LOTE_CONSULTA]
+                marcadores = ",".join("?" * len(parte))
+                cursor = self._conn.execute(
+                    f"SELECT origem, traducao FROM traducoes WHERE par_idiomas = ? AND origem IN ({marcadores})",
+                    [self.par_idiomas, *parte],
+                )
+                encontradas.update(cursor.fetchall())
+        return encontradas
+
+    def gravar(self, traducoes: dict[str, str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO traducoes (par_idiomas, origem, traducao) VALUES (?, ?, ?)",
+                [(self.par_idiomas, origem, traducao) for origem, traducao in traducoes.items()],
+            )
+            self._conn.commit()
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,38 +1,226 @@
+import argparse
 import os
+import re
+import sys
+import time
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from memoria_traducao import MemoriaTraducao
+
+from comum.modelos import obter_modelo
+
 # Carrega a API Key do arquivo .env
 load_dotenv()
 
-def main():
+INSTRUCAO = "Você é um tradutor profissional. Traduza o texto do usuário do Português Brasileiro para o Inglês. Responda apenas com a tradução"
+
+# No modo lote, cada pedido leva várias linhas numeradas e a resposta precisa
+# voltar com a mesma numeração para que cada tradução caia na linha certa
+INSTRUCAO_LOTE = INSTRUCAO + """.
+O texto vem em linhas numeradas no formato "N. texto". Traduza cada linha separadamente e responda
+com exatamente as mesmas linhas, na mesma ordem e com a mesma numeração, uma por linha, sem nada além disso."""
+
+LINHA_NUMERADA = re.compile(r"^\s*(\d+)[.)]\s?(.*)$")
+
+MEMORIA_PATH = os.getenv("TRADUCAO_DB_PATH", os.path.join(os.path.dirname(__file__), "memoria_traducao.db"))
+
+
+def criar_modelo():
     # Configuração do modelo (Temperature 0 para traduções mais precisas)
-    modelo = ChatGoogleGenerativeAI(
-        model=os.getenv("google_model", "gemini-2.5-flash-lite"),
-        temperature=0
+    return obter_modelo("gemini-2.5-flash-lite", temperature=0, variavel="google_model")
+
+
+# === MODO LOTE ===
+
+def agrupar(segmentos: list[str], max_caracteres: int, max_linhas: int) -> list[list[str]]:
+    """Divide os segmentos em blocos limitados em caracteres e em linhas."""
+    blocos, atual, tamanho = [], [], 0
+    for segmento in segmentos:
+        if atual and (tamanho + len(segmento) > max_caracteres or len(atual) >= max_linhas):
+            blocos.append(atual)
+            atual, tamanho = [], 0
+        atual.append(segmento)
+        tamanho += len(segmento)
+    if atual:
+        blocos.append(atual)
+    return blocos
+
+
+def mensagens_bloco(bloco: list[str]) -> list:
+    numeradas = "\n".join(f"{i}. {segmento}" for i, segmento in enumerate(bloco, 1))
+    return [SystemMessage(content=INSTRUCAO_LOTE), HumanMessage(content=numeradas)]
+
+
+def interpretar_resposta(texto: str, quantidade: int) -> list[str] | None:
+    """Traduções na ordem do bloco, ou None se a numeração não bater."""
+    traducoes: dict[int, str] = {}
+    for linha in texto.strip().splitlines():
+        correspondencia = LINHA_NUMERADA.match(linha)
+        if correspondencia:
+            traducoes[int(correspondencia.group(1))] = correspondencia.group(2).strip()
+    if sorted(traducoes) != list(range(1, quantidade + 1)):
+        return None
+    return [traducoes[i] for i in range(1, quantidade + 1)]
+
+
+def traduzir_segmentos(modelo, segmentos: list[str], concorrencia: int,
+                       max_caracteres: int, max_linhas: int) -> tuple[dict[str, str], dict[str, str]]:
+    """Traduz segmentos distintos em blocos enviados em paralelo com modelo.batch.
+
+    Devolve (traduções, falhas), com falhas = segmento -> erro dos que não
+    puderam ser traduzidos nem sozinhos.
+    """
+    blocos = agrupar(segmentos, max_caracteres, max_linhas)
+    respostas = modelo.batch(
+        [mensagens_bloco(bloco) for bloco in blocos],
+        config={"max_concurrency": concorrencia},
+        return_exceptions=True,
     )
 
+    traducoes: dict[str, str] = {}
+    falhas: dict[str, str] = {}
+    refazer: list[str] = []
+    for bloco, resposta in zip(blocos, respostas):
+        linhas = None if isinstance(resposta, Exception) else interpretar_resposta(resposta.content, len(bloco))
+        if linhas is None:
+            refazer.extend(bloco)
+        else:
+            traducoes.update(zip(bloco, linhas))
+
+    if refazer:
+        # Bloco com falha ou numeração trocada: cada linha vira um pedido próprio
+        respostas = modelo.batch(
+            [[SystemMessage(content=INSTRUCAO), HumanMessage(content=segmento)] for segmento in refazer],
+            config={"max_concurrency": concorrencia},
+            return_exceptions=True,
+        )
+        for segmento, resposta in zip(refazer, respostas):
+            if isinstance(resposta, Exception):
+                falhas[segmento] = f"{type(resposta).__name__}: {resposta}"
+            else:
+                traducoes[segmento] = resposta.content.strip()
+    return traducoes, falhas
+
+
+def traduzir_fluxo(entrada: Iterable[str], saida: TextIO, modelo, memoria: MemoriaTraducao,
+                   concorrencia: int = 4, max_caracteres: int = 2000, max_linhas: int = 40,
+                   linhas_por_leitura: int = 500) -> dict:
+    """Traduz `entrada` linha a linha para `saida`, preservando a ordem, as linhas vazias
+    e o recuo (espaços no início da linha), que não vai ao modelo.
+
+    A entrada é lida em fatias de `linhas_por_leitura` linhas, então arquivos
+    grandes não são carregados inteiros. Em cada fatia, segmentos já presentes
+    na memória de tradução (ou repetidos na própria fatia) não vão ao modelo.
+    Segmentos que falharam saem sem tradução (o texto original) e ficam em
+    estatisticas["falhas"], sem interromper o resto do arquivo.
+    """
+    estatisticas = {"segmentos": 0, "da_memoria": 0, "enviados": 0, "segundos": 0.0, "falhas": {}}
+    inicio = time.perf_counter()
+    linhas: Iterator[str] = iter(entrada)
+    while fatia := [linha.rstrip("\n") for linha in islice(linhas, linhas_por_leitura)]:
+        segmentos = [linha.strip() for linha in fatia if linha.strip()]
+        conhecidas = memoria.buscar(segmentos)
+        novos = [s for s in dict.fromkeys(segmentos) if s not in conhecidas]
+        if novos:
+            traduzidas, falhas = traduzir_segmentos(modelo, novos, concorrencia, max_caracteres, max_linhas)
+            memoria.gravar(traduzidas)
+            conhecidas.update(traduzidas)
+            estatisticas["falhas"].update(falhas)
+
+        for linha in fatia:
+            segmento = linha.strip()
+            recuo = linha[:len(linha) - len(linha.lstrip())]
+            saida.write(recuo + conhecidas.get(segmento, segmento) + "\n")
+        saida.flush()
+
+        estatisticas["segmentos"] += len(segmentos)
+        estatisticas["enviados"] += len(novos)
+        estatisticas["da_memoria"] += len(segmentos) - len(novos)
+
+    estatisticas["segundos"] = time.perf_counter() - inicio
+    return estatisticas
+
+
+def modo_lote(args: argparse.Namespace) -> None:
+    memoria = MemoriaTraducao(args.memoria)
+    entrada = sys.stdin if args.arquivo == "-" else open(args.arquivo, encoding="utf-8")
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    try:
+        estatisticas = traduzir_fluxo(
+            entrada, saida, criar_modelo(), memoria,
+            concorrencia=args.concorrencia, max_caracteres=args.max_caracteres, max_linhas=args.max_linhas,
+        )
+    finally:
+        for arquivo in (entrada, saida):
+            if arquivo not in (sys.stdin, sys.stdout):
+                arquivo.close()
+        memoria.fechar()
+
+    segmentos = estatisticas["segmentos"]
+    print(
+        f"{segmentos} segmento(s) em {estatisticas['segundos']:.1f}s "
+        f"({segmentos / max(estatisticas['segundos'], 1e-9):.1f} segmentos/s) | "
+        f"memória de tradução: {estatisticas['da_memoria'] / max(segmentos, 1):.0%} de acerto, "
+        f"{estatisticas['enviados']} enviado(s) ao modelo",
+        file=sys.stderr,
+    )
+    falhas = estatisticas["falhas"]
+    if falhas:
+        print(f"{len(falhas)} segmento(s) sem tradução (mantidos no original):", file=sys.stderr)
+        for segmento, erro in islice(falhas.items(), 10):
+            print(f"  {segmento[:60]!r}: {erro}", file=sys.stderr)
+        sys.exit(1)
+
+
+# === MODO INTERATIVO ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Tradutor PT-BR -> EN")
+    parser.add_argument("--lote", dest="arquivo", help="arquivo a traduzir ('-' para stdin)")
+    parser.add_argument("--saida", default="-", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--concorrencia", type=int, default=4, help="pedidos simultâneos ao modelo")
+    parser.add_argument("--max-caracteres", type=int, default=2000, help="caracteres por pedido")
+    parser.add_argument("--max-linhas", type=int, default=40, help="linhas por pedido")
+    parser.add_argument("--memoria", default=MEMORIA_PATH, help="banco SQLite da memória de tradução")
+    args = parser.parse_args()
+
+    if args.arquivo:
+        modo_lote(args)
+        return
+
+    modelo = criar_modelo()
+    memoria = MemoriaTraducao(args.memoria)
+
     print("=== Tradutor PT-BR -> EN ===")
     print("Digite 'sair' para encerrar.\n")
 
     while True:
         texto = input("Texto em Português: ").strip()
-        
+
         if texto.lower() == 'sair':
             break
-            
+
         if not texto:
             continue
 
-        # Estrutura de mensagens para tradução
-        mensagens = [
-            SystemMessage(content="Você é um tradutor profissional. Traduza o texto do usuário do Português Brasileiro para o Inglês. Responda apenas com a tradução"),
-            HumanMessage(content=texto)
-        ]
+        # Texto já traduzido antes: responde direto da memória
+        traducao = memoria.buscar([texto]).get(texto)
+        if traducao is None:
+            # Estrutura de mensagens para tradução
+            mensagens = [
+                SystemMessage(content=INSTRUCAO),
+                HumanMessage(content=texto)
+            ]
+
+            resposta = modelo.invoke(mensagens)
+            traducao = resposta.content
+            memoria.gravar({texto: traducao})
+        print(f"Inglês: {traducao}\n")
 
-        resposta = modelo.invoke(mensagens)
-        print(f"Inglês: {resposta.content}\n")
+    memoria.fechar()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
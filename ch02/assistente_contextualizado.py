@@ -1,55 +1,86 @@
 # assistente_contextualizado.py
 import os
-from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import HumanMessage
+
+from memoria import MemoriaJanela
+from montador_prompt import MontadorPrompt
+from registro_conversas import RegistroConversas
+
+from comum.modelos import obter_modelo
 
 load_dotenv()
 
 class AssistenteContextualizado:
-    def __init__(self, nome_usuario: str):
-        self.modelo = ChatGoogleGenerativeAI(
-            model=os.getenv("google_model", "gemini-2.5-flash"),
-            temperature=0.7
-        )
+    def __init__(
+        self,
+        nome_usuario: str,
+        memoria: Optional[MemoriaJanela] = None,
+        registro: Optional[RegistroConversas] = None,
+    ):
+        self.modelo = obter_modelo("gemini-2.5-flash", temperature=0.7, variavel="google_model")
         self.nome_usuario = nome_usuario
-        self.historico = []
-
-    def _get_system_prompt(self) -> str:
-        agora = datetime.now()
-        return f"""Você é um assistente pessoal chamado Jarvis.
-
-## Contexto
-- Usuário: {self.nome_usuario}
-- Data: {agora.strftime('%d/%m/%Y')}
-- Hora: {agora.strftime('%H:%M')}
+        # Persona e regras fixas primeiro (prefixo idêntico entre chamadas e
+        # entre usuários); usuário, data e hora no final, refeitos por minuto
+        self._montador = MontadorPrompt(
+            estatico="""Você é um assistente pessoal chamado Jarvis.
 
 ## Personalidade
 - Seja cordial e use o nome do usuário ocasionalmente
 - Responda em português brasileiro
 - Seja conciso, mas completo
-"""
+
+""",
+            dinamico="""## Contexto
+- Usuário: {nome_usuario}
+- Data: {data}
+- Hora: {hora}
+""",
+            nome_usuario=nome_usuario,
+        )
+        self.memoria = memoria if memoria is not None else MemoriaJanela()
+
+        # Uma conversa por usuário no registro; só o final é carregado. O
+        # prefixo separa os usuários das conversas de outros scripts que
+        # usem o mesmo arquivo (ex: "padrao" do chatbot_com_memoria.py)
+        self.registro = registro
+        self.conversa_id = f"usuario:{nome_usuario}"
+        if registro is not None:
+            self.memoria.carregar(registro.cauda(self.conversa_id, self.memoria.max_tokens, self.memoria.contador))
+
+    @property
+    def historico(self) -> list:
+        return self.memoria.mensagens()
+
+    def _get_system_prompt(self) -> str:
+        return self._montador.montar()
 
     def conversar(self, mensagem: str) -> str:
-        # System prompt atualizado a cada chamada (data/hora atual)
-        system = SystemMessage(content=self._get_system_prompt())
+        # System prompt com data/hora atual (reaproveitado dentro do mesmo minuto)
+        system = self._montador.mensagem()
+
+        # A nova mensagem entra na memória antes da chamada, para contar no limite
+        pergunta = HumanMessage(content=mensagem)
+        self.memoria.adicionar(pergunta)
 
-        # Montar mensagens: system + histórico + nova mensagem
-        mensagens = [system] + self.historico + [HumanMessage(content=mensagem)]
+        # Montar mensagens: system + histórico (já com a nova mensagem)
+        mensagens = [system] + self.memoria.mensagens()
 
         # Obter resposta
         resposta = self.modelo.invoke(mensagens)
 
         # Atualizar histórico (sem o system, que é recriado)
-        self.historico.append(HumanMessage(content=mensagem))
-        self.historico.append(resposta)
+        self.memoria.adicionar(resposta)
+        if self.registro is not None:
+            self.registro.anexar(self.conversa_id, [pergunta, resposta])
 
         return resposta.content
 
 def main():
     nome = input("Qual é o seu nome? ").strip() or "Usuário"
-    assistente = AssistenteContextualizado(nome_usuario=nome)
+    caminho = os.getenv("CONVERSAS_PATH", os.path.join(os.path.dirname(__file__), "conversas_assistente.jsonl"))
+    assistente = AssistenteContextualizado(nome_usuario=nome, registro=RegistroConversas(caminho))
 
     print(f"\nOlá, {nome}! Sou o Jarvis, seu assistente pessoal.")
     print("Digite 'sair' para encerrar.\n")
@@ -0,0 +1,78 @@
+# benchmark_memoria.py
+# Tamanho do prompt e latência estimada por turno, com histórico ilimitado
+# (comportamento anterior) x MemoriaJanela, rodando o AssistenteContextualizado
+# real com um modelo simulado no lugar do LLM.
+#
+# Latência estimada = LATENCIA_BASE + tokens_do_prompt * SEGUNDOS_POR_TOKEN
+# (custo de prefill aproximadamente linear no tamanho do prompt).
+# Uso: GOOGLE_API_KEY=... python benchmark_memoria.py [turnos]
+# (nenhuma chamada à API é feita; a chave só é exigida pelo construtor do modelo)
+import random
+import sys
+import time
+
+from langchain_core.messages import AIMessage
+
+from assistente_contextualizado import AssistenteContextualizado
+from memoria import MemoriaJanela, contar_tokens_aprox
+
+LATENCIA_BASE = 0.3
+SEGUNDOS_POR_TOKEN = 50e-6
+MARCOS = [10, 50, 100, 200, 500]
+
+
+class ModeloSimulado:
+    """Responde com um texto de tamanho aleatório e registra o tamanho de cada prompt."""
+
+    def __init__(self):
+        self.rng = random.Random(0)
+        self.prompts: list[int] = []
+
+    def invoke(self, mensagens):
+        self.prompts.append(sum(contar_tokens_aprox(m) for m in mensagens))
+        return AIMessage(content="resposta " * self.rng.randint(20, 120))
+
+
+class HistoricoIlimitado(MemoriaJanela):
+    """Lista que só cresce, como o `historico` original."""
+
+    def __init__(self):
+        super().__init__(max_tokens=10**12)
+
+
+def simular(memoria: MemoriaJanela, turnos: int) -> tuple[list[int], float]:
+    assistente = AssistenteContextualizado("Maria", memoria=memoria)
+    assistente.modelo = ModeloSimulado()
+    rng = random.Random(1)
+    inicio = time.perf_counter()
+    for i in range(turnos):
+        assistente.conversar(f"Pergunta {i}: " + "detalhe " * rng.randint(5, 40))
+    return assistente.modelo.prompts, time.perf_counter() - inicio
+
+
+def main():
+    turnos = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    cenarios = {
+        "ilimitado": HistoricoIlimitado(),
+        "janela 2000 tokens": MemoriaJanela(max_tokens=2000),
+        "janela 2000 + resumo": MemoriaJanela(
+            max_tokens=2000, resumir=lambda anterior, descartadas: (anterior + f" +{len(descartadas)} msgs")[-600:]
+        ),
+    }
+
+    print(f"=== Tokens do prompt / latência estimada por turno ({turnos} turnos) ===\n")
+    print(f"{'cenário':22s}" + "".join(f"{f'turno {m}':>20s}" for m in MARCOS if m <= turnos)
+          + f"{'total estimado':>16s} {'overhead':>9s}")
+    for nome, memoria in cenarios.items():
+        prompts, overhead = simular(memoria, turnos)
+        colunas = "".join(
+            f"{prompts[m - 1]:>10d} / {LATENCIA_BASE + prompts[m - 1] * SEGUNDOS_POR_TOKEN:5.2f}s"
+            for m in MARCOS if m <= turnos
+        )
+        total = sum(LATENCIA_BASE + p * SEGUNDOS_POR_TOKEN for p in prompts)
+        print(f"{nome:22s}{colunas}{total:15.1f}s {overhead * 1000 / turnos:7.3f}ms")
+        print(f"{'':22s}maior prompt: {max(prompts)} tokens, soma: {sum(prompts):,} tokens enviados")
+
+
+if __name__ == "__main__":
+    main()
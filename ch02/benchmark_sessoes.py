@@ -0,0 +1,83 @@
+# benchmark_sessoes.py
+# Memória e tempo de criação das sessões: um cliente do modelo por usuário
+# (Chatbot original) x GerenciadorSessoes com cliente compartilhado e LRU.
+# Uso: GOOGLE_API_KEY=... python benchmark_sessoes.py [usuarios]
+# (nenhuma chamada à API é feita; o modelo é trocado por um simulado)
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from langchain_core.messages import AIMessage
+
+from chatbot_com_memoria import Chatbot, criar_modelo
+from gerenciador_sessoes import GerenciadorSessoes
+from registro_conversas import RegistroConversas
+
+INSTRUCOES = "Você é um assistente amigável. Responda em português de forma concisa."
+
+
+class ModeloSimulado:
+    def __init__(self):
+        self.rng = random.Random(0)
+
+    def invoke(self, mensagens):
+        return AIMessage(content="resposta " * self.rng.randint(20, 120))
+
+
+def medir(descricao: str, funcao) -> None:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    quantidade = funcao()
+    duracao = time.perf_counter() - inicio
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{descricao:45s} {duracao:7.2f}s {memoria / 2**20:8.1f} MiB "
+          f"{memoria / quantidade / 1024:8.1f} KiB/sessão")
+
+
+def main():
+    usuarios = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"=== Criar {usuarios} sessões ===\n")
+    print(f"{'cenário':45s} {'tempo':>8s} {'memória':>12s} {'por sessão':>17s}")
+
+    def um_cliente_por_usuario():
+        sessoes = [Chatbot(INSTRUCOES, modelo=criar_modelo()) for _ in range(usuarios)]
+        return len(sessoes)
+
+    def cliente_compartilhado():
+        modelo = criar_modelo()
+        sessoes = [Chatbot(INSTRUCOES, modelo=modelo) for _ in range(usuarios)]
+        return len(sessoes)
+
+    medir("um ChatGoogleGenerativeAI por usuário", um_cliente_por_usuario)
+    medir("um ChatGoogleGenerativeAI compartilhado", cliente_compartilhado)
+
+    # Tráfego com 10x mais usuários que o limite de sessões em memória
+    total_usuarios, max_sessoes, mensagens = usuarios * 10, usuarios, usuarios * 50
+    print(f"\n=== {mensagens:,} mensagens de {total_usuarios:,} usuários, LRU de {max_sessoes} sessões ===\n")
+    with tempfile.TemporaryDirectory() as pasta:
+        registro = RegistroConversas(os.path.join(pasta, "conversas.jsonl"))
+        gerenciador = GerenciadorSessoes(INSTRUCOES, registro, modelo=ModeloSimulado(), max_sessoes=max_sessoes)
+        rng = random.Random(1)
+        inicio = time.perf_counter()
+        for i in range(mensagens):
+            # 70% das mensagens de 10% dos usuários; o resto espalhado por todos
+            ativos = total_usuarios // 10 if rng.random() < 0.7 else total_usuarios
+            usuario = f"u{rng.randrange(ativos)}"
+            gerenciador.conversar(usuario, f"mensagem {i}: " + "texto " * rng.randint(5, 40))
+        duracao = time.perf_counter() - inicio
+        relatorio = gerenciador.relatorio()
+        registro.fechar()
+
+    print(f"Tempo fora do modelo: {duracao / mensagens * 1000:.3f} ms/mensagem")
+    print(f"Sessões ativas: {relatorio['sessoes_ativas']}  |  despejos: {relatorio['despejos']}  |  "
+          f"recarregadas do disco: {relatorio['recarregamentos']}")
+    print(f"Memória estimada: {relatorio['bytes_total'] / 2**20:.1f} MiB no total, "
+          f"{relatorio['bytes_por_sessao'] / 1024:.1f} KiB por sessão ativa")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# chatbot_com_memoria.py
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from memoria import MemoriaJanela
+from registro_conversas import RegistroConversas
+
+from comum.modelos import obter_modelo
+
+load_dotenv()
+
+def criar_modelo():
+    # Instância em cache: todos os Chatbots do processo usam o mesmo cliente
+    return obter_modelo("gemini-2.5-flash-lite", temperature=0.7, variavel="google_model")
+
+class Chatbot:
+    def __init__(
+        self,
+        instrucoes: str,
+        memoria: Optional[MemoriaJanela] = None,
+        registro: Optional[RegistroConversas] = None,
+        conversa_id: str = "padrao",
+        modelo=None,
+    ):
+        # Um cliente pode ser compartilhado entre vários chatbots (ver gerenciador_sessoes.py)
+        self.modelo = modelo if modelo is not None else criar_modelo()
+        self.system = SystemMessage(content=instrucoes)
+        # Janela limitada por tokens: o prompt nunca passa de system + memoria.max_tokens
+        self.memoria = memoria if memoria is not None else MemoriaJanela()
+
+        # Com registro, a conversa sobrevive a reinícios: só o final que cabe na
+        # memória é lido do disco, e cada turno é acrescentado ao log
+        self.registro = registro
+        self.conversa_id = conversa_id
+        if registro is not None:
+            self.memoria.carregar(registro.cauda(conversa_id, self.memoria.max_tokens, self.memoria.contador))
+
+    @property
+    def historico(self) -> list:
+        return [self.system, *self.memoria.mensagens()]
+
+    def conversar(self, mensagem: str) -> str:
+        # Adicionar mensagem do usuário ao histórico
+        pergunta = HumanMessage(content=mensagem)
+        self.memoria.adicionar(pergunta)
+
+        # Obter resposta do modelo
+        resposta = self.modelo.invoke(self.historico)
+
+        # Adicionar resposta ao histórico
+        self.memoria.adicionar(resposta)
+        if self.registro is not None:
+            self.registro.anexar(self.conversa_id, [pergunta, resposta])
+
+        return resposta.content
+
+    def limpar_historico(self):
+        # Mantém apenas a SystemMessage
+        self.memoria.limpar()
+        if self.registro is not None:
+            self.registro.limpar(self.conversa_id)
+
+def main():
+    caminho = os.getenv("CONVERSAS_PATH", os.path.join(os.path.dirname(__file__), "conversas_chatbot.jsonl"))
+    bot = Chatbot(
+        instrucoes="Você é um assistente amigável. Responda em português de forma concisa.",
+        registro=RegistroConversas(caminho)
+    )
+
+    print("=== Chatbot com Memória ===")
+    print("Comandos: 'sair' para encerrar, 'limpar' para reiniciar conversa\n")
+
+    while True:
+        entrada = input("Você: ").strip()
+
+        if entrada.lower() == 'sair':
+            print("Até logo!")
+            break
+        elif entrada.lower() == 'limpar':
+            bot.limpar_historico()
+            print("Histórico limpo!\n")
+            continue
+        elif not entrada:
+            continue
+
+        resposta = bot.conversar(entrada)
+        print(f"Bot: {resposta}\n")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,12 +1,12 @@
 # conversa_estruturada.py
-import os
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
+from comum.modelos import obter_modelo
+
 load_dotenv()
 
-modelo = ChatGoogleGenerativeAI(model=os.getenv("google_model", "gemini-2.5-flash-lite"))
+modelo = obter_modelo("gemini-2.5-flash-lite", variavel="google_model")
 
 # Histórico da conversa
 historico = [
@@ -0,0 +1,181 @@
+# gerenciador_sessoes.py
+# Vários usuários atendidos por um único cliente do modelo, com as memórias
+# das sessões em um LRU limitado e o restante no registro em disco.
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from chatbot_com_memoria import Chatbot, criar_modelo
+from memoria import MemoriaJanela
+from registro_conversas import RegistroConversas
+
+# Custo aproximado de um objeto de mensagem do LangChain sem contar o texto
+# (medido com tracemalloc: ~800 bytes para HumanMessage, ~1.2 KB para AIMessage)
+BYTES_POR_MENSAGEM = 1000
+
+
+def bytes_sessao(chatbot: Chatbot) -> int:
+    """Estimativa da memória ocupada pelo histórico de uma sessão."""
+    return sum(sys.getsizeof(m.content) + BYTES_POR_MENSAGEM for m in chatbot.memoria.mensagens())
+
+
+class Sessao:
+    """Chatbot de um usuário e o lock que serializa os turnos dele."""
+    __slots__ = ("chatbot", "lock")
+
+    def __init__(self, chatbot: Chatbot):
+        self.chatbot = chatbot
+        self.lock = threading.Lock()
+
+
+class GerenciadorSessoes:
+    """Sessões de chat por usuário compartilhando um só ChatGoogleGenerativeAI.
+
+    O cliente (e o pool de conexões HTTP dele) é criado uma vez e passado a
+    todos os Chatbots. As sessões ficam em um OrderedDict usado como LRU,
+    limitado por `max_sessoes` e por `max_bytes` (estimados por bytes_sessao).
+
+    Cada turno já é gravado no RegistroConversas quando acontece, então
+    despejar uma sessão só a tira da RAM; na próxima mensagem do usuário ela
+    é recriada com a cauda da conversa lida do disco.
+
+    Mensagens do mesmo usuário são atendidas uma por vez (lock da Sessao);
+    usuários diferentes seguem em paralelo. Uma sessão com turno em
+    andamento não é despejada, para que a próxima mensagem espere por ela
+    em vez de recriá-la do disco.
+    """
+
+    def __init__(
+        self,
+        instrucoes: str,
+        registro: RegistroConversas,
+        modelo=None,
+        max_sessoes: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        criar_memoria: Callable[[], MemoriaJanela] = MemoriaJanela,
+    ):
+        self.instrucoes = instrucoes
+        self.registro = registro
+        self.modelo = modelo if modelo is not None else criar_modelo()
+        self.max_sessoes = max_sessoes
+        self.max_bytes = max_bytes
+        self.criar_memoria = criar_memoria
+
+        self._lock = threading.Lock()
+        self._sessoes: OrderedDict[str, Sessao] = OrderedDict()
+        self._bytes: dict[str, int] = {}
+        self._bytes_total = 0
+        self.despejos = 0
+        self.recarregamentos = 0
+
+    def sessao(self, usuario_id: str) -> Chatbot:
+        """Chatbot do usuário, recarregado do registro se não estiver em memória."""
+        return self._obter(usuario_id).chatbot
+
+    def _obter(self, usuario_id: str) -> Sessao:
+        with self._lock:
+            sessao = self._sessoes.get(usuario_id)
+            if sessao is not None:
+                self._sessoes.move_to_end(usuario_id)
+                return sessao
+
+        chatbot = Chatbot(
+            self.instrucoes,
+            memoria=self.criar_memoria(),
+            registro=self.registro,
+            conversa_id=f"sessao:{usuario_id}",
+            modelo=self.modelo,
+        )
+        with self._lock:
+            existente = self._sessoes.get(usuario_id)
+            if existente is not None:  # outra thread recarregou primeiro
+                return existente
+            if len(chatbot.memoria):
+                self.recarregamentos += 1
+            sessao = self._sessoes[usuario_id] = Sessao(chatbot)
+            self._atualizar_bytes(usuario_id, chatbot)
+            self._despejar(manter=usuario_id)
+        return sessao
+
+    def conversar(self, usuario_id: str, mensagem: str) -> str:
+        while True:
+            sessao = self._obter(usuario_id)
+            with sessao.lock:
+                with self._lock:
+                    atual = self._sessoes.get(usuario_id) is sessao
+                if not atual:
+                    continue  # despejada antes de o turno começar: recarrega
+                resposta = sessao.chatbot.conversar(mensagem)
+                with self._lock:
+                    if self._sessoes.get(usuario_id) is sessao:
+                        self._atualizar_bytes(usuario_id, sessao.chatbot)
+                        self._despejar(manter=usuario_id)
+                return resposta
+
+    def encerrar(self, usuario_id: str) -> None:
+        """Tira a sessão da memória (a conversa continua no registro)."""
+        with self._lock:
+            if self._sessoes.pop(usuario_id, None) is not None:
+                self._bytes_total -= self._bytes.pop(usuario_id)
+
+    def _atualizar_bytes(self, usuario_id: str, chatbot: Chatbot) -> None:
+        novo = bytes_sessao(chatbot)
+        self._bytes_total += novo - self._bytes.get(usuario_id, 0)
+        self._bytes[usuario_id] = novo
+
+    def _despejar(self, manter: Optional[str] = None) -> None:
+        """Remove as sessões menos usadas até respeitar os dois limites."""
+        sessoes, total = len(self._sessoes), self._bytes_total
+        despejar = []
+        for usuario_id, sessao in self._sessoes.items():
+            if sessoes <= self.max_sessoes and total <= self.max_bytes:
+                break
+            # A sessão em uso e as com turno em andamento ficam, mesmo passando do limite
+            if usuario_id == manter or sessao.lock.locked():
+                continue
+            despejar.append(usuario_id)
+            sessoes -= 1
+            total -= self._bytes[usuario_id]
+        for usuario_id in despejar:
+            del self._sessoes[usuario_id]
+            self._bytes_total -= self._bytes.pop(usuario_id)
+        self.despejos += len(despejar)
+
+    def relatorio(self) -> dict:
+        with self._lock:
+            ativas = len(self._sessoes)
+            return {
+                "sessoes_ativas": ativas,
+                "bytes_total": self._bytes_total,
+                "bytes_por_sessao": self._bytes_total / ativas if ativas else 0.0,
+                "despejos": self.despejos,
+                "recarregamentos": self.recarregamentos,
+            }
+
+
+def main():
+    caminho = os.getenv("CONVERSAS_PATH", os.path.join(os.path.dirname(__file__), "conversas_sessoes.jsonl"))
+    gerenciador = GerenciadorSessoes(
+        instrucoes="Você é um assistente amigável. Responda em português de forma concisa.",
+        registro=RegistroConversas(caminho),
+    )
+
+    print("=== Chatbot multiusuário ===")
+    print("Formato: <usuario>: <mensagem>  |  'relatorio' mostra a memória  |  'sair' encerra\n")
+    while True:
+        entrada = input("> ").strip()
+        if entrada.lower() == "sair":
+            break
+        if entrada.lower() == "relatorio":
+            print(gerenciador.relatorio(), "\n")
+            continue
+        usuario, _, mensagem = entrada.partition(":")
+        if not mensagem.strip():
+            continue
+        print(f"Bot ({usuario.strip()}): {gerenciador.conversar(usuario.strip(), mensagem.strip())}\n")
+
+
+if __name__ == "__main__":
+    main()
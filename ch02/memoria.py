@@ -0,0 +1,172 @@
+# memoria.py
+# Memória de conversa com limite de tokens: janela deslizante sobre os turnos
+# mais recentes e, opcionalmente, um resumo dos turnos que saíram da janela.
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+# Custo fixo por mensagem (papel, separadores) somado ao texto
+TOKENS_POR_MENSAGEM = 4
+PREFIXO_RESUMO = "Resumo da conversa anterior:\n"
+
+
+def contar_tokens_aprox(mensagem: BaseMessage) -> int:
+    """Estimativa sem chamada à API: ~4 caracteres por token."""
+    texto = mensagem.content if isinstance(mensagem.content, str) else str(mensagem.content)
+    return TOKENS_POR_MENSAGEM + (len(texto) + 3) // 4
+
+
+def resumidor_llm(modelo, max_palavras: int = 120) -> Callable[[str, list[BaseMessage]], str]:
+    """Resumidor que usa o próprio modelo para condensar os turnos descartados."""
+
+    def resumir(resumo_atual: str, descartadas: list[BaseMessage]) -> str:
+        conversa = "\n".join(
+            f"{'Usuário' if isinstance(m, HumanMessage) else 'Assistente'}: {m.content}"
+            for m in descartadas
+        )
+        pedido = f"""Atualize o resumo da conversa com os novos trechos, em até {max_palavras} palavras.
+Preserve nomes, números, decisões e preferências do usuário.
+
+Resumo atual:
+{resumo_atual or '(vazio)'}
+
+Novos trechos:
+{conversa}"""
+        return modelo.invoke([HumanMessage(content=pedido)]).content
+
+    return resumir
+
+
+class MemoriaJanela:
+    """Histórico limitado a `max_tokens` (estimados por `contador`).
+
+    Quando o limite estoura, os turnos mais antigos saem da janela até ela
+    voltar a `fracao_apos_corte` do limite. Cortar com folga faz o resumo
+    (se houver `resumir`) ser chamado a cada vários turnos, não a cada turno.
+
+    Os cortes são sempre em turnos inteiros: a janela começa em uma
+    HumanMessage e uma ToolMessage nunca fica sem a AIMessage que a chamou.
+    O turno atual (da última HumanMessage em diante) nunca sai da janela.
+
+    Garantia: `tokens` de `mensagens()` nunca passa de `max_tokens`. O resumo
+    é cortado em `max_tokens_resumo` e, se o turno atual sozinho não cabe, o
+    texto das maiores mensagens dele é truncado, mantendo o final.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 2000,
+        resumir: Optional[Callable[[str, list[BaseMessage]], str]] = None,
+        contador: Callable[[BaseMessage], int] = contar_tokens_aprox,
+        max_tokens_resumo: int = 300,
+        fracao_apos_corte: float = 0.75,
+    ):
+        if max_tokens <= max_tokens_resumo + TOKENS_POR_MENSAGEM:
+            raise ValueError("max_tokens precisa ser maior que max_tokens_resumo")
+        self.max_tokens = max_tokens
+        self.resumir = resumir
+        self.contador = contador
+        self.max_tokens_resumo = max_tokens_resumo
+        self.fracao_apos_corte = fracao_apos_corte
+
+        self._janela: deque[tuple[BaseMessage, int]] = deque()
+        self._tokens_janela = 0
+        self._resumo: Optional[SystemMessage] = None
+        self._tokens_resumo = 0
+        self.turnos_descartados = 0
+
+    # === LEITURA ===
+
+    def mensagens(self) -> list[BaseMessage]:
+        """Resumo (se houver) seguido das mensagens da janela, em ordem."""
+        janela = [mensagem for mensagem, _ in self._janela]
+        return [self._resumo, *janela] if self._resumo else janela
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens_janela + self._tokens_resumo
+
+    def __len__(self) -> int:
+        return len(self._janela)
+
+    # === ESCRITA ===
+
+    def adicionar(self, mensagem: BaseMessage) -> None:
+        custo = self.contador(mensagem)
+        self._janela.append((mensagem, custo))
+        self._tokens_janela += custo
+        if self.tokens > self.max_tokens:
+            self._cortar()
+
+    def carregar(self, mensagens: Iterable[BaseMessage]) -> None:
+        """Repõe um histórico salvo, aplicando o mesmo limite."""
+        for mensagem in mensagens:
+            self.adicionar(mensagem)
+
+    def limpar(self) -> None:
+        self._janela.clear()
+        self._tokens_janela = 0
+        self._resumo = None
+        self._tokens_resumo = 0
+
+    def _cortar(self) -> None:
+        alvo = int(self.max_tokens * self.fracao_apos_corte)
+        if self.resumir:
+            # Reserva o espaço do resumo para que ele nunca empurre a memória acima do limite
+            alvo = max(alvo - self.max_tokens_resumo, 0)
+
+        # Início do turno atual: a última HumanMessage (0 se não houver)
+        removiveis = max(
+            (i for i, (mensagem, _) in enumerate(self._janela) if isinstance(mensagem, HumanMessage)),
+            default=0,
+        )
+        descartadas = []
+        # Descarta turnos inteiros, do mais antigo até o início de um turno
+        while len(descartadas) < removiveis and self._tokens_janela > alvo:
+            descartadas.append(self._remover_mais_antiga())
+            while not isinstance(self._janela[0][0], HumanMessage):
+                descartadas.append(self._remover_mais_antiga())
+        if descartadas:
+            self.turnos_descartados += sum(isinstance(m, HumanMessage) for m in descartadas)
+            if self.resumir:
+                self._atualizar_resumo(descartadas)
+
+        # O turno atual sozinho ainda não cabe: trunca o texto da maior
+        # mensagem dele (mantendo o final) até caber, sem remover nenhuma
+        while self.tokens > self.max_tokens:
+            posicao = max(range(len(self._janela)), key=lambda i: self._janela[i][1])
+            mensagem, custo = self._janela[posicao]
+            espaco = max(custo - (self.tokens - self.max_tokens), 0)
+            truncada = self._truncar(mensagem, espaco, manter_final=True)
+            novo_custo = self.contador(truncada)
+            if novo_custo >= custo:
+                break
+            self._janela[posicao] = (truncada, novo_custo)
+            self._tokens_janela += novo_custo - custo
+
+    def _remover_mais_antiga(self) -> BaseMessage:
+        mensagem, custo = self._janela.popleft()
+        self._tokens_janela -= custo
+        return mensagem
+
+    def _truncar(self, mensagem: BaseMessage, espaco: int, manter_final: bool) -> BaseMessage:
+        """Corta o texto (em passos de ~10%) até a mensagem caber em `espaco` tokens."""
+        texto = mensagem.content if isinstance(mensagem.content, str) else str(mensagem.content)
+        tamanho = len(texto)
+        while True:
+            tamanho = min(tamanho, max(espaco - TOKENS_POR_MENSAGEM, 0) * 4)
+            trecho = texto[len(texto) - tamanho:] if manter_final else texto[:tamanho]
+            conteudo = "[...]" + trecho if manter_final else trecho + " [...]"
+            truncada = mensagem.model_copy(update={"content": conteudo})
+            if self.contador(truncada) <= espaco or tamanho == 0:
+                return truncada
+            tamanho = int(tamanho * 0.9)
+
+    def _atualizar_resumo(self, descartadas: list[BaseMessage]) -> None:
+        anterior = self._resumo.content.removeprefix(PREFIXO_RESUMO) if self._resumo else ""
+        resumo = SystemMessage(content=PREFIXO_RESUMO + self.resumir(anterior, descartadas))
+        if self.contador(resumo) > self.max_tokens_resumo:
+            resumo = self._truncar(resumo, self.max_tokens_resumo, manter_final=False)
+        self._resumo = resumo
+        self._tokens_resumo = self.contador(resumo)
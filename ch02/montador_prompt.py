@@ -0,0 +1,72 @@
+# montador_prompt.py
+# Montagem de system prompts: a parte estática é compilada uma única vez e a
+# parte dinâmica (data/hora) só é refeita quando muda na granularidade exibida.
+from datetime import datetime
+from typing import Callable, Optional
+
+from langchain_core.messages import SystemMessage
+
+# Índice = datetime.weekday() (segunda = 0); não depende do locale do strftime('%A')
+DIAS_SEMANA = (
+    "segunda-feira", "terça-feira", "quarta-feira", "quinta-feira",
+    "sexta-feira", "sábado", "domingo",
+)
+
+
+def por_minuto(agora: datetime) -> tuple:
+    return (agora.year, agora.month, agora.day, agora.hour, agora.minute)
+
+
+def por_dia(agora: datetime) -> tuple:
+    return (agora.year, agora.month, agora.day)
+
+
+def campos_tempo(agora: datetime) -> dict[str, str]:
+    """Valores de data/hora disponíveis no template dinâmico."""
+    return {
+        "data": f"{agora.day:02d}/{agora.month:02d}/{agora.year}",
+        "hora": f"{agora.hour:02d}:{agora.minute:02d}",
+        "dia_semana": DIAS_SEMANA[agora.weekday()],
+    }
+
+
+class MontadorPrompt:
+    """System prompt = prefixo estático + seção dinâmica, nesta ordem.
+
+    O prefixo vem primeiro e é byte a byte igual entre chamadas, o que
+    aproveita o cache de prefixo dos provedores. A seção dinâmica é um
+    template str.format com os campos de campos_tempo() mais os `fixos`
+    (ex: nome do usuário), re-renderizada só quando `granularidade(agora)`
+    muda (por padrão, uma vez por minuto).
+    """
+
+    def __init__(
+        self,
+        estatico: str,
+        dinamico: str = "",
+        granularidade: Callable[[datetime], tuple] = por_minuto,
+        relogio: Callable[[], datetime] = datetime.now,
+        **fixos: str,
+    ):
+        self.estatico = estatico
+        self.dinamico = dinamico
+        self.granularidade = granularidade
+        self.relogio = relogio
+        self.fixos = fixos
+        self._chave: Optional[tuple] = None
+        self._mensagem: Optional[SystemMessage] = None
+        self.renderizacoes = 0
+
+    def mensagem(self) -> SystemMessage:
+        """SystemMessage atual; o mesmo objeto enquanto a granularidade não mudar."""
+        agora = self.relogio()
+        chave = self.granularidade(agora)
+        if chave != self._chave:
+            texto = self.estatico + self.dinamico.format(**campos_tempo(agora), **self.fixos)
+            self._mensagem = SystemMessage(content=texto)
+            self._chave = chave
+            self.renderizacoes += 1
+        return self._mensagem
+
+    def montar(self) -> str:
+        return self.mensagem().content
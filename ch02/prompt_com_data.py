@@ -1,49 +1,40 @@
 # prompt_com_data.py
-import os
-from datetime import datetime
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 # from langchain_openai import ChatOpenAI
 
-load_dotenv()
-
-def get_system_prompt() -> str:
-    """
-    Gera o system prompt com data/hora atual.
-    IMPORTANTE: Chamar a cada invocação para garantir data atualizada.
-    """
-    agora = datetime.now()
-
-    # Tradução dos dias da semana
-    dias_semana = {
-        'Monday': 'segunda-feira',
-        'Tuesday': 'terça-feira',
-        'Wednesday': 'quarta-feira',
-        'Thursday': 'quinta-feira',
-        'Friday': 'sexta-feira',
-        'Saturday': 'sábado',
-        'Sunday': 'domingo'
-    }
+from montador_prompt import MontadorPrompt
 
-    dia_semana = dias_semana.get(agora.strftime('%A'), agora.strftime('%A'))
-    data_formatada = agora.strftime('%d/%m/%Y')
-    hora_formatada = agora.strftime('%H:%M')
+from comum.modelos import obter_modelo
 
-    return f"""Você é um assistente pessoal inteligente.
+load_dotenv()
 
-## Informações Temporais
-- Data atual: {data_formatada} ({dia_semana})
-- Hora atual: {hora_formatada}
+# Instruções fixas primeiro; data/hora no final, refeitas no máximo uma vez por minuto
+MONTADOR = MontadorPrompt(
+    estatico="""Você é um assistente pessoal inteligente.
 
 ## Instruções
 - Responda sempre em português brasileiro
 - Use as informações temporais quando relevante
 - Seja cordial e prestativo
-"""
+
+""",
+    dinamico="""## Informações Temporais
+- Data atual: {data} ({dia_semana})
+- Hora atual: {hora}
+""",
+)
+
+def get_system_prompt() -> str:
+    """
+    Gera o system prompt com data/hora atual.
+    IMPORTANTE: Chamar a cada invocação para garantir data atualizada.
+    (O texto só é refeito quando o minuto muda; ver montador_prompt.py.)
+    """
+    return MONTADOR.montar()
 
 def main():
-    modelo = ChatGoogleGenerativeAI(model=os.getenv("google_model", "gemini-2.5-flash"))
+    modelo = obter_modelo("gemini-2.5-flash", variavel="google_model")
 
     mensagens = [
         SystemMessage(content=get_system_prompt()),
@@ -1,22 +1,31 @@
 # prompt_dinamico.py
-from datetime import datetime
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
-# Template com variáveis
+from montador_prompt import MontadorPrompt, por_dia
+
+# System prompt montado uma vez por dia: texto fixo primeiro, data no final
+montador = MontadorPrompt(
+    estatico="""Você é um assistente pessoal.
+Responda sempre de forma personalizada.
+""",
+    dinamico="""Nome do usuário: {nome_usuario}
+Data atual: {data}""",
+    granularidade=por_dia,
+    nome_usuario="Maria",
+)
+
+# Template com variáveis: só a parte humana é renderizada a cada pedido;
+# o system entra pronto pelo placeholder
 template = ChatPromptTemplate.from_messages([
-    ("system", """Você é um assistente pessoal.
-Data atual: {data_atual}
-Nome do usuário: {nome_usuario}
-Responda sempre de forma personalizada."""),
+    MessagesPlaceholder("system"),
     ("human", "{pergunta}")
 ])
 
 # Preencher as variáveis
 mensagens = template.invoke({
-    "data_atual": datetime.now().strftime("%d/%m/%Y"),
-    "nome_usuario": "Maria",
+    "system": [montador.mensagem()],
     "pergunta": "Que dia é hoje?"
 })
 
 print(mensagens)
-# Saída: lista de mensagens com as variáveis substituídas
\ No newline at end of file
+# Saída: lista de mensagens com as variáveis substituídas
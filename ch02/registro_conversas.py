@@ -0,0 +1,201 @@
+# registro_conversas.py
+# Conversas persistidas em um log JSONL só de acréscimo, com um índice de
+# offsets por conversa para carregar apenas o final de cada uma.
+import json
+import os
+import threading
+from array import array
+from typing import Callable, Iterable, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, message_to_dict, messages_from_dict
+
+from memoria import contar_tokens_aprox
+
+
+class RegistroConversas:
+    """Log de mensagens de várias conversas em um único arquivo JSONL.
+
+    Cada linha é {"conversa": id, "mensagem": {...}} ou, para `limpar`,
+    {"conversa": id, "limpar": true}. Nada é reescrito: mensagens novas são
+    acrescentadas ao fim e limpar só registra um marcador.
+
+    O índice (conversa -> offsets das linhas ativas) fica em memória, guardado
+    também em `<caminho>.idx` (uma linha "offset<TAB>tipo<TAB>conversa" por registro).
+    Ao abrir, o índice é lido do .idx e só o trecho do log posterior ao último
+    offset indexado é varrido, então reiniciar não relê o histórico inteiro.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.caminho_indice = caminho + ".idx"
+        self._lock = threading.Lock()
+        self._offsets: dict[str, array] = {}
+
+        fim_indexado = self._ler_indice()
+        self._indexar_log(fim_indexado)
+        self._log = open(self.caminho, "ab")
+        self._indice = open(self.caminho_indice, "a", encoding="utf-8")
+
+    # === ÍNDICE ===
+
+    def _ler_indice(self) -> int:
+        """Carrega o .idx e devolve o offset do log até onde ele já está indexado."""
+        if not os.path.exists(self.caminho):
+            if os.path.exists(self.caminho_indice):
+                os.remove(self.caminho_indice)
+            return 0
+        self._descartar_linha_incompleta()
+        if not os.path.exists(self.caminho_indice):
+            return 0
+
+        tamanho_log = os.path.getsize(self.caminho)
+        ultimo = -1
+        with open(self.caminho_indice, "rb+") as indice:
+            valido = 0
+            for linha in indice:
+                partes = linha.decode("utf-8", "replace").rstrip("\n").split("\t", 2)
+                if (not linha.endswith(b"\n") or len(partes) != 3
+                        or not partes[0].isdigit() or int(partes[0]) >= tamanho_log):
+                    break  # linha incompleta ou além do log (gravação interrompida)
+                offset, tipo, conversa = int(partes[0]), partes[1], partes[2]
+                if offset > ultimo:
+                    self._aplicar(conversa, offset, limpar=tipo == "l")
+                    ultimo = offset
+                valido += len(linha)
+            # O que vier depois é refeito a partir do log por _indexar_log
+            indice.truncate(valido)
+        if ultimo < 0:
+            return 0
+        with open(self.caminho, "rb") as log:
+            log.seek(ultimo)
+            log.readline()
+            return log.tell()
+
+    def _descartar_linha_incompleta(self) -> None:
+        """Remove um registro cortado no meio por uma gravação interrompida."""
+        with open(self.caminho, "rb+") as log:
+            tamanho = log.seek(0, os.SEEK_END)
+            if tamanho == 0:
+                return
+            log.seek(tamanho - 1)
+            if log.read(1) == b"\n":
+                return
+            inicio = max(tamanho - 65536, 0)
+            while True:
+                log.seek(inicio)
+                bloco = log.read(tamanho - inicio)
+                quebra = bloco.rfind(b"\n")
+                if quebra >= 0 or inicio == 0:
+                    log.truncate(inicio + quebra + 1)
+                    return
+                inicio = max(inicio - 65536, 0)
+
+    def _indexar_log(self, inicio: int) -> None:
+        """Indexa os registros do log a partir de `inicio` (que o .idx não cobre)."""
+        if not os.path.exists(self.caminho):
+            return
+        novos = []
+        with open(self.caminho, "rb") as log:
+            log.seek(inicio)
+            while linha := log.readline():
+                registro = json.loads(linha)
+                offset = log.tell() - len(linha)
+                limpar = registro.get("limpar", False)
+                self._aplicar(registro["conversa"], offset, limpar)
+                novos.append(self._linha_indice(registro["conversa"], offset, limpar))
+        if novos:
+            with open(self.caminho_indice, "a", encoding="utf-8") as indice:
+                indice.writelines(novos)
+
+    @staticmethod
+    def _linha_indice(conversa: str, offset: int, limpar: bool) -> str:
+        return f"{offset}\t{'l' if limpar else 'm'}\t{conversa}\n"
+
+    def _aplicar(self, conversa: str, offset: int, limpar: bool) -> None:
+        if limpar:
+            self._offsets[conversa] = array("q")
+        else:
+            self._offsets.setdefault(conversa, array("q")).append(offset)
+
+    def _gravar(self, conversa: str, registros: list[dict]) -> list[int]:
+        if "\n" in conversa or "\r" in conversa:
+            raise ValueError("o id da conversa não pode conter quebras de linha")
+        offsets = []
+        for registro in registros:
+            offsets.append(self._log.tell())
+            self._log.write(json.dumps(registro, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._log.flush()
+        self._indice.writelines(
+            self._linha_indice(conversa, offset, registro.get("limpar", False))
+            for offset, registro in zip(offsets, registros)
+        )
+        self._indice.flush()
+        return offsets
+
+    # === ESCRITA ===
+
+    def anexar(self, conversa: str, mensagens: Iterable[BaseMessage]) -> None:
+        """Acrescenta as mensagens ao fim da conversa (uma escrita por chamada)."""
+        registros = [{"conversa": conversa, "mensagem": message_to_dict(m)} for m in mensagens]
+        with self._lock:
+            for offset in self._gravar(conversa, registros):
+                self._aplicar(conversa, offset, limpar=False)
+
+    def limpar(self, conversa: str) -> None:
+        """Esquece a conversa para as próximas leituras (o log antigo não é apagado)."""
+        with self._lock:
+            self._gravar(conversa, [{"conversa": conversa, "limpar": True}])
+            self._aplicar(conversa, 0, limpar=True)
+
+    # === LEITURA ===
+
+    def _ler(self, offsets: Iterable[int]) -> Iterable[BaseMessage]:
+        with open(self.caminho, "rb") as log:
+            for offset in offsets:
+                log.seek(offset)
+                yield messages_from_dict([json.loads(log.readline())["mensagem"]])[0]
+
+    def cauda(
+        self,
+        conversa: str,
+        max_tokens: int,
+        contador: Callable[[BaseMessage], int] = contar_tokens_aprox,
+    ) -> list[BaseMessage]:
+        """Mensagens mais recentes que cabem em `max_tokens`, em ordem cronológica.
+
+        Lê o log de trás para frente só até completar o orçamento e começa
+        sempre em uma mensagem do usuário (turno inteiro).
+        """
+        with self._lock:
+            self._log.flush()
+            offsets = self._offsets.get(conversa, array("q"))[:]
+
+        cauda: list[BaseMessage] = []
+        total = 0
+        for mensagem in self._ler(reversed(offsets)):
+            total += contador(mensagem)
+            if total > max_tokens:
+                break
+            cauda.append(mensagem)
+        cauda.reverse()
+        while cauda and not isinstance(cauda[0], HumanMessage):
+            cauda.pop(0)
+        return cauda
+
+    def ultimas(self, conversa: str, quantidade: Optional[int] = None) -> list[BaseMessage]:
+        """As `quantidade` últimas mensagens (todas, se None)."""
+        with self._lock:
+            offsets = self._offsets.get(conversa, array("q"))
+            offsets = offsets[-quantidade:] if quantidade else offsets[:]
+        return list(self._ler(offsets))
+
+    def total_mensagens(self, conversa: str) -> int:
+        return len(self._offsets.get(conversa, ()))
+
+    def conversas(self) -> list[str]:
+        return [conversa for conversa, offsets in self._offsets.items() if offsets]
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._log.close()
+            self._indice.close()
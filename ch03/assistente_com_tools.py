@@ -1,10 +1,14 @@
 # /src/ch03/assistente_com_tools.py
-import os
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools import tool
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
 
+from avaliador import avaliar_expressao
+
+from comum.contabilidade import CONTABILIDADE
+from comum.modelos import obter_modelo
+from comum.registro_tools import tools_por_nome, vincular_tools
+
 load_dotenv()
 
 # === TOOLS ===
@@ -33,28 +37,35 @@ def dividir(a: float, b: float) -> str:
 
 # === ASSISTENTE ===
 
+# Um cliente por processo, compartilhado entre as instâncias do assistente
+MODELO = obter_modelo("gemini-2.5-flash-lite", temperature=0)
+
 class AssistenteCalculadora:
-    def __init__(self):
+    def __init__(self, usar_expressao: bool = True, sessao: str = "calculadora"):
+        # usar_expressao=False mantém só as tools binárias (para comparação)
+        # sessao identifica a conversa na contabilidade de tokens
+        self.sessao = sessao
         self.tools = [somar, subtrair, multiplicar, dividir]
-        self.tools_por_nome = {t.name: t for t in self.tools}
-
-        modelo = ChatGoogleGenerativeAI(
-            model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-            temperature=0
-        )
-        self.modelo = modelo.bind_tools(self.tools)
-
-        self.system = SystemMessage(content="""
+        if usar_expressao:
+            self.tools.append(avaliar_expressao)
+        self.tools_por_nome = tools_por_nome(self.tools)
+        # Instâncias com o mesmo conjunto de tools reaproveitam o mesmo vínculo
+        self.modelo = vincular_tools(MODELO, self.tools)
+
+        instrucao_expressao = """Para expressões com mais de uma operação, use avaliar_expressao com a expressão
+inteira em uma única chamada, em vez de encadear somar/subtrair/multiplicar/dividir.
+""" if usar_expressao else ""
+        self.system = SystemMessage(content=f"""
 Você é uma calculadora inteligente.
 Use as ferramentas disponíveis para fazer cálculos.
-Sempre mostre o resultado de forma clara.
+{instrucao_expressao}Sempre mostre o resultado de forma clara.
 """)
 
     def processar(self, pergunta: str) -> str:
         mensagens = [self.system, HumanMessage(content=pergunta)]
 
         while True:
-            resposta = self.modelo.invoke(mensagens)
+            resposta = self.modelo.invoke(mensagens, config=CONTABILIDADE.config(self.sessao, "calculadora"))
             mensagens.append(resposta)
 
             # Se não há tool_calls, retornar resposta final
@@ -80,13 +91,21 @@ def main():
     print("=== Calculadora Inteligente ===")
     print("Digite 'sair' para encerrar.\n")
 
-    while True:
-        entrada = input("Você: ").strip()
-        if entrada.lower() == 'sair':
-            break
-        if entrada:
-            resposta = calc.processar(entrada)
-            print(f"Calculadora: {resposta}\n")
+    # Contabilidade gravada em qualquer saída ('sair', EOF, Ctrl-C ou erro)
+    try:
+        while True:
+            try:
+                entrada = input("Você: ").strip()
+            except (KeyboardInterrupt, EOFError):
+                print()
+                break
+            if entrada.lower() == 'sair':
+                break
+            if entrada:
+                resposta = calc.processar(entrada)
+                print(f"Calculadora: {resposta}\n")
+    finally:
+        CONTABILIDADE.exportar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,14 @@
 # /src/ch03/assistente_com_tools.py
-import os
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools import tool
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
 
+from avaliador import avaliar_expressao
+from conversor import CONVERSOR, ErroConversao
+
+from comum.contabilidade import CONTABILIDADE
+from comum.modelos import obter_modelo
+
 load_dotenv()
 
 # === TOOLS ===
@@ -40,49 +44,54 @@ def converter_temperatura(valor: float, de: str, para: str) -> str:
         de: A escala de origem ('C', 'F' ou 'K').
         para: A escala de destino ('C', 'F' ou 'K').
     """
-    de = de.upper().strip()
-    para = para.upper().strip()
-    
-    # 1. Converter tudo para Celsius primeiro (como base)
-    if de == 'C':
-        temp_c = valor
-    elif de == 'F':
-        temp_c = (valor - 32) * 5 / 9
-    elif de == 'K':
-        temp_c = valor - 273.15
-    else:
-        return "Erro: Escala de origem desconhecida. Use C, F ou K."
-
-    # 2. Converter de Celsius para a escala de destino
-    if para == 'C':
-        return f"{temp_c:.2f} C"
-    elif para == 'F':
-        res = (temp_c * 9 / 5) + 32
-        return f"{res:.2f} F"
-    elif para == 'K':
-        res = temp_c + 273.15
-        return f"{res:.2f} K"
-    else:
-        return "Erro: Escala de destino desconhecida. Use C, F ou K."
+    # Mesma interface de antes; unidades e validação ficam com o conversor
+    try:
+        if CONVERSOR.unidade(de).dimensao != "temperatura":
+            return "Erro: Escala de origem desconhecida. Use C, F ou K."
+        res = CONVERSOR.converter([valor], de, para)[0]
+    except ErroConversao as e:
+        return f"Erro: {e}. Use C, F ou K."
+    return f"{res:.2f} {CONVERSOR.unidade(para).simbolo}"
+
+@tool
+def converter_unidades(valores: list[float], de: str, para: str) -> str:
+    """
+    Converte uma lista de valores de uma unidade para outra, de uma só vez.
+    Unidades: temperatura (C, F, K), comprimento (m, km, cm, mm, mi, ft, in),
+    massa (kg, g, mg, t, lb, oz) e moeda (BRL, USD, EUR, com cotações fixas).
+    Args:
+        valores: Os valores a converter (um ou vários).
+        de: A unidade de origem.
+        para: A unidade de destino (mesma grandeza da origem).
+    """
+    try:
+        resultados = CONVERSOR.converter(valores, de, para)
+    except ErroConversao as e:
+        return f"Erro: {e}"
+    simbolo = CONVERSOR.unidade(para).simbolo
+    return ", ".join(f"{v:.4g} {simbolo}" for v in resultados)
 
 # === ASSISTENTE ===
 
 class AssistenteCalculadora:
-    def __init__(self):
-        # A lista de tools permanece a mesma, pois a função apenas foi atualizada
-        self.tools = [somar, subtrair, multiplicar, dividir, converter_temperatura]
+    def __init__(self, sessao: str = "calculadora-conversor"):
+        # sessao identifica a conversa na contabilidade de tokens
+        self.sessao = sessao
+        self.tools = [somar, subtrair, multiplicar, dividir, avaliar_expressao,
+                      converter_temperatura, converter_unidades]
         self.tools_por_nome = {t.name: t for t in self.tools}
 
-        modelo = ChatGoogleGenerativeAI(
-            model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"),
-            temperature=0
-        )
+        modelo = obter_modelo("gemini-2.5-flash-lite", temperature=0)
         self.modelo = modelo.bind_tools(self.tools)
 
         self.system = SystemMessage(content="""
 Você é um assistente inteligente de cálculos e conversões.
-Use as ferramentas disponíveis para fazer contas matemáticas ou converter unidades (Celsius, Fahrenheit, Kelvin).
+Use as ferramentas disponíveis para fazer contas matemáticas ou converter unidades
+(temperatura, comprimento, massa e moeda).
+Para expressões com mais de uma operação, use avaliar_expressao com a expressão
+inteira em uma única chamada, em vez de encadear somar/subtrair/multiplicar/dividir.
 Para conversões, identifique a escala de origem e a de destino.
+Para converter vários valores, use converter_unidades com a lista inteira em uma única chamada.
 Sempre mostre o resultado de forma clara.
 """)
 
@@ -90,7 +99,7 @@ Sempre mostre o resultado de forma clara.
         mensagens = [self.system, HumanMessage(content=pergunta)]
 
         while True:
-            resposta = self.modelo.invoke(mensagens)
+            resposta = self.modelo.invoke(mensagens, config=CONTABILIDADE.config(self.sessao, "assistente"))
             mensagens.append(resposta)
 
             if not resposta.tool_calls:
@@ -117,20 +126,28 @@ Sempre mostre o resultado de forma clara.
 def main():
     calc = AssistenteCalculadora()
 
-    print("=== Calculadora e Conversor (C/F/K) ===")
-    print("Ex: 'Converta 300 Kelvin para Celsius' ou 'Quanto é 0 C em K?'")
+    print("=== Calculadora e Conversor de Unidades ===")
+    print("Ex: 'Converta 300 Kelvin para Celsius' ou 'Quanto é 5, 10 e 42 km em milhas?'")
     print("Digite 'sair' para encerrar.\n")
 
-    while True:
-        entrada = input("Você: ").strip()
-        if entrada.lower() == 'sair':
-            break
-        if entrada:
+    # Contabilidade gravada em qualquer saída ('sair', EOF, Ctrl-C ou erro)
+    try:
+        while True:
             try:
-                resposta = calc.processar(entrada)
-                print(f"Assistente: {resposta}\n")
-            except Exception as e:
-                print(f"Ocorreu um erro: {e}\n")
+                entrada = input("Você: ").strip()
+            except (KeyboardInterrupt, EOFError):
+                print()
+                break
+            if entrada.lower() == 'sair':
+                break
+            if entrada:
+                try:
+                    resposta = calc.processar(entrada)
+                    print(f"Assistente: {resposta}\n")
+                except Exception as e:
+                    print(f"Ocorreu um erro: {e}\n")
+    finally:
+        CONTABILIDADE.exportar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,246 @@
+# /src/ch03/avaliador.py
+# Avaliador seguro de expressões matemáticas (alternativa ao eval())
+import ast
+import math
+import operator
+import threading
+from functools import lru_cache
+from typing import Collection
+
+import numexpr
+import numpy as np
+from langchain_core.tools import tool
+
+MAX_TAMANHO_EXPRESSAO = 500
+MAX_EXPOENTE = 1000
+TAMANHO_CACHE_NUMEXPR = 256
+
+
+class ExpressaoInvalida(ValueError):
+    """Expressão com sintaxe inválida ou com elementos fora da lista permitida."""
+
+
+OPERADORES_BINARIOS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+OPERADORES_UNARIOS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+FUNCOES = {
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+    "raiz": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "floor": math.floor,
+    "ceil": math.ceil,
+}
+
+CONSTANTES = {
+    "pi": math.pi,
+    "e": math.e,
+}
+
+
+def normalizar(expressao: str) -> str:
+    """Aceita ^ como potência e os símbolos × e ÷."""
+    return expressao.strip().replace("^", "**").replace("×", "*").replace("÷", "/")
+
+
+def analisar(expressao: str, variaveis: Collection[str] = ()) -> ast.Expression:
+    """Converte a expressão em AST, recusando qualquer nó fora da lista permitida.
+
+    Args:
+        expressao: Texto da expressão.
+        variaveis: Nomes de variáveis aceitos além das funções e constantes.
+    """
+    expressao = normalizar(expressao)
+    if len(expressao) > MAX_TAMANHO_EXPRESSAO:
+        raise ExpressaoInvalida(f"expressão maior que {MAX_TAMANHO_EXPRESSAO} caracteres")
+    try:
+        arvore = ast.parse(expressao, mode="eval")
+    except SyntaxError as e:
+        raise ExpressaoInvalida(f"sintaxe inválida: {e.msg}") from None
+
+    for no in ast.walk(arvore):
+        if isinstance(no, (ast.Expression, ast.Load)):
+            continue
+        if isinstance(no, ast.Constant):
+            if not isinstance(no.value, (int, float)) or isinstance(no.value, bool):
+                raise ExpressaoInvalida(f"constante não permitida: {no.value!r}")
+        elif isinstance(no, ast.BinOp):
+            if type(no.op) not in OPERADORES_BINARIOS:
+                raise ExpressaoInvalida(f"operador não permitido: {type(no.op).__name__}")
+        elif isinstance(no, ast.UnaryOp):
+            if type(no.op) not in OPERADORES_UNARIOS:
+                raise ExpressaoInvalida(f"operador não permitido: {type(no.op).__name__}")
+        elif isinstance(no, ast.Call):
+            if not isinstance(no.func, ast.Name) or no.func.id not in FUNCOES or no.keywords:
+                raise ExpressaoInvalida("apenas chamadas simples às funções permitidas")
+        elif isinstance(no, ast.Name):
+            if no.id not in FUNCOES and no.id not in CONSTANTES and no.id not in variaveis:
+                raise ExpressaoInvalida(f"nome desconhecido: {no.id}")
+        elif not isinstance(no, tuple(OPERADORES_BINARIOS) + tuple(OPERADORES_UNARIOS)):
+            raise ExpressaoInvalida(f"elemento não permitido: {type(no).__name__}")
+    return arvore
+
+
+def _avaliar_no(no: ast.AST):
+    if isinstance(no, ast.Constant):
+        return no.value
+    if isinstance(no, ast.Name):
+        if no.id not in CONSTANTES:
+            raise ExpressaoInvalida(f"a função {no.id} precisa ser chamada com parênteses")
+        return CONSTANTES[no.id]
+    if isinstance(no, ast.UnaryOp):
+        return OPERADORES_UNARIOS[type(no.op)](_avaliar_no(no.operand))
+    if isinstance(no, ast.BinOp):
+        esquerda = _avaliar_no(no.left)
+        direita = _avaliar_no(no.right)
+        if isinstance(no.op, ast.Pow):
+            if abs(direita) > MAX_EXPOENTE:
+                raise ExpressaoInvalida(f"expoente maior que {MAX_EXPOENTE}")
+            # Em float, potências enormes estouram (OverflowError) em vez de
+            # gerar inteiros gigantes
+            esquerda = float(esquerda)
+        return OPERADORES_BINARIOS[type(no.op)](esquerda, direita)
+    if isinstance(no, ast.Call):
+        return FUNCOES[no.func.id](*(_avaliar_no(arg) for arg in no.args))
+    raise ExpressaoInvalida(f"elemento não permitido: {type(no).__name__}")
+
+
+def avaliar(expressao: str) -> float:
+    """Avalia uma expressão aritmética com segurança.
+
+    Suporta + - * / // % **, parênteses, as funções de FUNCOES e as constantes
+    pi e e. Levanta ExpressaoInvalida para qualquer outra coisa e
+    ZeroDivisionError/ValueError/OverflowError para erros matemáticos.
+    """
+    resultado = _avaliar_no(analisar(expressao).body)
+    if isinstance(resultado, complex):
+        raise ValueError("o resultado não é um número real")
+    return resultado
+
+
+def formatar(resultado: float) -> str:
+    """Formata o resultado sem o '.0' de valores inteiros."""
+    if isinstance(resultado, float) and resultado.is_integer() and abs(resultado) < 1e15:
+        return str(int(resultado))
+    return str(resultado)
+
+
+# Tool usada pelos assistentes de ch03 (assistente_com_tools.py e atvd1.py)
+@tool
+def avaliar_expressao(expressao: str) -> str:
+    """Calcula uma expressão matemática completa de uma só vez.
+
+    Suporta + - * / // % ** (ou ^), parênteses e as funções sqrt, abs, round,
+    min, max, exp, log, log10, sin, cos, tan, floor, ceil e as constantes pi e e.
+    Args:
+        expressao: A expressão, por exemplo "(3+4)*5/2" ou "sqrt(16) + 2^3".
+    """
+    try:
+        return formatar(avaliar(expressao))
+    except Exception as e:
+        return f"Erro ao avaliar '{expressao}': {e}"
+
+
+def profundidade(expressao: str) -> int:
+    """Número de níveis de operações da expressão.
+
+    Com tools binárias (somar, multiplicar...), cada nível exige pelo menos uma
+    rodada tool -> LLM, mesmo que o modelo peça as operações do mesmo nível
+    em paralelo.
+    """
+    def nivel(no: ast.AST) -> int:
+        filhos = [nivel(filho) for filho in ast.iter_child_nodes(no)
+                  if isinstance(filho, (ast.BinOp, ast.UnaryOp, ast.Call))]
+        proprio = 1 if isinstance(no, (ast.BinOp, ast.Call)) else 0
+        return proprio + max(filhos, default=0)
+
+    return nivel(analisar(expressao).body)
+
+
+# === NUMEXPR: EXPRESSÕES COMPILADAS E CACHEADAS ===
+# numexpr.evaluate analisa e compila a string a cada chamada. Aqui a expressão
+# é validada pela mesma lista permitida acima, normalizada (ast.unparse) e
+# compilada uma única vez em um numexpr.NumExpr guardado em um LRU limitado.
+
+# Funções que existem no numexpr com um único argumento
+FUNCOES_NUMEXPR = {"abs", "sqrt", "exp", "log", "log10", "sin", "cos", "tan", "floor", "ceil", "round"}
+SINONIMOS_NUMEXPR = {"raiz": "sqrt"}
+
+# O numexpr não é seguro para chamadas simultâneas do mesmo programa
+# (numexpr.evaluate usa um lock equivalente internamente)
+_lock_numexpr = threading.Lock()
+
+
+class _ParaNumexpr(ast.NodeTransformer):
+    """Troca constantes nomeadas pelo valor e inteiros por float (evita overflow de int64)."""
+
+    def visit_Name(self, no: ast.Name) -> ast.AST:
+        if no.id in CONSTANTES:
+            return ast.copy_location(ast.Constant(CONSTANTES[no.id]), no)
+        return no
+
+    def visit_Constant(self, no: ast.Constant) -> ast.AST:
+        return ast.copy_location(ast.Constant(float(no.value)), no)
+
+    def visit_Call(self, no: ast.Call) -> ast.AST:
+        nome = SINONIMOS_NUMEXPR.get(no.func.id, no.func.id)
+        if nome not in FUNCOES_NUMEXPR or len(no.args) != 1:
+            raise ExpressaoInvalida(f"função não suportada pelo numexpr: {no.func.id}")
+        no.func = ast.copy_location(ast.Name(nome, ast.Load()), no.func)
+        self.generic_visit(no)
+        return no
+
+
+def normalizar_numexpr(expressao: str, variaveis: tuple[str, ...] = ()) -> str:
+    """Valida a expressão e devolve sua forma canônica para o numexpr."""
+    arvore = _ParaNumexpr().visit(analisar(expressao, variaveis))
+    return ast.unparse(arvore)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_NUMEXPR)
+def _compilar_normalizada(normalizada: str, variaveis: tuple[str, ...]) -> numexpr.NumExpr:
+    return numexpr.NumExpr(normalizada, signature=[(nome, np.float64) for nome in variaveis])
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_NUMEXPR)
+def compilar(expressao: str, variaveis: tuple[str, ...] = ()) -> numexpr.NumExpr:
+    """Programa numexpr compilado para a expressão.
+
+    Dois níveis de cache: pelo texto original (evita até a validação) e pela
+    forma normalizada, para que "2*x+1" e "2 * x + 1" compartilhem o programa.
+    """
+    return _compilar_normalizada(normalizar_numexpr(expressao, variaveis), variaveis)
+
+
+def avaliar_numexpr(expressao: str, **variaveis):
+    """Avalia a expressão com numexpr, opcionalmente sobre arrays.
+
+    Sem variáveis retorna um float. Com variáveis (ex: avaliar_numexpr("a * 2 + b",
+    a=array, b=array)) retorna um np.ndarray calculado elemento a elemento.
+    """
+    nomes = tuple(sorted(variaveis))
+    programa = compilar(expressao, nomes)
+    argumentos = [np.asarray(variaveis[nome], dtype=np.float64) for nome in nomes]
+    with _lock_numexpr:
+        resultado = programa(*argumentos)
+    return resultado.item() if resultado.ndim == 0 else resultado
@@ -0,0 +1,62 @@
+# /src/ch03/benchmark_avaliador.py
+# Microbenchmark: numexpr.evaluate x avaliar_numexpr (programa compilado em cache)
+# Uso: python benchmark_avaliador.py
+import random
+import timeit
+
+import numexpr
+import numpy as np
+
+from avaliador import avaliar, avaliar_numexpr, compilar
+
+REPETICOES = 20_000
+TAMANHO_ARRAY = 1_000_000
+
+
+def expressoes_escalares(quantidade: int = 50) -> list[str]:
+    rng = random.Random(0)
+    return [
+        f"({rng.randint(1, 99)} + {rng.randint(1, 99)}) * {rng.randint(1, 9)} / {rng.randint(1, 9)}"
+        for _ in range(quantidade)
+    ]
+
+
+def cronometrar(descricao: str, funcao, repeticoes: int) -> float:
+    funcao()  # aquecimento (preenche os caches)
+    duracao = min(timeit.repeat(funcao, number=repeticoes, repeat=3)) / repeticoes
+    print(f"{descricao:45s} {duracao * 1e6:10.2f} µs/chamada")
+    return duracao
+
+
+def main():
+    print(f"=== Expressões escalares ({REPETICOES:,} chamadas, 50 expressões distintas) ===")
+    expressoes = expressoes_escalares()
+    ciclo = iter([])
+
+    def proxima():
+        nonlocal ciclo
+        try:
+            return next(ciclo)
+        except StopIteration:
+            ciclo = iter(expressoes)
+            return next(ciclo)
+
+    base = cronometrar("numexpr.evaluate", lambda: numexpr.evaluate(proxima()), REPETICOES)
+    cache = cronometrar("avaliar_numexpr (NumExpr em cache)", lambda: avaliar_numexpr(proxima()), REPETICOES)
+    cronometrar("avaliar (AST em Python puro)", lambda: avaliar(proxima()), REPETICOES)
+    print(f"-> ganho de avaliar_numexpr sobre numexpr.evaluate: {base / cache:.1f}x")
+
+    print(f"\n=== Mesma expressão sobre arrays de {TAMANHO_ARRAY:,} elementos ===")
+    a = np.random.rand(TAMANHO_ARRAY)
+    b = np.random.rand(TAMANHO_ARRAY)
+    expressao = "2*a + sqrt(b) * (a - b) / 3"
+    base = cronometrar("numexpr.evaluate", lambda: numexpr.evaluate(expressao, local_dict={"a": a, "b": b}), 50)
+    cache = cronometrar("avaliar_numexpr", lambda: avaliar_numexpr(expressao, a=a, b=b), 50)
+    cronometrar("NumPy puro", lambda: 2 * a + np.sqrt(b) * (a - b) / 3, 50)
+    print(f"-> ganho de avaliar_numexpr sobre numexpr.evaluate: {base / cache:.2f}x")
+
+    print(f"\nCache: {compilar.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# /src/ch03/benchmark_tool_tarefas.py
+# Compara os filtros de listar_tarefas: cópia + varredura da lista (versão
+# original) x consulta pelos índices de TabelaTarefas.
+# Uso: python benchmark_tool_tarefas.py [n_tarefas]
+import random
+import sys
+import time
+
+from tabela_tarefas import TabelaTarefas
+
+ESTADOS = ["pendente", "concluida", "arquivada"]
+CATEGORIAS = [f"Categoria {i}" for i in range(50)] + ["Estudos", "Pessoal", "Trabalho"]
+CONSULTAS = [
+    {"estado": "pendente"},
+    {"categoria": "trabalho"},
+    {"estado": "pendente", "categoria": "Trabalho"},
+    {"estado": "arquivada", "categoria": "categoria 7"},
+]
+REPETICOES = 20
+
+
+def gerar_tarefas(n: int) -> list[dict]:
+    rng = random.Random(0)
+    return [
+        {"id": i, "titulo": f"Tarefa {i}", "estado": rng.choice(ESTADOS), "categoria": rng.choice(CATEGORIAS)}
+        for i in range(1, n + 1)
+    ]
+
+
+def consultar_lista(tarefas_db: list[dict], estado=None, categoria=None) -> list[dict]:
+    """Filtro original de tool_tarefas.listar_tarefas."""
+    tarefas = tarefas_db.copy()
+    if estado:
+        tarefas = [t for t in tarefas if t["estado"] == estado]
+    if categoria:
+        tarefas = [t for t in tarefas if t["categoria"].lower() == categoria.lower()]
+    return tarefas
+
+
+def cronometrar(funcao) -> float:
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        funcao()
+    return (time.perf_counter() - inicio) / REPETICOES
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lista = gerar_tarefas(n)
+
+    inicio = time.perf_counter()
+    tabela = TabelaTarefas(lista)
+    print(f"=== {n:,} tarefas (indexação inicial: {time.perf_counter() - inicio:.2f}s) ===\n")
+
+    print(f"{'consulta':52s} {'resultado':>9s} {'lista':>10s} {'índices':>10s} {'ganho':>7s}")
+    for filtros in CONSULTAS:
+        esperado = consultar_lista(lista, **filtros)
+        obtido = tabela.consultar(**filtros)
+        assert sorted(t["id"] for t in esperado) == sorted(t["id"] for t in obtido)
+
+        antes = cronometrar(lambda: consultar_lista(lista, **filtros))
+        depois = cronometrar(lambda: tabela.consultar(**filtros))
+        print(f"{str(filtros):52s} {len(obtido):9d} {antes * 1000:8.2f}ms {depois * 1000:8.2f}ms {antes / depois:6.0f}x")
+
+    # Atualizações incrementais dos índices
+    rng = random.Random(1)
+    inicio = time.perf_counter()
+    for _ in range(10_000):
+        tabela.alterar_estado(rng.randint(1, n), rng.choice(ESTADOS))
+    for i in range(10_000):
+        tabela.inserir(f"Nova {i}", rng.choice(CATEGORIAS))
+    duracao = time.perf_counter() - inicio
+    print(f"\n10.000 mudanças de estado + 10.000 inserções: {duracao * 1000:.1f}ms "
+          f"({duracao / 20_000 * 1e6:.2f} µs/operação)")
+
+
+if __name__ == "__main__":
+    main()
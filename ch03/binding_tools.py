@@ -1,9 +1,12 @@
 # /src/ch03/binding_tools.py
-import os
 from dotenv import load_dotenv
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage
 
+from avaliador import avaliar_numexpr, formatar
+
+from comum.modelos import obter_modelo
+
 load_dotenv()
 
 # Definir tools
@@ -15,10 +18,10 @@ def calcular(expressao: str) -> str:
         expressao: Expressão matemática (ex: "2 + 2", "10 * 5")
     """
     try:
-        # ATENÇÃO: eval() é perigoso em produção!
-        # Use uma biblioteca segura como numexpr
-        resultado = eval(expressao)
-        return f"Resultado: {resultado}"
+        # Expressão validada contra uma lista permitida e compilada uma única
+        # vez com numexpr (ver avaliador.py), em vez de eval()
+        resultado = avaliar_numexpr(expressao)
+        return f"Resultado: {formatar(resultado)}"
     except Exception as e:
         return f"Erro no cálculo: {e}"
 
@@ -39,8 +42,7 @@ def obter_clima(cidade: str) -> str:
 
 if __name__ == "__main__":
     # Criar modelo COM tools bindadas
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    modelo = ChatGoogleGenerativeAI(model=os.getenv("GOOGLE_MODEL", "gpt-4o-mini"))
+    modelo = obter_modelo("gpt-4o-mini")
     modelo_com_tools = modelo.bind_tools([calcular, obter_clima])
 
     # Testar - o modelo decide qual tool usar
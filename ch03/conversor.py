@@ -0,0 +1,102 @@
+# /src/ch03/conversor.py
+# Conversão de unidades por tabela: cada unidade é uma transformação afim para
+# a unidade base da sua dimensão, e as transformações entre todos os pares são
+# calculadas uma única vez.
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+
+
+class ErroConversao(ValueError):
+    """Unidade desconhecida ou conversão entre dimensões diferentes."""
+
+
+@dataclass(frozen=True)
+class Unidade:
+    """valor_na_base = valor * escala + deslocamento"""
+    simbolo: str
+    dimensao: str
+    escala: float
+    deslocamento: float = 0.0
+    nomes: tuple[str, ...] = ()
+
+
+UNIDADES_PADRAO = [
+    # Temperatura (base: Celsius)
+    Unidade("C", "temperatura", 1.0, 0.0, ("celsius",)),
+    Unidade("F", "temperatura", 5 / 9, -32 * 5 / 9, ("fahrenheit",)),
+    Unidade("K", "temperatura", 1.0, -273.15, ("kelvin",)),
+    # Comprimento (base: metro)
+    Unidade("m", "comprimento", 1.0, 0.0, ("metro", "metros")),
+    Unidade("km", "comprimento", 1000.0, 0.0, ("quilometro", "quilometros")),
+    Unidade("cm", "comprimento", 0.01, 0.0, ("centimetro", "centimetros")),
+    Unidade("mm", "comprimento", 0.001, 0.0, ("milimetro", "milimetros")),
+    Unidade("mi", "comprimento", 1609.344, 0.0, ("milha", "milhas")),
+    Unidade("ft", "comprimento", 0.3048, 0.0, ("pe", "pes")),
+    Unidade("in", "comprimento", 0.0254, 0.0, ("polegada", "polegadas")),
+    # Massa (base: quilograma)
+    Unidade("kg", "massa", 1.0, 0.0, ("quilo", "quilos", "quilograma", "quilogramas")),
+    Unidade("g", "massa", 0.001, 0.0, ("grama", "gramas")),
+    Unidade("mg", "massa", 1e-6, 0.0, ("miligrama", "miligramas")),
+    Unidade("t", "massa", 1000.0, 0.0, ("tonelada", "toneladas")),
+    Unidade("lb", "massa", 0.45359237, 0.0, ("libra", "libras")),
+    Unidade("oz", "massa", 0.028349523125, 0.0, ("onca", "oncas")),
+    # Moeda (base: real). Cotações fixas de exemplo: atualize com registrar().
+    Unidade("BRL", "moeda", 1.0, 0.0, ("real", "reais")),
+    Unidade("USD", "moeda", 5.0, 0.0, ("dolar", "dolares")),
+    Unidade("EUR", "moeda", 5.5, 0.0, ("euro", "euros")),
+]
+
+
+class ConversorUnidades:
+    """Registro de unidades com as transformações (a, b) de todo par pré-calculadas.
+
+    Converter de `de` para `para` é sempre `a * valores + b`, uma única operação
+    vetorizada do NumPy, qualquer que seja o tamanho da lista.
+    """
+
+    def __init__(self, unidades: Iterable[Unidade] = UNIDADES_PADRAO):
+        self._unidades: dict[str, Unidade] = {}
+        self._apelidos: dict[str, str] = {}
+        self._transformacoes: dict[tuple[str, str], tuple[float, float]] = {}
+        for unidade in unidades:
+            self.registrar(unidade)
+
+    def registrar(self, unidade: Unidade) -> None:
+        """Adiciona (ou substitui) uma unidade e recalcula os pares da sua dimensão."""
+        self._unidades[unidade.simbolo] = unidade
+        for apelido in (unidade.simbolo, *unidade.nomes):
+            self._apelidos[apelido.lower()] = unidade.simbolo
+
+        mesma_dimensao = [u for u in self._unidades.values() if u.dimensao == unidade.dimensao]
+        for origem in mesma_dimensao:
+            for destino in mesma_dimensao:
+                a = origem.escala / destino.escala
+                b = (origem.deslocamento - destino.deslocamento) / destino.escala
+                self._transformacoes[(origem.simbolo, destino.simbolo)] = (a, b)
+
+    def unidade(self, nome: str) -> Unidade:
+        simbolo = self._apelidos.get(nome.strip().lower())
+        if simbolo is None:
+            raise ErroConversao(f"unidade desconhecida: '{nome}'")
+        return self._unidades[simbolo]
+
+    def transformacao(self, de: str, para: str) -> tuple[float, float]:
+        origem, destino = self.unidade(de), self.unidade(para)
+        if origem.dimensao != destino.dimensao:
+            raise ErroConversao(
+                f"não é possível converter {origem.dimensao} ({origem.simbolo}) "
+                f"em {destino.dimensao} ({destino.simbolo})"
+            )
+        return self._transformacoes[(origem.simbolo, destino.simbolo)]
+
+    def converter(self, valores: Sequence[float], de: str, para: str) -> np.ndarray:
+        a, b = self.transformacao(de, para)
+        return a * np.asarray(valores, dtype=np.float64) + b
+
+    def simbolos(self, dimensao: str) -> list[str]:
+        return [u.simbolo for u in self._unidades.values() if u.dimensao == dimensao]
+
+
+CONVERSOR = ConversorUnidades()
@@ -1,10 +1,13 @@
 # /src/ch03/executar_tools.py
-import os
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, ToolMessage, BaseMessage
-import numexpr
+
+from avaliador import avaliar_numexpr, formatar
+
+from comum.contabilidade import CONTABILIDADE
+from comum.modelos import obter_modelo
+from comum.registro_tools import REGISTRO
 
 load_dotenv()
 
@@ -12,8 +15,9 @@ load_dotenv()
 def calcular(expressao: str) -> str:
     """Calcula uma expressão matemática."""
     try:
-        resultado = numexpr.evaluate(expressao)
-        return str(resultado)
+        # Validada e compilada uma única vez (cache LRU em avaliador.py)
+        resultado = avaliar_numexpr(expressao)
+        return formatar(resultado)
     except Exception as e:
         return f"Erro: {e}"
 
@@ -25,18 +29,19 @@ def obter_clima(cidade: str) -> str:
 
 # Mapear tools por nome
 tools = [calcular, obter_clima]
-tools_por_nome = {t.name: t for t in tools}
+tools_por_nome = REGISTRO.por_nome(tools)
 
 # Modelo com tools
-modelo = ChatGoogleGenerativeAI(model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"))
-modelo_com_tools = modelo.bind_tools(tools)
+modelo = obter_modelo("gemini-2.5-flash-lite")
+modelo_com_tools = REGISTRO.vincular(modelo, tools)
 
 def processar_com_tools(mensagem: str) -> str:
     """Processa uma mensagem, executando tools se necessário."""
     mensagens: list[BaseMessage] = [HumanMessage(content=mensagem)]
+    config = CONTABILIDADE.config("executar_tools", "processar_com_tools")
 
     # Primeira chamada ao modelo
-    resposta = modelo_com_tools.invoke(mensagens)
+    resposta = modelo_com_tools.invoke(mensagens, config=config)
     mensagens.append(resposta)
 
     # Se houver tool_calls, executar
@@ -53,7 +58,7 @@ def processar_com_tools(mensagem: str) -> str:
             mensagens.append(ToolMessage(content=resultado, tool_call_id=tool_call_id))
 
         # Nova chamada ao modelo com os resultados
-        resposta = modelo_com_tools.invoke(mensagens)
+        resposta = modelo_com_tools.invoke(mensagens, config=config)
         mensagens.append(resposta)
     return resposta.text
 
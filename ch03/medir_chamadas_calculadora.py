@@ -0,0 +1,81 @@
+# /src/ch03/medir_chamadas_calculadora.py
+# Mede quantas chamadas ao LLM o AssistenteCalculadora faz por pergunta, com e
+# sem a tool avaliar_expressao.
+#
+# Uso:
+#   python medir_chamadas_calculadora.py            # usa a API (GOOGLE_API_KEY)
+#   python medir_chamadas_calculadora.py --offline  # mínimo teórico, sem API
+import os
+import sys
+
+from avaliador import profundidade
+
+PERGUNTAS = [
+    ("Quanto é (3+4)*5/2?", "(3+4)*5/2"),
+    ("Quanto é 12 * 7 - 5?", "12*7-5"),
+    ("Calcule (10 - 2) * (3 + 5)", "(10-2)*(3+5)"),
+    ("Quanto dá 100 / (4 * (2 + 3))?", "100/(4*(2+3))"),
+    ("Some 15, 27, 38 e 49 e divida por 4", "(15+27+38+49)/4"),
+    ("Quanto é 2 * 3 * 4 * 5 * 6?", "2*3*4*5*6"),
+    ("Qual o valor de ((1+2)*(3+4) - 5) / 2?", "((1+2)*(3+4)-5)/2"),
+    ("Quanto é 8 + 9?", "8+9"),
+]
+
+
+class ContadorChamadas:
+    """Envolve o modelo com tools e conta as chamadas a invoke."""
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+        self.chamadas = 0
+
+    def invoke(self, mensagens):
+        self.chamadas += 1
+        return self.modelo.invoke(mensagens)
+
+
+def medir_offline():
+    """Mínimo de chamadas: cada nível de operações binárias custa uma rodada
+    tool -> LLM (supondo que o modelo peça em paralelo as operações do mesmo
+    nível), mais a resposta final. Com avaliar_expressao são sempre 2."""
+    print(f"{'pergunta':45s} {'binárias':>9s} {'expressão':>10s}")
+    total_binarias = total_expressao = 0
+    for pergunta, expressao in PERGUNTAS:
+        binarias = profundidade(expressao) + 1
+        total_binarias += binarias
+        total_expressao += 2
+        print(f"{pergunta:45s} {binarias:9d} {2:10d}")
+    return total_binarias, total_expressao
+
+
+def medir_api():
+    from assistente_com_tools import AssistenteCalculadora
+
+    print(f"{'pergunta':45s} {'binárias':>9s} {'expressão':>10s}")
+    total_binarias = total_expressao = 0
+    for pergunta, _ in PERGUNTAS:
+        chamadas = []
+        for usar_expressao in (False, True):
+            calc = AssistenteCalculadora(usar_expressao=usar_expressao)
+            calc.modelo = ContadorChamadas(calc.modelo)
+            calc.processar(pergunta)
+            chamadas.append(calc.modelo.chamadas)
+        total_binarias += chamadas[0]
+        total_expressao += chamadas[1]
+        print(f"{pergunta:45s} {chamadas[0]:9d} {chamadas[1]:10d}")
+    return total_binarias, total_expressao
+
+
+def main():
+    offline = "--offline" in sys.argv or not os.getenv("GOOGLE_API_KEY")
+    print(f"=== Chamadas ao LLM por pergunta ({'mínimo teórico' if offline else 'API'}) ===\n")
+    total_binarias, total_expressao = medir_offline() if offline else medir_api()
+
+    n = len(PERGUNTAS)
+    print(f"\nMédia por pergunta: binárias {total_binarias / n:.2f}  |  expressão {total_expressao / n:.2f}")
+    print(f"Economia: {(total_binarias - total_expressao) / n:.2f} chamada(s) por pergunta "
+          f"({1 - total_expressao / total_binarias:.0%})")
+
+
+if __name__ == "__main__":
+    main()
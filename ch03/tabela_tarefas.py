@@ -0,0 +1,84 @@
+# /src/ch03/tabela_tarefas.py
+# Mini motor de consulta em memória para a lista de tarefas de tool_tarefas.py
+
+import threading
+from itertools import count
+from typing import Iterable, Optional
+
+
+def normalizar_categoria(categoria: str) -> str:
+    """Chave do índice de categoria: a comparação da tool é sem distinção de maiúsculas."""
+    return categoria.strip().lower()
+
+
+class TabelaTarefas:
+    """Tarefas indexadas por ID, por estado e por categoria normalizada.
+
+    - Filtro por estado ou por categoria: O(k), proporcional ao resultado.
+    - Filtro combinado: percorre o menor dos dois índices e confere a presença
+      no outro (interseção em O(min(k1, k2))).
+    - Inserção e mudança de estado atualizam os índices na hora, sem reconstruir nada.
+
+    Os índices usam dict como conjunto ordenado (ordem de inserção, remoção em O(1)).
+    Uma tarefa que muda de estado passa para o fim do índice do novo estado.
+    """
+
+    def __init__(self, tarefas: Iterable[dict] = ()):
+        self._lock = threading.Lock()
+        self._por_id: dict[int, dict] = {}
+        self._por_estado: dict[str, dict[int, dict]] = {}
+        self._por_categoria: dict[str, dict[int, dict]] = {}
+
+        maior_id = 0
+        for tarefa in tarefas:
+            self._indexar(dict(tarefa))
+            maior_id = max(maior_id, tarefa["id"])
+        self._ids = count(maior_id + 1)
+
+    def _indexar(self, tarefa: dict) -> None:
+        self._por_id[tarefa["id"]] = tarefa
+        self._por_estado.setdefault(tarefa["estado"], {})[tarefa["id"]] = tarefa
+        chave = normalizar_categoria(tarefa["categoria"])
+        self._por_categoria.setdefault(chave, {})[tarefa["id"]] = tarefa
+
+    def inserir(self, titulo: str, categoria: str, estado: str = "pendente") -> dict:
+        """Cria uma tarefa com um ID novo e a inclui nos índices."""
+        with self._lock:
+            tarefa = {"id": next(self._ids), "titulo": titulo, "estado": estado, "categoria": categoria}
+            self._indexar(tarefa)
+        return tarefa
+
+    def alterar_estado(self, tarefa_id: int, estado: str) -> Optional[dict]:
+        """Muda o estado da tarefa movendo-a entre os índices. None se o ID não existe."""
+        with self._lock:
+            tarefa = self._por_id.get(tarefa_id)
+            if tarefa is None:
+                return None
+            if tarefa["estado"] != estado:
+                del self._por_estado[tarefa["estado"]][tarefa_id]
+                tarefa["estado"] = estado
+                self._por_estado.setdefault(estado, {})[tarefa_id] = tarefa
+            return tarefa
+
+    def obter(self, tarefa_id: int) -> Optional[dict]:
+        return self._por_id.get(tarefa_id)
+
+    def consultar(self, estado: Optional[str] = None, categoria: Optional[str] = None) -> list[dict]:
+        """Tarefas que atendem a todos os filtros informados."""
+        with self._lock:
+            indices = []
+            if estado:
+                indices.append(self._por_estado.get(estado, {}))
+            if categoria:
+                indices.append(self._por_categoria.get(normalizar_categoria(categoria), {}))
+
+            if not indices:
+                return list(self._por_id.values())
+            if len(indices) == 1:
+                return list(indices[0].values())
+
+            menor, maior = sorted(indices, key=len)
+            return [tarefa for tarefa_id, tarefa in menor.items() if tarefa_id in maior]
+
+    def __len__(self) -> int:
+        return len(self._por_id)
@@ -5,6 +5,8 @@ from typing import Optional, Literal
 
 from enum import Enum
 
+from tabela_tarefas import TabelaTarefas
+
 class EstadoTarefa(str, Enum):
     PENDENTE = "pendente"
     CONCLUIDA = "concluida"
@@ -21,12 +23,12 @@ class ListarTarefasInput(BaseModel):
         description="Filtrar por categoria"
     )
 
-# Banco de dados simulado
-TAREFAS_DB = [
+# Banco de dados simulado, indexado por estado e categoria
+TAREFAS_DB = TabelaTarefas([
     {"id": 1, "titulo": "Estudar Python", "estado": "pendente", "categoria": "Estudos"},
     {"id": 2, "titulo": "Fazer compras", "estado": "concluida", "categoria": "Pessoal"},
     {"id": 3, "titulo": "Reunião de equipe", "estado": "pendente", "categoria": "Trabalho"},
-]
+])
 
 @tool(args_schema=ListarTarefasInput)
 def listar_tarefas(
@@ -38,13 +40,8 @@ def listar_tarefas(
     Use esta ferramenta para mostrar tarefas existentes.
     Pode filtrar por estado (pendente, concluida, arquivada) e/ou categoria.
     """
-    tarefas = TAREFAS_DB.copy()
-
-    # Aplicar filtros
-    if estado:
-        tarefas = [t for t in tarefas if t["estado"] == estado]
-    if categoria:
-        tarefas = [t for t in tarefas if t["categoria"].lower() == categoria.lower()]
+    # Filtros resolvidos pelos índices, sem percorrer todas as tarefas
+    tarefas = TAREFAS_DB.consultar(estado=estado, categoria=categoria)
 
     if not tarefas:
         return "Nenhuma tarefa encontrada com os filtros especificados."
@@ -58,5 +55,5 @@ def listar_tarefas(
 
     return resultado
 
-# Testar
-print(listar_tarefas.invoke({"estado": "pendente"}))
\ No newline at end of file
+if __name__ == "__main__":
+    print(listar_tarefas.invoke({"estado": "pendente"}))
@@ -1,27 +1,52 @@
 # /src/ch06/agente_react_completo.py
 import os
+import time
 import operator
+from functools import partial
 from typing import TypedDict, Annotated, Literal, Optional
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
+import numpy as np
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, AnyMessage
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, START, END
 from langgraph.config import get_config
 
+from repositorio_tarefas import RepositorioTarefasMemoria, RepositorioTarefasSQLite
+from lembretes import AgendadorLembretes
+from orcamento import (
+    METRICAS, Orcamento, contabilizar_llm, contabilizar_tools,
+    encerrar_por_orcamento, verificar_orcamento, verificar_sessao
+)
+from planejar_executar import criar_grafo_plano, criar_planejador
+
+from comum.contabilidade import CONTABILIDADE
+from comum.lote_tools import invocar_tool_calls
+from comum.modelos import obter_modelo
+from comum.registro_tools import tools_por_nome, vincular_tools
+from comum.roteador_modelos import criar_roteador
+
 load_dotenv()
 
 # === CONFIGURAÇÃO INICIAL ===
-TAREFAS_DB: dict[int, list[dict]] = {
-    1: [
-        {"id": 1, "titulo": "Estudar Python", "estado": "pendente", "vencimento": "2025-12-15"},
-        {"id": 2, "titulo": "Fazer compras", "estado": "concluida", "vencimento": "2025-12-10"},
-    ]
-}
-NEXT_ID = 3
+TAREFAS = RepositorioTarefasMemoria([
+    {"id": 1, "usuario_id": 1, "titulo": "Estudar Python", "estado": "pendente", "vencimento": date(2025, 12, 15)},
+    {"id": 2, "usuario_id": 1, "titulo": "Fazer compras", "estado": "concluida", "vencimento": date(2025, 12, 10)},
+])
+
+
+def repositorio_padrao():
+    """SQLite em $TAREFAS_DB_PATH, se definida, senão o repositório em memória."""
+    caminho_db = os.getenv("TAREFAS_DB_PATH")
+    return RepositorioTarefasSQLite(caminho_db) if caminho_db else TAREFAS
+
+
+def obter_repositorio():
+    """Repositório de tarefas da execução atual (definido em create_agent)."""
+    config = get_config()
+    return config.get("configurable", {}).get("repositorio_tarefas", TAREFAS)
 
 # === FERRAMENTAS (TOOLS) ===
 
@@ -52,6 +77,69 @@ def calcular(operacao: str, a: float, b: float) -> str:
     except Exception as e:
         return f"Erro ao calcular: {e}"
 
+REDUCOES = {
+    "soma": np.sum,
+    "media": np.mean,
+    "minimo": np.min,
+    "maximo": np.max,
+    "produto": np.prod,
+}
+
+OPERACOES_ELEMENTO = {
+    "somar": np.add,
+    "subtrair": np.subtract,
+    "multiplicar": np.multiply,
+    "dividir": np.divide,
+}
+
+class CalcularLoteInput(BaseModel):
+    operacao: str = Field(
+        description="Redução sobre 'valores' (soma, media, minimo, maximo, produto) "
+                    "ou operação elemento a elemento entre 'a' e 'b' (somar, subtrair, multiplicar, dividir)"
+    )
+    valores: Optional[list[float]] = Field(default=None, description="Lista de números para a redução")
+    a: Optional[list[float]] = Field(default=None, description="Primeiros operandos (operação elemento a elemento)")
+    b: Optional[list[float]] = Field(
+        default=None,
+        description="Segundos operandos, mesmo tamanho de 'a' (ou um único número aplicado a todos)"
+    )
+
+@tool(args_schema=CalcularLoteInput)
+def calcular_lote(
+    operacao: str,
+    valores: Optional[list[float]] = None,
+    a: Optional[list[float]] = None,
+    b: Optional[list[float]] = None,
+) -> str:
+    """Calcula muitos valores de uma vez, em uma única chamada.
+
+    Use esta ferramenta em vez de várias chamadas a 'calcular' sempre que houver
+    uma lista de números: somar/tirar média/mínimo/máximo de uma lista, ou aplicar
+    a mesma operação a vários pares (ex: preço x quantidade de cada item).
+    """
+    try:
+        if operacao in REDUCOES:
+            if not valores:
+                return f"Erro: informe 'valores' para a redução '{operacao}'."
+            resultado = REDUCOES[operacao](np.asarray(valores, dtype=float))
+            return f"O resultado de {operacao} sobre {len(valores)} valores é {resultado:g}"
+
+        if operacao in OPERACOES_ELEMENTO:
+            if not a or not b:
+                return f"Erro: informe 'a' e 'b' para a operação '{operacao}'."
+            x = np.asarray(a, dtype=float)
+            y = np.asarray(b, dtype=float)
+            if y.size not in (1, x.size):
+                return "Erro: 'a' e 'b' devem ter o mesmo tamanho."
+            with np.errstate(divide="ignore", invalid="ignore"):
+                resultado = OPERACOES_ELEMENTO[operacao](x, y)
+            texto = ", ".join("indefinido" if not np.isfinite(v) else f"{v:g}" for v in resultado)
+            return f"Resultados de {operacao} ({resultado.size} pares): [{texto}]"
+
+        return f"Operação '{operacao}' não reconhecida."
+    except Exception as e:
+        return f"Erro ao calcular: {e}"
+
 @tool
 def obter_hora() -> str:
     """Obtém a hora atual do sistema."""
@@ -67,88 +155,117 @@ def listar_tarefas(estado: Optional[str] = None) -> str:
     """
     config = get_config()
     usuario_id = config.get("configurable", {}).get("usuario_id", 1)
-    tarefas = TAREFAS_DB.get(usuario_id, [])
-
-    if estado:
-        tarefas = [t for t in tarefas if t["estado"] == estado]
+    tarefas = obter_repositorio().listar(usuario_id, estado)
 
     if not tarefas:
         return "Nenhuma tarefa encontrada."
 
     resultado = f"Encontradas {len(tarefas)} tarefa(s):\n"
     for t in tarefas:
-        emoji = "⏳" if t["estado"] == "pendente" else "✅"
-        resultado += f"\n{emoji} [{t['id']}] {t['titulo']}"
-        if t.get("vencimento"):
-            resultado += f" (vence: {t['vencimento']})"
+        emoji = "⏳" if t.estado == "pendente" else "✅"
+        resultado += f"\n{emoji} [{t.id}] {t.titulo}"
+        if t.vencimento:
+            resultado += f" (vence: {t.vencimento})"
 
     return resultado
 
 class CriarTarefaInput(BaseModel):
     titulo: str = Field(description="Título da tarefa")
-    vencimento: Optional[str] = Field(default=None, description="Data de vencimento (YYYY-MM-DD)")
+    vencimento: Optional[date] = Field(default=None, description="Data de vencimento (YYYY-MM-DD)")
 
 @tool(args_schema=CriarTarefaInput)
-def criar_tarefa(titulo: str, vencimento: Optional[str] = None) -> str:
+def criar_tarefa(titulo: str, vencimento: Optional[date] = None) -> str:
     """Cria uma nova tarefa."""
-    global NEXT_ID
     config = get_config()
     usuario_id = config.get("configurable", {}).get("usuario_id", 1)
 
-    if usuario_id not in TAREFAS_DB:
-        TAREFAS_DB[usuario_id] = []
+    nova_tarefa = obter_repositorio().criar(usuario_id, titulo, vencimento)
 
-    nova_tarefa = {
-        "id": NEXT_ID,
-        "titulo": titulo,
-        "estado": "pendente",
-        "vencimento": vencimento
-    }
-    TAREFAS_DB[usuario_id].append(nova_tarefa)
-    NEXT_ID += 1
-
-    return f"Tarefa criada com sucesso! ID: {nova_tarefa['id']}, Título: {titulo}"
+    return f"Tarefa criada com sucesso! ID: {nova_tarefa.id}, Título: {titulo}"
 
 @tool
 def concluir_tarefa(tarefa_id: int) -> str:
     """Marca uma tarefa como concluída."""
     config = get_config()
     usuario_id = config.get("configurable", {}).get("usuario_id", 1)
-    tarefas = TAREFAS_DB.get(usuario_id, [])
+    tarefa = obter_repositorio().concluir(usuario_id, tarefa_id)
 
-    for tarefa in tarefas:
-        if tarefa["id"] == tarefa_id:
-            tarefa["estado"] = "concluida"
-            return f"Tarefa '{tarefa['titulo']}' marcada como concluída!"
+    if tarefa is None:
+        return f"Tarefa com ID {tarefa_id} não encontrada."
 
-    return f"Tarefa com ID {tarefa_id} não encontrada."
+    return f"Tarefa '{tarefa.titulo}' marcada como concluída!"
 
-ALL_TOOLS = [calcular, obter_hora, listar_tarefas, criar_tarefa, concluir_tarefa]
-TOOLS_BY_NAME = {t.name: t for t in ALL_TOOLS}
+@tool
+def tarefas_vencendo(dias: int = 7) -> str:
+    """Lista as tarefas pendentes que vencem nos próximos dias.
+
+    Use para perguntas como "o que vence esta semana?" ou "o que vence amanhã?".
+
+    Args:
+        dias: Quantos dias à frente considerar, a partir de hoje (0 = só hoje).
+    """
+    config = get_config()
+    usuario_id = config.get("configurable", {}).get("usuario_id", 1)
+    hoje = date.today()
+    limite = hoje + timedelta(days=dias)
+
+    tarefas = obter_repositorio().listar_por_vencimento(usuario_id, ate=limite, desde=hoje, estado="pendente")
+
+    if not tarefas:
+        return f"Nenhuma tarefa pendente vence até {limite.strftime('%d/%m/%Y')}."
+
+    resultado = f"{len(tarefas)} tarefa(s) vencendo até {limite.strftime('%d/%m/%Y')}:\n"
+    for t in tarefas:
+        resultado += f"\n⏳ [{t.id}] {t.titulo} (vence: {t.vencimento.strftime('%d/%m/%Y')})"
+    return resultado
+
+ALL_TOOLS = [calcular, calcular_lote, obter_hora, listar_tarefas, criar_tarefa, concluir_tarefa, tarefas_vencendo]
+TOOLS_BY_NAME = tools_por_nome(ALL_TOOLS)
 
 # === DEFINIR ESTADO ===
 class AgentState(TypedDict):
     messages: Annotated[list[AnyMessage], operator.add]
+    # Consumo do turno atual (ver orcamento.py)
+    chamadas_llm: int
+    chamadas_tools: int
+    tokens: int
+    inicio_turno: float
 
 # === CONFIGURAR MODELO ===
 SYSTEM_PROMPT = """Você é um assistente inteligente com acesso a ferramentas.
 
 ## Ferramentas Disponíveis
 - calcular: Para fazer cálculos matemáticos (somar, subtrair, multiplicar, dividir)
+- calcular_lote: Para cálculos sobre listas de números em uma única chamada (soma, média, mínimo, máximo, ou a mesma operação em vários pares)
 - obter_hora: Para saber a hora atual
 - listar_tarefas: Para listar tarefas (opcionalmente filtradas por estado)
 - criar_tarefa: Para criar novas tarefas
 - concluir_tarefa: Para marcar tarefas como concluídas
+- tarefas_vencendo: Para listar tarefas pendentes que vencem nos próximos N dias
 
 ## Instruções
 - Responda sempre em português brasileiro
 - Use as ferramentas quando necessário
+- Com vários números, prefira uma chamada a calcular_lote a várias chamadas a calcular
 - Seja conciso e direto nas respostas
 - Para datas, use formato DD/MM/AAAA
 """
 
-modelo = ChatGoogleGenerativeAI(model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash-lite"), temperature=0)
-modelo_com_tools = modelo.bind_tools(ALL_TOOLS)
+modelo = obter_modelo("gemini-2.5-flash-lite", temperature=0)
+# Modelo escolhido a cada turno entre os níveis leve e forte, com fallback
+# entre eles (ver comum/roteador_modelos.py). Com ROTEADOR_ATIVO=0 todo turno
+# usa o nível "leve" (GOOGLE_MODEL ou gemini-2.5-flash-lite). Tokens de cada
+# resposta somados por sessão (thread_id), nó e tool.
+ROTEADOR = criar_roteador(
+    "leve",
+    lambda m: vincular_tools(m, ALL_TOOLS).with_config(callbacks=[CONTABILIDADE]),
+    temperature=0,
+)
+modelo_com_tools = ROTEADOR
+# Modo "plano": uma chamada produz todos os passos (ver planejar_executar.py)
+planejador = criar_planejador(modelo)
+
+ORCAMENTO = Orcamento.do_ambiente()
 
 # === NÓS DO GRAFO ===
 # Referência: seção "Padrões Reutilizáveis"
@@ -158,8 +275,9 @@ def llm_call(state: AgentState) -> dict:
     messages = state["messages"]
     if not messages or not isinstance(messages[0], SystemMessage):
         messages = [SystemMessage(content=SYSTEM_PROMPT)] + messages
+    inicio = time.time()
     response = modelo_com_tools.invoke(messages)
-    return {"messages": [response]}
+    return {"messages": [response], **contabilizar_llm(state, response, inicio)}
 
 def tool_node(state: AgentState) -> dict:
     """Nó que executa tools."""
@@ -167,64 +285,122 @@ def tool_node(state: AgentState) -> dict:
     last_message = messages[-1]
     tool_messages = []
 
-    for tool_call in last_message.tool_calls:
-        try:
-            result = TOOLS_BY_NAME[tool_call["name"]].invoke(tool_call["args"])
-        except Exception as e:
-            result = f"Erro ao executar {tool_call['name']}: {e}"
-
+    # Chamadas seguidas à mesma tool são validadas e executadas em lote
+    resultados = invocar_tool_calls(TOOLS_BY_NAME, last_message.tool_calls)
+    for tool_call, result in zip(last_message.tool_calls, resultados):
         tool_messages.append(ToolMessage(
-            content=str(result),
+            content=result,
             tool_call_id=tool_call["id"]
         ))
 
-    return {"messages": tool_messages}
+    return {"messages": tool_messages, **contabilizar_tools(state, len(tool_messages))}
+
+def budget_node(state: AgentState, orcamento: Orcamento = ORCAMENTO) -> dict:
+    """Nó que encerra o turno quando o orçamento estoura."""
+    motivo = verificar_orcamento(state, orcamento, CONTABILIDADE.tokens_sessao_atual()) or "limite"
+    METRICAS.registrar_turno(state, motivo)
+    return {"messages": encerrar_por_orcamento(state["messages"], motivo)}
 
-def should_continue(state: AgentState) -> Literal["tool_node", "__end__"]:
+def should_continue(state: AgentState, orcamento: Orcamento = ORCAMENTO) -> Literal["tool_node", "budget_node", "__end__"]:
     """Função de decisão."""
     messages = state["messages"]
     last_message = messages[-1]
 
     if hasattr(last_message, "tool_calls") and last_message.tool_calls:
+        if verificar_orcamento(state, orcamento, CONTABILIDADE.tokens_sessao_atual()):
+            return "budget_node"
         return "tool_node"
 
+    METRICAS.registrar_turno(state)
     return "__end__"
 
+def start_turn(state: AgentState, orcamento: Orcamento = ORCAMENTO) -> Literal["llm_call", "budget_node"]:
+    """Recusa o turno sem chamar o LLM se a sessão já gastou o orçamento de tokens."""
+    if verificar_sessao(orcamento, CONTABILIDADE.tokens_sessao_atual()):
+        return "budget_node"
+    return "llm_call"
+
 # === CONSTRUIR E COMPILAR O GRAFO ===
-def create_agent():
+def create_agent(orcamento: Optional[Orcamento] = None, repositorio=None, modo: str = "react"):
+    """Cria o agente.
+
+    Args:
+        orcamento: Limites por turno. Padrão: lidos das variáveis AGENTE_MAX_*.
+        repositorio: Onde as tarefas são guardadas (RepositorioTarefasMemoria ou
+            RepositorioTarefasSQLite). Padrão: repositorio_padrao().
+        modo: "react" (uma ida ao LLM por passo) ou "plano" (planeja todos os
+            passos em uma chamada e executa os independentes em paralelo).
+    """
+    orcamento = orcamento or ORCAMENTO
+    if repositorio is None:
+        repositorio = repositorio_padrao()
+    if modo == "plano":
+        grafo = criar_grafo_plano(planejador, modelo_com_tools, ALL_TOOLS, SYSTEM_PROMPT, orcamento)
+        return grafo.with_config(configurable={"repositorio_tarefas": repositorio})
+    if modo != "react":
+        raise ValueError(f"Modo desconhecido: {modo} (use 'react' ou 'plano')")
     graph = StateGraph(AgentState)
     graph.add_node("llm_call", llm_call)
     graph.add_node("tool_node", tool_node)
-    graph.add_edge(START, "llm_call")
+    graph.add_node("budget_node", partial(budget_node, orcamento=orcamento))
+    graph.add_conditional_edges(
+        START,
+        partial(start_turn, orcamento=orcamento),
+        {"llm_call": "llm_call", "budget_node": "budget_node"}
+    )
     graph.add_conditional_edges(
         "llm_call",
-        should_continue,
-        {"tool_node": "tool_node", "__end__": END}
+        partial(should_continue, orcamento=orcamento),
+        {"tool_node": "tool_node", "budget_node": "budget_node", "__end__": END}
     )
     graph.add_edge("tool_node", "llm_call")
-    return graph.compile()
+    graph.add_edge("budget_node", END)
+    return graph.compile().with_config(configurable={"repositorio_tarefas": repositorio})
 
 # === TESTAR O AGENTE ===
 def main():
-    agent = create_agent()
+    repositorio = repositorio_padrao()
+    agent = create_agent(repositorio=repositorio, modo=os.getenv("AGENTE_MODO", "react"))
     usuario_id = 1
 
+    agendador = AgendadorLembretes(
+        repositorio,
+        ao_lembrar=lambda t: print(f"\n🔔 Lembrete: '{t.titulo}' vence em {t.vencimento.strftime('%d/%m/%Y')}"),
+        # Um único aviso para o que já estava atrasado ao abrir o agente
+        ao_lembrar_atrasadas=lambda ts: print(
+            f"🔔 {len(ts)} tarefa(s) pendente(s) com lembrete já passado: "
+            + ", ".join(f"'{t.titulo}' ({t.vencimento.strftime('%d/%m/%Y')})" for t in ts)
+        ),
+    ).iniciar()
+    CONTABILIDADE.iniciar_exportacao()
+
     print("=== Agente ReAct Multi-Funcional ===")
     print("Digite 'sair' para encerrar.\n")
 
-    while True:
-        entrada = input("Você: ").strip()
-        if entrada.lower() == "sair":
-            break
-        if not entrada:
-            continue
-
-        resultado = agent.invoke(
-            {"messages": [HumanMessage(content=entrada)]},
-            config={"configurable": {"usuario_id": usuario_id}}
-        )
-
-        print(f"Agente: {resultado['messages'][-1].content}\n")
+    # Métricas gravadas e agendador parado em qualquer saída ('sair', EOF, Ctrl-C ou erro)
+    try:
+        while True:
+            try:
+                entrada = input("Você: ").strip()
+            except (KeyboardInterrupt, EOFError):
+                print("\nEncerrando...")
+                break
+            if entrada.lower() == "sair":
+                break
+            if not entrada:
+                continue
+
+            resultado = agent.invoke(
+                {"messages": [HumanMessage(content=entrada)]},
+                config={"configurable": {"usuario_id": usuario_id, "thread_id": f"usuario-{usuario_id}"}}
+            )
+
+            print(f"Agente: {resultado['messages'][-1].content}\n")
+    finally:
+        METRICAS.exportar()
+        ROTEADOR.metricas.exportar()
+        CONTABILIDADE.parar_exportacao()
+        agendador.parar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+# /src/ch06/benchmark_calculadora.py
+# Compara "somar N valores" via `calcular` (uma tool call por parcela) e via
+# `calcular_lote` (uma única chamada), rodando o grafo real com um modelo
+# roteirizado no lugar do LLM. Conta as idas ao LLM e estima a latência total
+# supondo LATENCIA_LLM segundos por chamada.
+# Uso: python benchmark_calculadora.py [latencia_llm_s]
+
+import random
+import sys
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+import agente_react_completo as agente
+from orcamento import Orcamento
+
+LATENCIA_LLM = float(sys.argv[1]) if len(sys.argv) > 1 else 0.8
+TAMANHOS = [10, 50, 200, 1000]
+
+
+class ModeloRoteirizado:
+    """Faz o papel do LLM: pede as tools na ordem em que um modelo pediria."""
+
+    def __init__(self, valores: list[float], em_lote: bool):
+        self.valores = valores
+        self.em_lote = em_lote
+        self.chamadas = 0
+        self.acumulado = valores[0]
+        self.proximo = 1
+
+    def invoke(self, messages):
+        self.chamadas += 1
+        if self.em_lote and not isinstance(messages[-1], ToolMessage):
+            return self._pedir("calcular_lote", {"operacao": "soma", "valores": self.valores})
+        if not self.em_lote and self.proximo < len(self.valores):
+            args = {"operacao": "somar", "a": self.acumulado, "b": self.valores[self.proximo]}
+            self.acumulado += self.valores[self.proximo]
+            self.proximo += 1
+            return self._pedir("calcular", args)
+        return AIMessage(content=messages[-1].content)
+
+    def _pedir(self, nome: str, args: dict) -> AIMessage:
+        return AIMessage(content="", tool_calls=[{"name": nome, "args": args, "id": f"call-{self.chamadas}"}])
+
+
+def rodar(valores: list[float], em_lote: bool) -> tuple[int, int, float, str]:
+    modelo = ModeloRoteirizado(valores, em_lote)
+    agente.modelo_com_tools = modelo
+    # Orçamento folgado: o objetivo aqui é medir, não cortar o modo escalar
+    grafo = agente.create_agent(Orcamento(max_chamadas_llm=10**6, max_chamadas_tools=10**6,
+                                          max_segundos=10**6, max_tokens=10**9))
+
+    inicio = time.perf_counter()
+    resultado = grafo.invoke(
+        {"messages": [HumanMessage(content=f"Some estes {len(valores)} valores")]},
+        config={"configurable": {"usuario_id": 1}, "recursion_limit": 10 * len(valores) + 10}
+    )
+    duracao = time.perf_counter() - inicio
+    tool_calls = sum(isinstance(m, ToolMessage) for m in resultado["messages"])
+    return modelo.chamadas, tool_calls, duracao, resultado["messages"][-1].content
+
+
+def main():
+    rng = random.Random(0)
+    print(f"=== Somar N valores: calcular x calcular_lote (LLM estimado em {LATENCIA_LLM}s/chamada) ===\n")
+    print(f"{'N':>5s}  {'modo':14s} {'chamadas LLM':>12s} {'tool calls':>10s} {'grafo (s)':>10s} {'estimado (s)':>12s}")
+    for n in TAMANHOS:
+        valores = [round(rng.uniform(1, 1000), 2) for _ in range(n)]
+        for em_lote, nome in [(False, "calcular"), (True, "calcular_lote")]:
+            chamadas, tool_calls, duracao, _ = rodar(valores, em_lote)
+            estimado = duracao + chamadas * LATENCIA_LLM
+            print(f"{n:5d}  {nome:14s} {chamadas:12d} {tool_calls:10d} {duracao:10.3f} {estimado:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
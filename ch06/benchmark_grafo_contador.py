@@ -0,0 +1,72 @@
+# /src/ch06/benchmark_grafo_contador.py
+# Custo por superstep do grafo contador (grafo_contador.py) com o histórico
+# em três formas de estado:
+#   anexar        Annotated[Historico, anexar_historico]: nós devolvem só o
+#                 novo item e o reducer anexa sem copiar, O(1) por passo
+#   operator_add  Annotated[list, operator.add]: nós devolvem só o novo item,
+#                 mas o reducer ainda cria uma lista nova a cada passo (O(n²))
+#   copia         nós devolvem state["historico"] + [...] (O(n²) no total)
+#
+# Para cada tamanho mede o tempo total, o tempo por superstep e o pico de
+# memória (tracemalloc, em uma segunda execução para não distorcer o tempo).
+#
+# Uso: python benchmark_grafo_contador.py [--voltas 1000 10000 100000] [--max-copia 20000] [--sem-memoria]
+import argparse
+import gc
+import time
+import tracemalloc
+
+from grafo_contador import MODOS, config_execucao, criar_grafo
+
+
+def executar(app, voltas: int) -> dict:
+    return app.invoke({"valor": 0, "historico": ["Início"]}, config=config_execucao(voltas))
+
+
+def medir(modo: str, voltas: int, memoria: bool = True) -> dict:
+    app = criar_grafo(limite=voltas, modo=modo)
+
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = executar(app, voltas)
+    segundos = time.perf_counter() - inicio
+    assert resultado["valor"] == voltas and len(resultado["historico"]) == 2 * voltas + 1
+    del resultado
+
+    pico = None
+    if memoria:
+        gc.collect()
+        tracemalloc.start()
+        executar(app, voltas)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    supersteps = 2 * voltas
+    return {"segundos": segundos, "us_por_superstep": segundos / supersteps * 1e6, "pico_bytes": pico}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Custo por superstep do grafo contador com o histórico copiado ou anexado por reducer."
+    )
+    parser.add_argument("--voltas", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--max-copia", type=int, default=20_000,
+                        help="maior número de voltas para o modo copia (quadrático)")
+    parser.add_argument("--sem-memoria", action="store_true",
+                        help="não mede o pico de memória (a execução com tracemalloc é bem mais lenta)")
+    args = parser.parse_args()
+
+    print(f"{'voltas':>8s} {'modo':>13s} {'total':>10s} {'µs/superstep':>13s} {'pico memória':>13s}")
+    for voltas in args.voltas:
+        for modo in MODOS:
+            if modo == "copia" and voltas > args.max_copia:
+                print(f"{voltas:8d} {modo:>13s} {'(pulado: acima de --max-copia)':>38s}")
+                continue
+            m = medir(modo, voltas, memoria=not args.sem_memoria)
+            pico = "-" if m["pico_bytes"] is None else f"{m['pico_bytes'] / 1024 / 1024:.1f}MB"
+            print(f"{voltas:8d} {modo:>13s} {m['segundos']:9.2f}s {m['us_por_superstep']:13.1f} {pico:>13s}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
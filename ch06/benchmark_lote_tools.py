@@ -0,0 +1,52 @@
+# /src/ch06/benchmark_lote_tools.py
+# Importação em massa pelo executor de tools: uma tool.invoke por item x
+# invocar_lote (uma validação com TypeAdapter para a lista inteira).
+# Uso: python benchmark_lote_tools.py [n_itens]
+import os
+import sys
+import tempfile
+import time
+
+import chatbot
+from comum.lote_tools import invocar_lote
+from comum.registro_tools import REGISTRO
+
+
+def gerar_itens(n: int, prefixo: str) -> list[dict]:
+    # Argumentos como chegam do LLM: números às vezes como texto
+    return [{"nome": f"{prefixo} {i}", "preco": str(10 + i % 90), "estoque": i % 50} for i in range(n)]
+
+
+def cronometrar(descricao: str, funcao) -> float:
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"{descricao:40s} {duracao * 1000:10.1f}ms")
+    return duracao
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    ferramenta = chatbot.criar_produto
+    itens = gerar_itens(n, "Produto")
+
+    print(f"=== Validação de {n:,} argumentos ({ferramenta.args_schema.__name__}) ===")
+    validador = REGISTRO.validador_lote(ferramenta)
+    um_a_um = cronometrar("model_validate por item", lambda: [ferramenta.args_schema.model_validate(a) for a in itens])
+    lote = cronometrar("TypeAdapter(list[...]) em uma passada", lambda: validador.validate_python(itens))
+    print(f"-> ganho: {um_a_um / lote:.1f}x")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        chatbot.DB_PATH = os.path.join(pasta, "produtos.db")
+        chatbot.inicializar_banco()
+
+        print(f"\n=== criar_produto para {n:,} itens (SQLite temporário) ===")
+        invoke = cronometrar("tool.invoke por item", lambda: [ferramenta.invoke(a) for a in itens])
+        itens_lote = gerar_itens(n, "Item")
+        resultados = []
+        lote = cronometrar("invocar_lote", lambda: resultados.extend(invocar_lote(ferramenta, itens_lote)))
+        print(f"-> ganho: {invoke / lote:.2f}x  ({sum(r.ok for r in resultados):,} ok)")
+
+
+if __name__ == "__main__":
+    main()
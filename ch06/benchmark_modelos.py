@@ -0,0 +1,108 @@
+# /src/ch06/benchmark_modelos.py
+# Latência da primeira chamada x chamadas seguintes com a fábrica de modelos
+# (comum/modelos.py) comparada a um ChatGoogleGenerativeAI novo por uso.
+#
+# Sem --api, mede só a criação dos clientes (nenhuma chamada à API é feita;
+# a chave só é exigida pelo construtor). Com --api, mede também a latência
+# real de invoke: conexão fria, conexão aquecida e um cliente novo por chamada.
+#
+# Uso: GOOGLE_API_KEY=... python benchmark_modelos.py [--instancias 50] [--api --chamadas 5]
+import argparse
+import statistics
+import time
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from comum import modelos
+from comum.modelos import aquecer, limpar_cache, nome_modelo, obter_modelo
+
+PADRAO = "gemini-2.5-flash-lite"
+# Combinações usadas pelos módulos do tutorial (temperatura, opções)
+CONFIGURACOES = [
+    (0, {}),
+    (0.7, {}),
+    (0.7, {"max_output_tokens": 1024}),
+    (None, {}),
+]
+PERGUNTA = "Responda apenas: ok"
+
+
+def ms(segundos: float) -> str:
+    return f"{segundos * 1000:9.3f}ms"
+
+
+def criar_direto(instancias: int) -> list[float]:
+    tempos = []
+    for i in range(instancias):
+        temperatura, opcoes = CONFIGURACOES[i % len(CONFIGURACOES)]
+        inicio = time.perf_counter()
+        ChatGoogleGenerativeAI(model=nome_modelo(PADRAO), temperature=temperatura, **opcoes)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def criar_com_fabrica(instancias: int) -> list[float]:
+    limpar_cache()
+    tempos = []
+    for i in range(instancias):
+        temperatura, opcoes = CONFIGURACOES[i % len(CONFIGURACOES)]
+        inicio = time.perf_counter()
+        obter_modelo(PADRAO, temperature=temperatura, **opcoes)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def medir_invokes(obter, chamadas: int) -> list[float]:
+    tempos = []
+    for _ in range(chamadas):
+        modelo = obter()
+        inicio = time.perf_counter()
+        modelo.invoke(PERGUNTA)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def imprimir(nome: str, tempos: list[float]) -> None:
+    seguintes = tempos[1:] or [0.0]
+    print(f"{nome:28s} {ms(tempos[0])} {ms(statistics.median(seguintes))} {ms(sum(tempos))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--instancias", type=int, default=50)
+    parser.add_argument("--api", action="store_true", help="faz chamadas reais ao modelo")
+    parser.add_argument("--chamadas", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"=== Criação de {args.instancias} modelos ({len(CONFIGURACOES)} configurações) ===\n")
+    print(f"{'':28s} {'primeira':>11s} {'mediana demais':>11s} {'total':>11s}")
+    imprimir("ChatGoogleGenerativeAI(...)", criar_direto(args.instancias))
+    imprimir("obter_modelo(...)", criar_com_fabrica(args.instancias))
+
+    instancias = [obter_modelo(PADRAO, temperature=t, **o) for t, o in CONFIGURACOES]
+    print(f"\nclientes HTTP distintos: {len({id(m.client) for m in instancias})} "
+          f"para {len(instancias)} configurações | {modelos.ESTATISTICAS}")
+
+    if not args.api:
+        print("\n(use --api para medir a latência das chamadas ao modelo)")
+        return
+
+    print(f"\n=== {args.chamadas} chamadas ao modelo ===\n")
+    print(f"{'':28s} {'primeira':>11s} {'mediana demais':>11s} {'total':>11s}")
+
+    imprimir("cliente novo por chamada", medir_invokes(
+        lambda: ChatGoogleGenerativeAI(model=nome_modelo(PADRAO), temperature=0), args.chamadas))
+
+    limpar_cache()
+    imprimir("fábrica, conexão fria", medir_invokes(
+        lambda: obter_modelo(PADRAO, temperature=0), args.chamadas))
+
+    limpar_cache()
+    segundos = aquecer(obter_modelo(PADRAO, temperature=0), em_segundo_plano=False)
+    imprimir("fábrica, conexão aquecida", medir_invokes(
+        lambda: obter_modelo(PADRAO, temperature=0), args.chamadas))
+    print(f"  (aquecimento feito antes, fora da medição: {segundos * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
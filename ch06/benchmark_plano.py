@@ -0,0 +1,225 @@
+# /src/ch06/benchmark_plano.py
+# Latência do modo ReAct x modo planejar e executar (planejar_executar.py) no
+# chatbot de produtos, em um conjunto de cenários.
+#
+# Sem --api, o modelo é simulado: cada cenário tem um roteiro de passos (tool,
+# argumentos, dependências) e cada ida ao modelo leva
+#   --latencia-base + --latencia-por-mil * (milhares de tokens do prompt)
+# para refletir o histórico reenviado a cada passo do ReAct. O ReAct simulado
+# já pede juntas todas as tools cujas dependências terminaram (o melhor caso
+# dele). As tools são as reais, em um banco temporário por execução.
+#
+# Com --api, usa o modelo real nos mesmos pedidos (ou nos cenários de
+# --cenarios, no formato de transcricoes/cenarios.json).
+#
+# Uso: python benchmark_plano.py [--repeticoes 3] [--latencia-base 0.6 --latencia-por-mil 0.1]
+#      GOOGLE_API_KEY=... python benchmark_plano.py --api [--cenarios transcricoes/cenarios.json]
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+import chatbot
+from comum.registro_tools import REGISTRO
+from planejar_executar import PassoPlano, Plano
+
+MODOS = ("react", "plano")
+
+# nome -> (pedido, roteiro); roteiro: (tool, argumentos, passos dos quais depende), numerados a partir de 1
+CENARIOS = {
+    "saudacao": ("Oi! O que você consegue fazer?", []),
+    "listar": ("Liste todos os produtos", [("listar_produtos", {}, [])]),
+    "criar_3_e_baixo_estoque": (
+        "Crie os produtos Mouse (R$ 50, 3 unidades), Teclado (R$ 150, 8 unidades) e "
+        "Cabo HDMI (R$ 30, 2 unidades) e depois liste os com menos de 5 unidades",
+        [
+            ("criar_produto", {"nome": "Mouse", "preco": 50, "estoque": 3}, []),
+            ("criar_produto", {"nome": "Teclado", "preco": 150, "estoque": 8}, []),
+            ("criar_produto", {"nome": "Cabo HDMI", "preco": 30, "estoque": 2}, []),
+            ("listar_baixo_estoque", {"limite": 5}, [1, 2, 3]),
+        ],
+    ),
+    "cadastro_venda_relatorio": (
+        "Cadastre um monitor por R$ 900 com 6 unidades e uma webcam por R$ 250 com 4, "
+        "registre a venda de 2 monitores e mostre o que tem menos de 5 unidades",
+        [
+            ("criar_produto", {"nome": "Monitor", "preco": 900, "estoque": 6}, []),
+            ("criar_produto", {"nome": "Webcam", "preco": 250, "estoque": 4}, []),
+            ("ajustar_estoque_por_nome", {"nome_produto": "Monitor", "delta": -2}, [1]),
+            ("listar_baixo_estoque", {"limite": 5}, [2, 3]),
+        ],
+    ),
+}
+
+
+# === MODELOS SIMULADOS ===
+
+def tokens_das_tools() -> int:
+    """Tokens aproximados dos schemas enviados com o modelo que tem tools vinculadas."""
+    schemas = [REGISTRO.schema(t) for t in chatbot.ALL_TOOLS]
+    return len(json.dumps(schemas, ensure_ascii=False)) // 4
+
+
+class ModeloSimulado:
+    """Base dos simulados: latência proporcional ao prompt e o roteiro do pedido atual."""
+
+    def __init__(self, latencia_base: float, latencia_por_mil: float, tokens_extras: int = 0):
+        self.latencia_base = latencia_base
+        self.latencia_por_mil = latencia_por_mil
+        self.tokens_extras = tokens_extras
+
+    def esperar(self, messages) -> dict:
+        tokens = count_tokens_approximately(messages) + self.tokens_extras
+        time.sleep(self.latencia_base + self.latencia_por_mil * tokens / 1000)
+        return {"input_tokens": tokens, "output_tokens": 50, "total_tokens": tokens + 50}
+
+    @staticmethod
+    def turno_atual(messages) -> tuple[list, list]:
+        """Roteiro do último pedido do usuário e as mensagens posteriores a ele."""
+        for indice in range(len(messages) - 1, -1, -1):
+            m = messages[indice]
+            if isinstance(m, HumanMessage):
+                for pedido, roteiro in CENARIOS.values():
+                    if m.content == pedido:
+                        return roteiro, messages[indice + 1:]
+        return [], []
+
+
+class ReActSimulado(ModeloSimulado):
+    """Pede as tools do roteiro em ondas, uma ida ao modelo por onda, e depois responde."""
+
+    def invoke(self, messages, config=None, **kwargs):
+        uso = self.esperar(messages)
+        roteiro, depois = self.turno_atual(messages)
+        executadas = {m.tool_call_id for m in depois if isinstance(m, ToolMessage)}
+        feitos = set()
+        for m in depois:
+            for chamada in getattr(m, "tool_calls", None) or []:
+                if chamada["id"] in executadas:
+                    feitos.add(json.dumps([chamada["name"], chamada["args"]], sort_keys=True))
+        chaves = [json.dumps([tool, args], sort_keys=True) for tool, args, _ in roteiro]
+        prontos = [
+            {"name": tool, "args": args, "id": f"sim-{len(depois)}-{i}", "type": "tool_call"}
+            for i, (tool, args, dependencias) in enumerate(roteiro, start=1)
+            if chaves[i - 1] not in feitos and all(chaves[d - 1] in feitos for d in dependencias)
+        ]
+        if prontos:
+            return AIMessage(content="", tool_calls=prontos, usage_metadata=uso)
+        return AIMessage(content=f"Pronto! {len(feitos)} operação(ões) realizada(s).", usage_metadata=uso)
+
+
+class PlanejadorSimulado(ModeloSimulado):
+    """Devolve o roteiro inteiro como Plano na primeira ida; depois, um plano vazio."""
+
+    def invoke(self, messages, config=None, **kwargs):
+        uso = self.esperar(messages)
+        roteiro, depois = self.turno_atual(messages)
+        if depois or not roteiro:
+            plano = Plano(resposta=None if roteiro else "Posso cadastrar, listar, atualizar e excluir produtos.")
+        else:
+            plano = Plano(passos=[
+                PassoPlano(id=i, tool=tool, argumentos=json.dumps(args), depende_de=dependencias)
+                for i, (tool, args, dependencias) in enumerate(roteiro, start=1)
+            ])
+        return {"raw": AIMessage(content="", usage_metadata=uso), "parsed": plano, "parsing_error": None}
+
+
+# === MEDIÇÃO ===
+
+class Medido:
+    """Conta as idas ao modelo e os tokens aproximados de cada prompt."""
+
+    def __init__(self, modelo, tokens_extras: int = 0):
+        self.modelo = modelo
+        self.tokens_extras = tokens_extras
+        self.idas = 0
+        self.tokens_prompt = 0
+
+    def invoke(self, messages, config=None, **kwargs):
+        self.idas += 1
+        self.tokens_prompt += count_tokens_approximately(messages) + self.tokens_extras
+        return self.modelo.invoke(messages, config, **kwargs)
+
+
+def executar(modo: str, nome: str, turnos: list[str], redator, planejador) -> dict:
+    """Roda os turnos de um cenário em um banco e uma thread novos."""
+    tokens_tools = tokens_das_tools()
+    redator, planejador = Medido(redator, tokens_tools), Medido(planejador)
+    originais = chatbot.modelo_com_tools, chatbot.planejador, chatbot.DB_PATH
+    chatbot.modelo_com_tools, chatbot.planejador = redator, planejador
+    try:
+        agente = chatbot.criar_agente(modo=modo)
+        config = {"configurable": {"thread_id": f"benchmark-{modo}-{nome}"}}
+        with tempfile.TemporaryDirectory() as pasta:
+            chatbot.DB_PATH = os.path.join(pasta, "produtos.db")
+            chatbot.inicializar_banco()
+            inicio = time.perf_counter()
+            tools = 0
+            for turno in turnos:
+                resultado = agente.invoke({"messages": [HumanMessage(content=turno)]}, config=config)
+                tools += resultado.get("chamadas_tools", 0)
+            segundos = time.perf_counter() - inicio
+    finally:
+        chatbot.modelo_com_tools, chatbot.planejador, chatbot.DB_PATH = originais
+
+    return {
+        "segundos": segundos,
+        "idas": redator.idas + planejador.idas,
+        "tools": tools,
+        "tokens_prompt": redator.tokens_prompt + planejador.tokens_prompt,
+    }
+
+
+def medir(modo: str, nome: str, turnos: list[str], modelos, repeticoes: int) -> dict:
+    execucoes = [executar(modo, nome, turnos, *modelos()) for _ in range(repeticoes)]
+    return {**execucoes[0], "segundos": statistics.median(e["segundos"] for e in execucoes)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--latencia-base", type=float, default=0.6,
+                        help="segundos fixos por ida ao modelo simulado")
+    parser.add_argument("--latencia-por-mil", type=float, default=0.1,
+                        help="segundos por mil tokens de prompt no modelo simulado")
+    parser.add_argument("--api", action="store_true", help="usa o modelo real em vez do simulado")
+    parser.add_argument("--cenarios", help="JSON {nome: [turnos]} para o modo --api")
+    args = parser.parse_args()
+
+    if args.api:
+        if args.cenarios:
+            with open(args.cenarios, encoding="utf-8") as f:
+                cenarios = json.load(f)
+        else:
+            cenarios = {nome: [pedido] for nome, (pedido, _) in CENARIOS.items()}
+        modelos = lambda: (chatbot.modelo_com_tools, chatbot.planejador)
+        print(f"Modelo real: {getattr(chatbot.modelo, 'model', '?')}\n")
+    else:
+        cenarios = {nome: [pedido] for nome, (pedido, _) in CENARIOS.items()}
+        tokens_tools = tokens_das_tools()
+        modelos = lambda: (
+            ReActSimulado(args.latencia_base, args.latencia_por_mil, tokens_tools),
+            PlanejadorSimulado(args.latencia_base, args.latencia_por_mil),
+        )
+        print(f"Modelo simulado: {args.latencia_base}s + {args.latencia_por_mil}s/mil tokens por ida\n")
+
+    print(f"{'cenário':26s} {'modo':>6s} {'idas':>5s} {'tools':>6s} {'tokens prompt':>14s} {'segundos':>9s}")
+    totais = {modo: 0.0 for modo in MODOS}
+    for nome, turnos in cenarios.items():
+        resultados = {modo: medir(modo, nome, turnos, modelos, args.repeticoes) for modo in MODOS}
+        for modo, r in resultados.items():
+            totais[modo] += r["segundos"]
+            print(f"{nome:26s} {modo:>6s} {r['idas']:5d} {r['tools']:6d} {r['tokens_prompt']:14d} {r['segundos']:8.2f}s")
+        ganho = resultados["react"]["segundos"] / resultados["plano"]["segundos"]
+        print(f"{'':26s} {'':>6s} react/plano: {ganho:.2f}x\n")
+    print(f"total: react {totais['react']:.2f}s | plano {totais['plano']:.2f}s "
+          f"({totais['react'] / totais['plano']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
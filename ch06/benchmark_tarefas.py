@@ -0,0 +1,138 @@
+# /src/ch06/benchmark_tarefas.py
+# Compara o TAREFAS_DB original (dict de listas de dicts) com o
+# RepositorioTarefasMemoria indexado.
+# Uso: python benchmark_tarefas.py [total_tarefas] [usuarios]
+
+import gc
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import date
+
+from repositorio_tarefas import RepositorioTarefasMemoria
+
+TOTAL = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+USUARIOS = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+CONSULTAS = 20_000
+ESTADOS = ["pendente", "concluida"]
+
+
+def gerar_dados():
+    rng = random.Random(42)
+    for i in range(1, TOTAL + 1):
+        yield {
+            "id": i,
+            "usuario_id": rng.randrange(USUARIOS),
+            "titulo": f"Tarefa {i}",
+            "estado": rng.choice(ESTADOS),
+            "vencimento": date(2025, rng.randint(1, 12), rng.randint(1, 28)),
+        }
+
+
+def construir_original() -> dict[int, list[dict]]:
+    db: dict[int, list[dict]] = {}
+    for t in gerar_dados():
+        usuario_id = t.pop("usuario_id")
+        db.setdefault(usuario_id, []).append(t)
+    return db
+
+
+def medir(descricao: str, funcao):
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    duracao = time.perf_counter() - inicio
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{descricao:45s} {duracao:8.2f} s   {memoria / 1024 ** 2:8.1f} MiB")
+    return resultado
+
+
+def cronometrar(descricao: str, funcao, repeticoes: int) -> None:
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"{descricao:45s} {duracao / repeticoes * 1e6:8.2f} µs/op")
+
+
+def main():
+    print(f"=== {TOTAL:,} tarefas, {USUARIOS:,} usuários ===\n")
+    print("--- Construção e memória ---")
+    original = medir("original (dict de listas de dicts)", construir_original)
+    repositorio = medir("RepositorioTarefasMemoria (__slots__)",
+                        lambda: RepositorioTarefasMemoria(gerar_dados()))
+
+    rng = random.Random(7)
+    candidatos = list(original.keys())
+    alvos = []
+    for _ in range(CONSULTAS):
+        usuario_id = rng.choice(candidatos)
+        alvos.append((usuario_id, rng.choice(original[usuario_id])["id"]))
+
+    print("\n--- Busca por ID (concluir_tarefa) ---")
+
+    def buscar_original():
+        for usuario_id, tarefa_id in alvos:
+            for t in original[usuario_id]:
+                if t["id"] == tarefa_id:
+                    break
+
+    def buscar_repositorio():
+        for usuario_id, tarefa_id in alvos:
+            repositorio.obter(usuario_id, tarefa_id)
+
+    cronometrar("original (varredura da lista)", buscar_original, CONSULTAS)
+    cronometrar("repositório (índice por ID)", buscar_repositorio, CONSULTAS)
+
+    print("\n--- listar_tarefas(estado='pendente') ---")
+    usuarios = [u for u, _ in alvos]
+
+    def filtrar_original():
+        for usuario_id in usuarios:
+            [t for t in original.get(usuario_id, []) if t["estado"] == "pendente"]
+
+    def filtrar_repositorio():
+        for usuario_id in usuarios:
+            repositorio.listar(usuario_id, "pendente")
+
+    cronometrar("original (list comprehension)", filtrar_original, CONSULTAS)
+    cronometrar("repositório (índice por estado)", filtrar_repositorio, CONSULTAS)
+
+    print("\n--- Tarefas com vencimento até 31/01/2025 ---")
+    ate = date(2025, 1, 31)
+
+    def vencimento_original():
+        for usuario_id in usuarios:
+            sorted(
+                (t for t in original.get(usuario_id, []) if t["vencimento"] <= ate),
+                key=lambda t: t["vencimento"]
+            )
+
+    def vencimento_repositorio():
+        for usuario_id in usuarios:
+            repositorio.listar_por_vencimento(usuario_id, ate)
+
+    cronometrar("original (filtro + sort)", vencimento_original, CONSULTAS)
+    cronometrar("repositório (bisect no índice)", vencimento_repositorio, CONSULTAS)
+
+    print("\n--- Alocação de IDs concorrente (8 threads x 10.000 criações) ---")
+    ids: list[int] = []
+
+    def criar_varias():
+        criados = [repositorio.criar(0, "concorrente").id for _ in range(10_000)]
+        ids.extend(criados)
+
+    threads = [threading.Thread(target=criar_varias) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duplicados = len(ids) - len(set(ids))
+    print(f"IDs gerados: {len(ids):,}   duplicados: {duplicados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# /src/ch06/benchmark_tarefas_sqlite.py
+# Vários processos usando o mesmo banco SQLite de tarefas ao mesmo tempo.
+# Uso: python benchmark_tarefas_sqlite.py [operacoes_por_worker] [usuarios]
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from multiprocessing import Pool
+
+from repositorio_tarefas import RepositorioTarefasSQLite
+
+OPERACOES = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+USUARIOS = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+
+
+def worker(args: tuple[str, int]) -> tuple[int, list[int]]:
+    """Mistura de operações do agente: 40% criar, 20% concluir, 40% listar."""
+    caminho, semente = args
+    repositorio = RepositorioTarefasSQLite(caminho, tamanho_pool=1)
+    rng = random.Random(semente)
+    criadas: list[tuple[int, int]] = []
+    ids: list[int] = []
+
+    for i in range(OPERACOES):
+        usuario_id = rng.randrange(USUARIOS)
+        sorteio = rng.random()
+        if sorteio < 0.4 or not criadas:
+            tarefa = repositorio.criar(usuario_id, f"Tarefa {semente}-{i}", date(2025, rng.randint(1, 12), 1))
+            criadas.append((usuario_id, tarefa.id))
+            ids.append(tarefa.id)
+        elif sorteio < 0.6:
+            repositorio.concluir(*rng.choice(criadas))
+        else:
+            repositorio.listar(usuario_id, "pendente")
+
+    repositorio.fechar()
+    return OPERACOES, ids
+
+
+def rodar(workers: int) -> None:
+    caminho = os.path.join(tempfile.mkdtemp(), "tarefas.db")
+    RepositorioTarefasSQLite(caminho).fechar()
+
+    inicio = time.perf_counter()
+    with Pool(workers) as pool:
+        resultados = pool.map(worker, [(caminho, semente) for semente in range(workers)])
+    duracao = time.perf_counter() - inicio
+
+    total_ops = sum(ops for ops, _ in resultados)
+    ids = [i for _, lista in resultados for i in lista]
+    repositorio = RepositorioTarefasSQLite(caminho)
+    persistidas = len(repositorio)
+    repositorio.fechar()
+
+    status = "OK" if len(ids) == len(set(ids)) == persistidas else "FALHA"
+    print(f"{workers:2d} worker(s)  {total_ops:7,d} ops  {duracao:6.2f} s  "
+          f"{total_ops / duracao:9,.0f} ops/s  tarefas={persistidas:,}  [{status}]")
+
+
+def main():
+    print(f"=== {OPERACOES:,} operações por worker, {USUARIOS:,} usuários ===")
+    for workers in (1, 2, 4, 8):
+        rodar(workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,13 @@
 # Pratica conceitos dos capítulos 1, 2, 3, 5 e 6 do tutorial LangChain/LangGraph
 
 import os
+import time
 import sqlite3
 import operator
+from functools import partial
 from typing import TypedDict, Annotated, Literal, Optional
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage, AnyMessage
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
@@ -16,15 +17,33 @@ from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.runnables import RunnableConfig
 
+from orcamento import (
+    METRICAS, Orcamento, contabilizar_llm, contabilizar_tools,
+    encerrar_por_orcamento, verificar_orcamento, verificar_sessao
+)
+from planejar_executar import criar_grafo_plano, criar_planejador
+
+from comum.contabilidade import CONTABILIDADE
+from comum.lote_tools import invocar_tool_calls
+from comum.modelos import obter_modelo
+from comum.registro_tools import tools_por_nome, vincular_tools
+from comum.roteador_modelos import criar_roteador
+
 load_dotenv()
 
 # === CONFIGURAÇÃO DO BANCO DE DADOS ===
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "produtos.db")
 
+# Limites de alerta mantidos pelos triggers (ex: ESTOQUE_LIMITES_ALERTA=5,10).
+# Consultas com outros limites usam o índice de estoque e não gravam nada.
+LIMITES_ALERTA = tuple(
+    int(limite) for limite in os.getenv("ESTOQUE_LIMITES_ALERTA", "5,10").split(",") if limite.strip()
+)
+
 
 def inicializar_banco():
-    """Cria a tabela de produtos se não existir."""
+    """Cria a tabela de produtos, o log de movimentos e a visão de baixo estoque."""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("""
@@ -32,10 +51,90 @@ def inicializar_banco():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             nome TEXT NOT NULL,
             preco REAL NOT NULL,
-            estoque INTEGER NOT NULL
+            estoque INTEGER NOT NULL,
+            versao INTEGER NOT NULL DEFAULT 1
         )
     """)
+    # Bancos criados antes da coluna de versão (controle de concorrência otimista)
+    colunas = {linha[1] for linha in cursor.execute("PRAGMA table_info(produtos)")}
+    if "versao" not in colunas:
+        cursor.execute("ALTER TABLE produtos ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+    # Log append-only de toda alteração de estoque. É preenchido por triggers,
+    # então qualquer tool que mexa em `produtos.estoque` fica registrada.
+    # As tabelas `produtos_baixo_estoque` e `alertas_estoque` são mantidas
+    # incrementalmente para cada limite de LIMITES_ALERTA (tabela `limites_alerta`).
+    cursor.executescript("""
+        CREATE TABLE IF NOT EXISTS movimentos_estoque (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produto_id INTEGER NOT NULL,
+            operacao TEXT NOT NULL,
+            estoque_anterior INTEGER,
+            estoque_novo INTEGER,
+            criado_em TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_produtos_estoque ON produtos (estoque);
+
+        CREATE TABLE IF NOT EXISTS limites_alerta (
+            limite INTEGER PRIMARY KEY
+        );
+
+        CREATE TABLE IF NOT EXISTS produtos_baixo_estoque (
+            limite INTEGER NOT NULL,
+            produto_id INTEGER NOT NULL,
+            PRIMARY KEY (limite, produto_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS alertas_estoque (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produto_id INTEGER NOT NULL,
+            limite INTEGER NOT NULL,
+            estoque INTEGER NOT NULL,
+            criado_em TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_produtos_insert AFTER INSERT ON produtos
+        BEGIN
+            INSERT INTO movimentos_estoque (produto_id, operacao, estoque_anterior, estoque_novo)
+            VALUES (NEW.id, 'criacao', NULL, NEW.estoque);
+            INSERT INTO produtos_baixo_estoque (limite, produto_id)
+            SELECT limite, NEW.id FROM limites_alerta WHERE NEW.estoque < limite;
+            INSERT INTO alertas_estoque (produto_id, limite, estoque)
+            SELECT NEW.id, limite, NEW.estoque FROM limites_alerta WHERE NEW.estoque < limite;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_produtos_update_estoque
+        AFTER UPDATE OF estoque ON produtos
+        WHEN OLD.estoque != NEW.estoque
+        BEGIN
+            INSERT INTO movimentos_estoque (produto_id, operacao, estoque_anterior, estoque_novo)
+            VALUES (NEW.id, 'atualizacao', OLD.estoque, NEW.estoque);
+            DELETE FROM produtos_baixo_estoque
+            WHERE produto_id = NEW.id AND limite <= NEW.estoque;
+            INSERT OR IGNORE INTO produtos_baixo_estoque (limite, produto_id)
+            SELECT limite, NEW.id FROM limites_alerta WHERE NEW.estoque < limite;
+            INSERT INTO alertas_estoque (produto_id, limite, estoque)
+            SELECT NEW.id, limite, NEW.estoque FROM limites_alerta
+            WHERE NEW.estoque < limite AND OLD.estoque >= limite;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_produtos_delete AFTER DELETE ON produtos
+        BEGIN
+            INSERT INTO movimentos_estoque (produto_id, operacao, estoque_anterior, estoque_novo)
+            VALUES (OLD.id, 'exclusao', OLD.estoque, NULL);
+            DELETE FROM produtos_baixo_estoque WHERE produto_id = OLD.id;
+        END;
+    """)
+
+    # Sincroniza os limites mantidos com a configuração: limites removidos
+    # (ou gravados por versões que registravam toda consulta) deixam de
+    # custar trabalho aos triggers
+    marcadores = ", ".join("?" * len(LIMITES_ALERTA))
+    cursor.execute(f"DELETE FROM limites_alerta WHERE limite NOT IN ({marcadores})", LIMITES_ALERTA)
+    cursor.execute(f"DELETE FROM produtos_baixo_estoque WHERE limite NOT IN ({marcadores})", LIMITES_ALERTA)
     conn.commit()
+    for limite in LIMITES_ALERTA:
+        registrar_limite_alerta(conn, limite)
     conn.close()
 
 
@@ -44,6 +143,50 @@ def get_conexao():
     return sqlite3.connect(DB_PATH)
 
 
+def registrar_limite_alerta(conn: sqlite3.Connection, limite: int) -> None:
+    """Passa a manter a visão de baixo estoque para um limite de LIMITES_ALERTA.
+
+    A visão é populada uma única vez com um scan; depois disso os triggers
+    a mantêm atualizada a cada alteração de estoque.
+    """
+    cursor = conn.cursor()
+    cursor.execute("INSERT OR IGNORE INTO limites_alerta (limite) VALUES (?)", (limite,))
+    if cursor.rowcount:
+        cursor.execute(
+            "INSERT OR IGNORE INTO produtos_baixo_estoque (limite, produto_id) "
+            "SELECT ?, id FROM produtos WHERE estoque < ?",
+            (limite, limite)
+        )
+        conn.commit()
+
+
+def consumir_alertas_estoque(apos_id: int = 0, max_eventos: int = 100) -> list[tuple]:
+    """Retorna os eventos "cruzou abaixo do limite" gravados após `apos_id`.
+
+    O consumidor guarda o maior ID recebido e o repassa na próxima chamada,
+    lendo apenas os eventos novos, sem reescanear os produtos.
+
+    Returns:
+        Lista de tuplas (id, produto_id, nome, limite, estoque, criado_em).
+    """
+    conn = get_conexao()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT a.id, a.produto_id, p.nome, a.limite, a.estoque, a.criado_em
+        FROM alertas_estoque a
+        LEFT JOIN produtos p ON p.id = a.produto_id
+        WHERE a.id > ?
+        ORDER BY a.id
+        LIMIT ?
+        """,
+        (apos_id, max_eventos)
+    )
+    eventos = cursor.fetchall()
+    conn.close()
+    return eventos
+
+
 # === SCHEMAS PYDANTIC PARA VALIDAÇÃO (Cap 3) ===
 
 class ProdutoInput(BaseModel):
@@ -57,6 +200,10 @@ class AtualizarProdutoInput(BaseModel):
     nome: Optional[str] = Field(default=None, description="Novo nome (opcional)")
     preco: Optional[float] = Field(default=None, description="Novo preço (opcional)")
     estoque: Optional[int] = Field(default=None, description="Novo estoque (opcional)")
+    versao: Optional[int] = Field(
+        default=None,
+        description="Versão do produto lida em listar_produtos (opcional). Se informada, a atualização só é aplicada se o produto não mudou desde então."
+    )
 
 
 class AtualizarEstoqueNomeInput(BaseModel):
@@ -64,6 +211,16 @@ class AtualizarEstoqueNomeInput(BaseModel):
     novo_estoque: int = Field(description="Nova quantidade total em estoque")
 
 
+class AjustarEstoqueInput(BaseModel):
+    id: int = Field(description="ID do produto")
+    delta: int = Field(description="Quantidade a somar ao estoque (negativa para dar baixa)")
+
+
+class AjustarEstoqueNomeInput(BaseModel):
+    nome_produto: str = Field(description="Nome (ou parte do nome) do produto")
+    delta: int = Field(description="Quantidade a somar ao estoque (negativa para dar baixa)")
+
+
 class BaixoEstoqueInput(BaseModel):
     limite: int = Field(description="Quantidade limite. A ferramenta buscará produtos com estoque ESTRITAMENTE MENOR que este valor.")
 
@@ -108,11 +265,11 @@ def listar_produtos(filtro_nome: Optional[str] = None) -> str:
 
         if filtro_nome:
             cursor.execute(
-                "SELECT id, nome, preco, estoque FROM produtos WHERE nome LIKE ?",
+                "SELECT id, nome, preco, estoque, versao FROM produtos WHERE nome LIKE ?",
                 (f"%{filtro_nome}%",)
             )
         else:
-            cursor.execute("SELECT id, nome, preco, estoque FROM produtos")
+            cursor.execute("SELECT id, nome, preco, estoque, versao FROM produtos")
 
         produtos = cursor.fetchall()
         conn.close()
@@ -124,7 +281,7 @@ def listar_produtos(filtro_nome: Optional[str] = None) -> str:
 
         resultado = f"Encontrados {len(produtos)} produto(s):\n"
         for p in produtos:
-            resultado += f"\n[{p[0]}] {p[1]} - R$ {p[2]:.2f} ({p[3]} em estoque)"
+            resultado += f"\n[{p[0]}] {p[1]} - R$ {p[2]:.2f} ({p[3]} em estoque, versão {p[4]})"
 
         return resultado
     except Exception as e:
@@ -141,11 +298,25 @@ def listar_baixo_estoque(limite: int) -> str:
     try:
         conn = get_conexao()
         cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT id, nome, estoque FROM produtos WHERE estoque < ? ORDER BY estoque ASC",
-            (limite,)
-        )
+
+        if limite in LIMITES_ALERTA:
+            # Lê a visão materializada: custo proporcional ao número de resultados
+            cursor.execute(
+                """
+                SELECT p.id, p.nome, p.estoque
+                FROM produtos_baixo_estoque b
+                JOIN produtos p ON p.id = b.produto_id
+                WHERE b.limite = ?
+                ORDER BY p.estoque ASC
+                """,
+                (limite,)
+            )
+        else:
+            # Limite avulso: busca pelo índice de estoque, sem registrar o limite
+            cursor.execute(
+                "SELECT id, nome, estoque FROM produtos WHERE estoque < ? ORDER BY estoque ASC",
+                (limite,)
+            )
         
         produtos = cursor.fetchall()
         conn.close()
@@ -163,22 +334,16 @@ def listar_baixo_estoque(limite: int) -> str:
 
 
 @tool(args_schema=AtualizarProdutoInput)
-def atualizar_produto(id: int, nome: Optional[str] = None, preco: Optional[float] = None, estoque: Optional[int] = None) -> str:
+def atualizar_produto(id: int, nome: Optional[str] = None, preco: Optional[float] = None, estoque: Optional[int] = None, versao: Optional[int] = None) -> str:
     """Atualiza os dados de um produto existente usando o ID.
 
     Use esta ferramenta quando o usuário quiser modificar um produto e você JÁ SOUBER o ID dele.
+    Para somar ou subtrair unidades do estoque, prefira ajustar_estoque.
     """
     try:
         conn = get_conexao()
         cursor = conn.cursor()
 
-        # Verificar se produto existe
-        cursor.execute("SELECT nome FROM produtos WHERE id = ?", (id,))
-        produto = cursor.fetchone()
-        if not produto:
-            conn.close()
-            return f"Produto com ID {id} não encontrado."
-
         # Construir query de atualização
         campos = []
         valores = []
@@ -197,10 +362,29 @@ def atualizar_produto(id: int, nome: Optional[str] = None, preco: Optional[float
             conn.close()
             return "Nenhum campo para atualizar foi informado."
 
+        # Um único UPDATE: a existência (e a versão, se informada) é verificada
+        # no próprio WHERE, e a versão é incrementada a cada escrita.
+        campos.append("versao = versao + 1")
+        condicao = "id = ?"
         valores.append(id)
-        query = f"UPDATE produtos SET {', '.join(campos)} WHERE id = ?"
+        if versao is not None:
+            condicao += " AND versao = ?"
+            valores.append(versao)
+
+        query = f"UPDATE produtos SET {', '.join(campos)} WHERE {condicao} RETURNING versao"
         cursor.execute(query, valores)
+        linha = cursor.fetchone()
         conn.commit()
+
+        if not linha:
+            # Só consultamos de novo no caminho de falha, para explicar o motivo
+            cursor.execute("SELECT versao FROM produtos WHERE id = ?", (id,))
+            atual = cursor.fetchone()
+            conn.close()
+            if not atual:
+                return f"Produto com ID {id} não encontrado."
+            return (f"Conflito: o produto ID {id} foi alterado por outra sessão "
+                    f"(versão esperada {versao}, atual {atual[0]}). Consulte o produto novamente.")
         conn.close()
 
         atualizados = []
@@ -211,7 +395,7 @@ def atualizar_produto(id: int, nome: Optional[str] = None, preco: Optional[float
         if estoque is not None:
             atualizados.append(f"estoque={estoque}")
 
-        return f"Produto ID {id} atualizado! Novos valores: {', '.join(atualizados)}"
+        return f"Produto ID {id} atualizado (versão {linha[0]})! Novos valores: {', '.join(atualizados)}"
     except Exception as e:
         return f"Erro ao atualizar produto: {e}"
 
@@ -226,19 +410,27 @@ def atualizar_estoque_por_nome(nome_produto: str, novo_estoque: int) -> str:
     try:
         conn = get_conexao()
         cursor = conn.cursor()
-        
+
+        # Reserva a escrita antes da leitura para que ninguém altere o produto
+        # entre o SELECT e o UPDATE
+        cursor.execute("BEGIN IMMEDIATE")
+
         # Primeiro buscamos o produto para pegar o ID e confirmar o nome exato
         cursor.execute("SELECT id, nome, estoque FROM produtos WHERE nome LIKE ?", (f"%{nome_produto}%",))
         produto = cursor.fetchone()
         
         if not produto:
+            conn.rollback()
             conn.close()
             return f"Produto com nome similar a '{nome_produto}' não encontrado."
             
         prod_id, prod_nome_real, estoque_anterior = produto
         
         # Realizar a atualização
-        cursor.execute("UPDATE produtos SET estoque = ? WHERE id = ?", (novo_estoque, prod_id))
+        cursor.execute(
+            "UPDATE produtos SET estoque = ?, versao = versao + 1 WHERE id = ?",
+            (novo_estoque, prod_id)
+        )
         conn.commit()
         conn.close()
         
@@ -250,6 +442,87 @@ def atualizar_estoque_por_nome(nome_produto: str, novo_estoque: int) -> str:
         return f"Erro ao atualizar estoque por nome: {e}"
 
 
+@tool(args_schema=AjustarEstoqueInput)
+def ajustar_estoque(id: int, delta: int) -> str:
+    """Soma (ou subtrai, com delta negativo) unidades ao estoque de um produto pelo ID.
+
+    Use esta ferramenta para entradas e saídas de estoque ("chegaram 10", "vendi 3").
+    A operação é atômica e nunca deixa o estoque negativo.
+    """
+    try:
+        conn = get_conexao()
+        cursor = conn.cursor()
+
+        # Ajuste relativo em um único comando, com a guarda contra estoque negativo
+        cursor.execute(
+            """
+            UPDATE produtos SET estoque = estoque + ?, versao = versao + 1
+            WHERE id = ? AND estoque + ? >= 0
+            RETURNING nome, estoque
+            """,
+            (delta, id, delta)
+        )
+        linha = cursor.fetchone()
+        conn.commit()
+
+        if not linha:
+            cursor.execute("SELECT nome, estoque FROM produtos WHERE id = ?", (id,))
+            produto = cursor.fetchone()
+            conn.close()
+            if not produto:
+                return f"Produto com ID {id} não encontrado."
+            return (f"Estoque insuficiente: '{produto[0]}' tem {produto[1]} unidade(s), "
+                    f"não é possível retirar {-delta}.")
+        conn.close()
+
+        nome, estoque = linha
+        return f"Estoque de '{nome}' (ID {id}) ajustado em {delta:+d}. Estoque atual: {estoque}"
+    except Exception as e:
+        return f"Erro ao ajustar estoque: {e}"
+
+
+@tool(args_schema=AjustarEstoqueNomeInput)
+def ajustar_estoque_por_nome(nome_produto: str, delta: int) -> str:
+    """Soma (ou subtrai, com delta negativo) unidades ao estoque de um produto pelo nome.
+
+    Use esta ferramenta para entradas e saídas de estoque quando o usuário fornecer o nome
+    em vez do ID. Se houver nomes duplicados, ajustará o primeiro encontrado.
+    """
+    try:
+        conn = get_conexao()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            UPDATE produtos SET estoque = estoque + ?, versao = versao + 1
+            WHERE id = (SELECT id FROM produtos WHERE nome LIKE ? ORDER BY id LIMIT 1)
+              AND estoque + ? >= 0
+            RETURNING id, nome, estoque
+            """,
+            (delta, f"%{nome_produto}%", delta)
+        )
+        linha = cursor.fetchone()
+        conn.commit()
+
+        if not linha:
+            cursor.execute(
+                "SELECT nome, estoque FROM produtos WHERE nome LIKE ? ORDER BY id LIMIT 1",
+                (f"%{nome_produto}%",)
+            )
+            produto = cursor.fetchone()
+            conn.close()
+            if not produto:
+                return f"Produto com nome similar a '{nome_produto}' não encontrado."
+            return (f"Estoque insuficiente: '{produto[0]}' tem {produto[1]} unidade(s), "
+                    f"não é possível retirar {-delta}.")
+        conn.close()
+
+        prod_id, nome, estoque = linha
+        return f"Estoque de '{nome}' (ID {prod_id}) ajustado em {delta:+d}. Estoque atual: {estoque}"
+    except Exception as e:
+        return f"Erro ao ajustar estoque por nome: {e}"
+
+
 @tool
 def excluir_produto(id: int) -> str:
     """Exclui um produto do cadastro.
@@ -290,10 +563,12 @@ ALL_TOOLS = [
     atualizar_produto, 
     excluir_produto,
     atualizar_estoque_por_nome, # Nova tool
-    listar_baixo_estoque        # Nova tool
+    listar_baixo_estoque,       # Nova tool
+    ajustar_estoque,
+    ajustar_estoque_por_nome
 ]
 
-TOOLS_BY_NAME = {t.name: t for t in ALL_TOOLS}
+TOOLS_BY_NAME = tools_por_nome(ALL_TOOLS)
 
 # Prompt do sistema atualizado com as novas capacidades
 SYSTEM_PROMPT = """Você é um assistente de gestão de estoque de produtos.
@@ -303,6 +578,7 @@ SYSTEM_PROMPT = """Você é um assistente de gestão de estoque de produtos.
 - Listar produtos cadastrados (com filtro opcional por nome)
 - Buscar produtos com BAIXO ESTOQUE (abaixo de um valor X)
 - Atualizar dados de produtos (pelo ID ou atualizando estoque pelo NOME)
+- Dar entrada ou baixa no estoque (somar/subtrair unidades, pelo ID ou pelo NOME)
 - Excluir produtos do cadastro
 
 ## Instruções
@@ -317,6 +593,7 @@ SYSTEM_PROMPT = """Você é um assistente de gestão de estoque de produtos.
 - "Cadastre um notebook por R$ 2500 com 10 unidades"
 - "Quais produtos tem menos de 5 unidades?"
 - "Atualize o estoque do 'iPhone' para 50 unidades"
+- "Vendi 3 unidades do notebook" (use ajustar_estoque_por_nome com delta -3)
 - "Liste todos os produtos"
 - "Exclua o produto 5"
 """
@@ -326,15 +603,31 @@ SYSTEM_PROMPT = """Você é um assistente de gestão de estoque de produtos.
 
 class AgentState(TypedDict):
     messages: Annotated[list[AnyMessage], operator.add]
+    # Consumo do turno atual (ver orcamento.py)
+    chamadas_llm: int
+    chamadas_tools: int
+    tokens: int
+    inicio_turno: float
 
 
 # === CONFIGURAR MODELO ===
 
-modelo = ChatGoogleGenerativeAI(
-    model=os.getenv("GOOGLE_MODEL", "gemini-2.5-flash"),
-    temperature=0
-)
-modelo_com_tools = modelo.bind_tools(ALL_TOOLS)
+modelo = obter_modelo("gemini-2.5-flash", temperature=0)
+# Modelo escolhido a cada turno entre os níveis leve e forte, com fallback
+# entre eles (ver comum/roteador_modelos.py). Com ROTEADOR_ATIVO=0 todo turno
+# usa o nível "forte" (GOOGLE_MODEL ou gemini-2.5-flash). Tokens de cada resposta somados por
+# sessão (thread_id), nó e tool.
+def preparar_modelo(modelo):
+    """Modelo de um nível do roteador: tools vinculadas e contabilidade de tokens."""
+    return vincular_tools(modelo, ALL_TOOLS).with_config(callbacks=[CONTABILIDADE])
+
+
+ROTEADOR = criar_roteador("forte", preparar_modelo, temperature=0)
+modelo_com_tools = ROTEADOR
+# Modo "plano": uma chamada produz todos os passos (ver planejar_executar.py)
+planejador = criar_planejador(modelo)
+
+ORCAMENTO = Orcamento.do_ambiente()
 
 
 # === NÓS DO GRAFO (Cap 6) ===
@@ -347,8 +640,9 @@ def no_llm(state: AgentState) -> dict:
     if not messages or not isinstance(messages[0], SystemMessage):
         messages = [SystemMessage(content=SYSTEM_PROMPT)] + messages
 
+    inicio = time.time()
     response = modelo_com_tools.invoke(messages)
-    return {"messages": [response]}
+    return {"messages": [response], **contabilizar_llm(state, response, inicio)}
 
 
 def no_tools(state: AgentState) -> dict:
@@ -361,50 +655,84 @@ def no_tools(state: AgentState) -> dict:
     if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
         return {"messages": []}
 
-    for tool_call in last_message.tool_calls:
-        try:
-            result = TOOLS_BY_NAME[tool_call["name"]].invoke(tool_call["args"])
-        except Exception as e:
-            result = f"Erro ao executar {tool_call['name']}: {e}"
-
+    # Chamadas seguidas à mesma tool são validadas e executadas em lote
+    resultados = invocar_tool_calls(TOOLS_BY_NAME, last_message.tool_calls)
+    for tool_call, result in zip(last_message.tool_calls, resultados):
         tool_messages.append(ToolMessage(
-            content=str(result),
+            content=result,
             tool_call_id=tool_call["id"]
         ))
 
-    return {"messages": tool_messages}
+    return {"messages": tool_messages, **contabilizar_tools(state, len(tool_messages))}
+
 
+def no_orcamento_esgotado(state: AgentState, orcamento: Orcamento = ORCAMENTO) -> dict:
+    """Nó que encerra o turno com uma resposta amigável quando o orçamento estoura."""
+    motivo = verificar_orcamento(state, orcamento, CONTABILIDADE.tokens_sessao_atual()) or "limite"
+    METRICAS.registrar_turno(state, motivo)
+    return {"messages": encerrar_por_orcamento(state["messages"], motivo)}
 
-def rotear(state: AgentState) -> Literal["tools", "__end__"]:
-    """Decide se deve executar tools ou finalizar."""
+
+def rotear(state: AgentState, orcamento: Orcamento = ORCAMENTO) -> Literal["tools", "orcamento", "__end__"]:
+    """Decide se deve executar tools, encerrar por orçamento ou finalizar."""
     messages = state["messages"]
     last_message = messages[-1]
 
     # Verificar se é AIMessage com tool_calls
     if isinstance(last_message, AIMessage) and last_message.tool_calls:
+        if verificar_orcamento(state, orcamento, CONTABILIDADE.tokens_sessao_atual()):
+            return "orcamento"
         return "tools"
 
+    METRICAS.registrar_turno(state)
     return "__end__"
 
 
+def iniciar_turno(state: AgentState, orcamento: Orcamento = ORCAMENTO) -> Literal["llm", "orcamento"]:
+    """Recusa o turno sem chamar o LLM se a sessão já gastou o orçamento de tokens."""
+    if verificar_sessao(orcamento, CONTABILIDADE.tokens_sessao_atual()):
+        return "orcamento"
+    return "llm"
+
+
 # === CONSTRUIR E COMPILAR O GRAFO (Cap 6) ===
 
-def criar_agente():
-    """Cria e retorna o agente compilado com checkpointer."""
+def criar_agente(orcamento: Optional[Orcamento] = None, modo: str = "react"):
+    """Cria e retorna o agente compilado com checkpointer.
+
+    Args:
+        orcamento: Limites por turno. Padrão: lidos das variáveis AGENTE_MAX_*.
+        modo: "react" (uma ida ao LLM por passo) ou "plano" (planeja todos os
+            passos em uma chamada e executa os independentes em paralelo).
+    """
+    orcamento = orcamento or ORCAMENTO
+    if modo == "plano":
+        return criar_grafo_plano(
+            planejador, modelo_com_tools, ALL_TOOLS, SYSTEM_PROMPT, orcamento, checkpointer=MemorySaver()
+        )
+    if modo != "react":
+        raise ValueError(f"Modo desconhecido: {modo} (use 'react' ou 'plano')")
+
     graph = StateGraph(AgentState)
 
     # Adicionar nós
     graph.add_node("llm", no_llm)
     graph.add_node("tools", no_tools)
+    graph.add_node("orcamento", partial(no_orcamento_esgotado, orcamento=orcamento))
 
     # Adicionar arestas
-    graph.add_edge(START, "llm")
+    graph.add_conditional_edges(
+        START,
+        partial(iniciar_turno, orcamento=orcamento),
+        {"llm": "llm", "orcamento": "orcamento"}
+    )
     graph.add_conditional_edges(
         "llm",
-        rotear,
-        {"tools": "tools", "__end__": END}
+        partial(rotear, orcamento=orcamento),
+        {"tools": "tools", "orcamento": "orcamento", "__end__": END}
     )
     graph.add_edge("tools", "llm")
+    graph.add_edge("orcamento", END)
 
     # Compilar com checkpointer para persistência de sessão
     checkpointer = MemorySaver()
@@ -417,8 +745,9 @@ def main():
     # Inicializar banco de dados
     inicializar_banco()
 
-    # Criar agente
-    agente = criar_agente()
+    # Criar agente (AGENTE_MODO=plano para o modo planejar e executar)
+    agente = criar_agente(modo=os.getenv("AGENTE_MODO", "react"))
+    CONTABILIDADE.iniciar_exportacao()
 
     # Configuração da thread para persistência
     config: RunnableConfig = {"configurable": {"thread_id": "sessao-produtos"}}
@@ -429,35 +758,42 @@ def main():
     print("Comandos: 'sair' para encerrar, 'limpar' para nova sessão")
     print("-" * 50)
 
-    while True:
-        try:
-            entrada = input("\nVocê: ").strip()
-        except (KeyboardInterrupt, EOFError):
-            print("\n\nEncerrando...")
-            break
-
-        if not entrada:
-            continue
-
-        if entrada.lower() == "sair":
-            print("Até logo!")
-            break
-
-        if entrada.lower() == "limpar":
-            # Criar nova sessão
-            config: RunnableConfig = {"configurable": {"thread_id": f"sessao-{os.urandom(4).hex()}"}}
-            print("Sessão limpa! Iniciando nova conversa.")
-            continue
-
-        # Invocar agente
-        resultado = agente.invoke(
-            {"messages": [HumanMessage(content=entrada)]},
-            config=config
-        )
+    # Métricas gravadas em qualquer saída ('sair', EOF, Ctrl-C ou erro)
+    try:
+        while True:
+            try:
+                entrada = input("\nVocê: ").strip()
+            except (KeyboardInterrupt, EOFError):
+                print("\n\nEncerrando...")
+                break
+
+            if not entrada:
+                continue
+
+            if entrada.lower() == "sair":
+                print("Até logo!")
+                break
+
+            if entrada.lower() == "limpar":
+                # Criar nova sessão; a anterior não volta a ser usada
+                CONTABILIDADE.encerrar_sessao(config["configurable"]["thread_id"])
+                config: RunnableConfig = {"configurable": {"thread_id": f"sessao-{os.urandom(4).hex()}"}}
+                print("Sessão limpa! Iniciando nova conversa.")
+                continue
+
+            # Invocar agente
+            resultado = agente.invoke(
+                {"messages": [HumanMessage(content=entrada)]},
+                config=config
+            )
 
-        # Exibir resposta
-        resposta = resultado["messages"][-1].content
-        print(f"\nAssistente: {resposta}")
+            # Exibir resposta
+            resposta = resultado["messages"][-1].content
+            print(f"\nAssistente: {resposta}")
+    finally:
+        METRICAS.exportar()
+        ROTEADOR.metricas.exportar()
+        CONTABILIDADE.parar_exportacao()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+# /src/ch06/executar_lote.py
+# Executa milhares de pedidos independentes pelo agente de agente_react_completo.py.
+#
+# Entrada (JSONL): {"id": "...", "usuario_id": 1, "mensagem": "..."}
+# Saída   (JSONL): {"id": "...", "usuario_id": 1, "ok": true, "resposta": "..."}
+#                  {"id": "...", "usuario_id": 1, "ok": false, "erro": "..."}
+#
+# A saída é gravada ao fim de cada bloco; ao rodar de novo com o mesmo arquivo
+# de saída, os pedidos já concluídos com sucesso são pulados (falhas são refeitas).
+#
+# Uso:
+#   python executar_lote.py pedidos.jsonl respostas.jsonl --concorrencia 16
+#   python executar_lote.py --gerar 2000 pedidos.jsonl respostas.jsonl --latencia-simulada 0.5
+
+import argparse
+import json
+import os
+import random
+import time
+from typing import Iterator
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+import agente_react_completo as agente
+
+
+def ler_pedidos(caminho: str) -> Iterator[dict]:
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def ids_concluidos(caminho_saida: str) -> set[str]:
+    """IDs que já têm resposta com sucesso no arquivo de saída."""
+    if not os.path.exists(caminho_saida):
+        return set()
+    concluidos = set()
+    with open(caminho_saida, encoding="utf-8") as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                continue  # linha truncada por uma interrupção
+            if registro.get("ok"):
+                concluidos.add(str(registro["id"]))
+    return concluidos
+
+
+def executar_lote(grafo, pedidos: list[dict], concorrencia: int) -> list[dict]:
+    """Roda um bloco de pedidos com `batch`, sem deixar uma falha derrubar o bloco."""
+    entradas = [{"messages": [HumanMessage(content=p["mensagem"])]} for p in pedidos]
+    # thread_id por pedido: cada pedido é uma sessão na contabilidade e no max_tokens_sessao
+    configs = [
+        {
+            "configurable": {"usuario_id": p.get("usuario_id", 1), "thread_id": f"lote-{p['id']}"},
+            "max_concurrency": concorrencia,
+        }
+        for p in pedidos
+    ]
+    resultados = grafo.batch(entradas, configs, return_exceptions=True)
+
+    registros = []
+    for pedido, resultado in zip(pedidos, resultados):
+        registro = {"id": pedido["id"], "usuario_id": pedido.get("usuario_id", 1)}
+        if isinstance(resultado, Exception):
+            registro.update(ok=False, erro=f"{type(resultado).__name__}: {resultado}")
+        else:
+            registro.update(ok=True, resposta=resultado["messages"][-1].content)
+        registros.append(registro)
+    return registros
+
+
+def processar_arquivo(grafo, caminho_entrada: str, caminho_saida: str,
+                      concorrencia: int = 8, tamanho_bloco: int = 200) -> dict:
+    concluidos = ids_concluidos(caminho_saida)
+    pedidos = list(ler_pedidos(caminho_entrada))
+    pendentes = [p for p in pedidos if str(p["id"]) not in concluidos]
+
+    # Só os pedidos desta entrada que já tinham resposta (a saída pode ter outros)
+    estatisticas = {"pulados": len(pedidos) - len(pendentes), "ok": 0, "falhas": 0}
+    inicio = time.perf_counter()
+    with open(caminho_saida, "a", encoding="utf-8") as saida:
+        for i in range(0, len(pendentes), tamanho_bloco):
+            registros = executar_lote(grafo, pendentes[i:i + tamanho_bloco], concorrencia)
+            for registro in registros:
+                saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                estatisticas["ok" if registro["ok"] else "falhas"] += 1
+            saida.flush()
+            feitos = i + len(registros)
+            print(f"  {feitos}/{len(pendentes)} pedidos ({feitos / (time.perf_counter() - inicio):.1f}/s)")
+
+    estatisticas["segundos"] = time.perf_counter() - inicio
+    processados = estatisticas["ok"] + estatisticas["falhas"]
+    estatisticas["pedidos_por_segundo"] = processados / estatisticas["segundos"] if processados else 0.0
+    return estatisticas
+
+
+# === SIMULAÇÃO (sem chamar a API) ===
+
+class ModeloSimulado:
+    """Substitui o LLM com latência fixa e uma taxa de falhas, para medir o executor."""
+
+    def __init__(self, latencia: float, taxa_falha: float = 0.0):
+        self.latencia = latencia
+        self.taxa_falha = taxa_falha
+
+    def invoke(self, messages):
+        time.sleep(self.latencia)
+        if random.random() < self.taxa_falha:
+            raise TimeoutError("falha simulada do provedor")
+        return AIMessage(content=f"Resposta para: {messages[-1].content}")
+
+
+def gerar_pedidos(caminho: str, quantidade: int, usuarios: int = 100) -> None:
+    with open(caminho, "w", encoding="utf-8") as f:
+        for i in range(quantidade):
+            pedido = {"id": f"p{i}", "usuario_id": i % usuarios, "mensagem": f"Liste minhas tarefas ({i})"}
+            f.write(json.dumps(pedido, ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa pedidos em lote pelo agente ReAct.")
+    parser.add_argument("entrada")
+    parser.add_argument("saida")
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--bloco", type=int, default=200, help="Pedidos gravados por vez")
+    parser.add_argument("--gerar", type=int, help="Gera N pedidos de exemplo no arquivo de entrada")
+    parser.add_argument("--latencia-simulada", type=float,
+                        help="Usa um modelo simulado com esta latência (s) em vez da API")
+    parser.add_argument("--taxa-falha", type=float, default=0.0,
+                        help="Fração de chamadas simuladas que falham")
+    args = parser.parse_args()
+
+    if args.gerar:
+        gerar_pedidos(args.entrada, args.gerar)
+    if args.latencia_simulada is not None:
+        agente.modelo_com_tools = ModeloSimulado(args.latencia_simulada, args.taxa_falha)
+
+    grafo = agente.create_agent()
+    print(f"=== Executando {args.entrada} (concorrência {args.concorrencia}) ===")
+    estatisticas = processar_arquivo(grafo, args.entrada, args.saida, args.concorrencia, args.bloco)
+    print(f"\nOK: {estatisticas['ok']}  Falhas: {estatisticas['falhas']}  "
+          f"Pulados (já concluídos): {estatisticas['pulados']}")
+    print(f"Tempo: {estatisticas['segundos']:.1f} s  Vazão: {estatisticas['pedidos_por_segundo']:.1f} pedidos/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,92 @@
 # /src/ch06/grafo_contador.py
-from typing import TypedDict, Literal
+import operator
+from collections.abc import Iterable, Sequence
+from functools import partial
+from itertools import islice
+from typing import TypedDict, Annotated, Literal
 from langgraph.graph import StateGraph, START, END
 
 # 1. Definir estado
+
+class Historico(Sequence):
+    """Histórico imutável: uma visão dos primeiros `tamanho` itens de uma lista
+    só de acréscimo, compartilhada entre as versões.
+
+    Com `Annotated[list, operator.add]` o reducer monta `atual + novos` a cada
+    passo, copiando o histórico inteiro: O(n²) em um laço de n passos. Aqui
+    anexar estende a lista compartilhada e devolve uma visão maior, O(1)
+    amortizado. Nenhuma versão altera os próprios itens, então estados de
+    passos anteriores (stream, snapshots) não mudam.
+    """
+
+    __slots__ = ("_itens", "_tamanho")
+
+    def __init__(self, itens: Iterable = ()):
+        self._itens = list(itens)
+        self._tamanho = len(self._itens)
+
+    @classmethod
+    def _visao(cls, itens: list, tamanho: int) -> "Historico":
+        novo = cls.__new__(cls)
+        novo._itens = itens
+        novo._tamanho = tamanho
+        return novo
+
+    def anexar(self, novos: Iterable) -> "Historico":
+        novos = list(novos)
+        if not novos:
+            return self
+        fim = self._tamanho + len(novos)
+        itens = self._itens
+        if len(itens) != self._tamanho:
+            # O LangGraph aplica a mesma escrita em cópias dos canais: se a
+            # lista já continua com estes mesmos itens, só a visão cresce
+            if len(itens) >= fim and all(a is b for a, b in zip(islice(itens, self._tamanho, fim), novos)):
+                return self._visao(itens, fim)
+            # Outra versão anexou itens diferentes a partir daqui: lista própria
+            itens = itens[:self._tamanho]
+        itens.extend(novos)
+        return self._visao(itens, fim)
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._itens[i] for i in range(self._tamanho)[indice]]
+        return self._itens[range(self._tamanho)[indice]]
+
+    def __iter__(self):
+        return islice(self._itens, self._tamanho)
+
+    def __eq__(self, outro) -> bool:
+        if not isinstance(outro, Sequence) or isinstance(outro, str):
+            return NotImplemented
+        return len(self) == len(outro) and all(a == b for a, b in zip(self, outro))
+
+    def __repr__(self) -> str:
+        return f"Historico({list(self)!r})"
+
+
+def anexar_historico(atual: Sequence, novos: Iterable) -> Historico:
+    """Reducer do histórico: acrescenta `novos` sem copiar o que já existe."""
+    if not isinstance(atual, Historico):
+        atual = Historico(atual)
+    return atual.anexar(novos)
+
+
 class ContadorState(TypedDict):
+    valor: int
+    # Os nós devolvem só os itens novos; o reducer junta ao histórico
+    historico: Annotated[Historico, anexar_historico]
+
+
+class ContadorStateOperadorAdd(TypedDict):
+    valor: int
+    historico: Annotated[list[str], operator.add]
+
+
+class ContadorStateCopia(TypedDict):
     valor: int
     historico: list[str]
 
@@ -13,46 +96,78 @@ def incrementar(state: ContadorState) -> dict:
     novo_valor = state["valor"] + 1
     return {
         "valor": novo_valor,
-        "historico": state["historico"] + [f"Incrementado para {novo_valor}"]
+        "historico": [f"Incrementado para {novo_valor}"]
     }
 
 def verificar(state: ContadorState) -> dict:
     """Apenas passa pelo nó de verificação."""
+    return {"historico": ["Verificando..."]}
+
+# Versão sem reducer: cada nó devolve o histórico inteiro, copiado a cada passo
+def incrementar_copiando(state: ContadorStateCopia) -> dict:
+    novo_valor = state["valor"] + 1
+    return {
+        "valor": novo_valor,
+        "historico": state["historico"] + [f"Incrementado para {novo_valor}"]
+    }
+
+def verificar_copiando(state: ContadorStateCopia) -> dict:
     return {"historico": state["historico"] + ["Verificando..."]}
 
 # 3. Função de decisão
-def deve_continuar(state: ContadorState) -> Literal["continuar", "parar"]:
-    if state["valor"] < 3:
+def deve_continuar(state: ContadorState, limite: int = 3) -> Literal["continuar", "parar"]:
+    if state["valor"] < limite:
         return "continuar"
     return "parar"
 
 # 4. Construir grafo
-grafo = StateGraph(ContadorState)
-
-# Adicionar nós
-grafo.add_node("incrementar", incrementar)
-grafo.add_node("verificar", verificar)
-
-# Adicionar arestas
-grafo.add_edge(START, "incrementar")
-grafo.add_edge("incrementar", "verificar")
-grafo.add_conditional_edges(
-    "verificar",
-    deve_continuar,
-    {
-        "continuar": "incrementar",  # Loop!
-        "parar": END
-    }
-)
 
-# 5. Compilar
-app = grafo.compile()
+# modo -> (estado, nó incrementar, nó verificar)
+MODOS = {
+    "anexar": (ContadorState, incrementar, verificar),
+    "operator_add": (ContadorStateOperadorAdd, incrementar, verificar),
+    "copia": (ContadorStateCopia, incrementar_copiando, verificar_copiando),
+}
+
+
+def criar_grafo(limite: int = 3, modo: str = "anexar"):
+    """Grafo compilado que dá `limite` voltas em incrementar -> verificar."""
+    estado, no_incrementar, no_verificar = MODOS[modo]
+    grafo = StateGraph(estado)
+
+    # Adicionar nós
+    # input_schema explícito: incrementar/verificar servem a mais de um estado
+    grafo.add_node("incrementar", no_incrementar, input_schema=estado)
+    grafo.add_node("verificar", no_verificar, input_schema=estado)
+
+    # Adicionar arestas
+    grafo.add_edge(START, "incrementar")
+    grafo.add_edge("incrementar", "verificar")
+    grafo.add_conditional_edges(
+        "verificar",
+        partial(deve_continuar, limite=limite),
+        {
+            "continuar": "incrementar",  # Loop!
+            "parar": END
+        }
+    )
+
+    # 5. Compilar
+    return grafo.compile()
+
+
+def config_execucao(limite: int) -> dict:
+    """Cada volta são 2 supersteps; o recursion_limit padrão (25) para em 12 voltas."""
+    return {"recursion_limit": 2 * limite + 10}
+
 
 # 6. Executar
-estado_inicial = {"valor": 0, "historico": ["Início"]}
-resultado = app.invoke(estado_inicial)
+if __name__ == "__main__":
+    app = criar_grafo()
+    estado_inicial = {"valor": 0, "historico": ["Início"]}
+    resultado = app.invoke(estado_inicial, config=config_execucao(3))
 
-print(f"Valor final: {resultado['valor']}")
-print("Histórico:")
-for item in resultado["historico"]:
-    print(f"  - {item}")
\ No newline at end of file
+    print(f"Valor final: {resultado['valor']}")
+    print("Histórico:")
+    for item in resultado["historico"]:
+        print(f"  - {item}")
@@ -0,0 +1,107 @@
+# /src/ch06/lembretes.py
+# Agendador de lembretes de vencimento para o repositório de tarefas
+
+import heapq
+import threading
+from datetime import datetime, time, timedelta
+from typing import Callable, Optional
+
+from repositorio_tarefas import Tarefa
+
+
+class AgendadorLembretes:
+    """Emite um lembrete quando chega a hora de cada tarefa pendente vencer.
+
+    Mantém um heap global de (momento do lembrete, tarefa). A thread dorme até
+    o lembrete mais próximo (ou até uma tarefa nova entrar no heap) e nunca
+    percorre o conjunto de tarefas: cada lembrete custa O(log n).
+
+    Tarefas criadas por outros processos (repositório SQLite compartilhado)
+    só entram no heap na próxima chamada a `carregar`.
+
+    Ao carregar, as tarefas cujo lembrete já passou não disparam uma a uma:
+    vão juntas para `ao_lembrar_atrasadas` (se informado) ou são ignoradas.
+    """
+
+    def __init__(
+        self,
+        repositorio,
+        ao_lembrar: Callable[[Tarefa], None],
+        antecedencia: timedelta = timedelta(days=1),
+        hora: time = time(9, 0),
+        relogio: Callable[[], datetime] = datetime.now,
+        ao_lembrar_atrasadas: Optional[Callable[[list[Tarefa]], None]] = None,
+    ):
+        self.repositorio = repositorio
+        self.ao_lembrar = ao_lembrar
+        self.ao_lembrar_atrasadas = ao_lembrar_atrasadas
+        self.antecedencia = antecedencia
+        self.hora = hora
+        self.relogio = relogio
+        self._heap: list[tuple[datetime, int, int]] = []
+        self._condicao = threading.Condition()
+        self._parar = False
+        self._thread: Optional[threading.Thread] = None
+
+    def momento_lembrete(self, tarefa: Tarefa) -> datetime:
+        return datetime.combine(tarefa.vencimento, self.hora) - self.antecedencia
+
+    def agendar(self, tarefa: Tarefa) -> None:
+        if tarefa.vencimento is None or tarefa.estado != "pendente":
+            return
+        with self._condicao:
+            heapq.heappush(self._heap, (self.momento_lembrete(tarefa), tarefa.id, tarefa.usuario_id))
+            # Acorda a thread caso o novo lembrete seja o mais próximo
+            self._condicao.notify()
+
+    def carregar(self) -> None:
+        """Agenda as tarefas pendentes que já existem no repositório."""
+        agora = self.relogio()
+        atrasadas = []
+        for tarefa in self.repositorio.pendentes_com_vencimento():
+            if self.momento_lembrete(tarefa) <= agora:
+                atrasadas.append(tarefa)
+            else:
+                self.agendar(tarefa)
+        if atrasadas and self.ao_lembrar_atrasadas:
+            try:
+                self.ao_lembrar_atrasadas(sorted(atrasadas, key=lambda t: t.vencimento))
+            except Exception as e:
+                print(f"Erro ao emitir lembrete de {len(atrasadas)} tarefa(s) atrasada(s): {e}")
+
+    def iniciar(self) -> "AgendadorLembretes":
+        self.carregar()
+        self.repositorio.ao_criar(self.agendar)
+        self._thread = threading.Thread(target=self._executar, name="agendador-lembretes", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify()
+        if self._thread:
+            self._thread.join()
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._parar:
+                    if not self._heap:
+                        self._condicao.wait()
+                        continue
+                    espera = (self._heap[0][0] - self.relogio()).total_seconds()
+                    if espera <= 0:
+                        break
+                    self._condicao.wait(timeout=espera)
+                if self._parar:
+                    return
+                _, tarefa_id, usuario_id = heapq.heappop(self._heap)
+
+            # Ignora tarefas concluídas depois de agendadas
+            tarefa = self.repositorio.obter(usuario_id, tarefa_id)
+            if tarefa is not None and tarefa.estado == "pendente":
+                try:
+                    self.ao_lembrar(tarefa)
+                except Exception as e:
+                    print(f"Erro ao emitir lembrete da tarefa {tarefa_id}: {e}")
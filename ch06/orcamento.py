@@ -0,0 +1,201 @@
+# /src/ch06/orcamento.py
+# Orçamento por turno (chamadas ao LLM, chamadas de tools, tempo e tokens)
+# compartilhado pelos agentes ReAct do capítulo 6.
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, AnyMessage
+
+MENSAGEM_ORCAMENTO_ESGOTADO = (
+    "Desculpe, não consegui concluir este pedido dentro do limite de processamento "
+    "({motivo}). Tente dividi-lo em pedidos menores ou reformulá-lo."
+)
+
+DESCRICAO_MOTIVOS = {
+    "chamadas_llm": "número de consultas ao modelo",
+    "chamadas_tools": "número de ferramentas executadas",
+    "tokens": "volume de tokens",
+    "tempo": "tempo de resposta",
+    "sessao": "volume de tokens desta sessão",
+}
+
+
+@dataclass(frozen=True)
+class Orcamento:
+    """Limites de um turno (uma mensagem do usuário até a resposta final)."""
+    max_chamadas_llm: int = 8
+    max_chamadas_tools: int = 16
+    max_segundos: float = 60.0
+    max_tokens: int = 50_000
+    # Tokens da sessão inteira (thread_id), somados pela contabilidade; 0 = sem limite
+    max_tokens_sessao: int = 0
+
+    @classmethod
+    def do_ambiente(cls) -> "Orcamento":
+        """Lê os limites das variáveis AGENTE_MAX_*, usando os padrões se ausentes."""
+        return cls(
+            max_chamadas_llm=int(os.getenv("AGENTE_MAX_CHAMADAS_LLM", cls.max_chamadas_llm)),
+            max_chamadas_tools=int(os.getenv("AGENTE_MAX_CHAMADAS_TOOLS", cls.max_chamadas_tools)),
+            max_segundos=float(os.getenv("AGENTE_MAX_SEGUNDOS", cls.max_segundos)),
+            max_tokens=int(os.getenv("AGENTE_MAX_TOKENS", cls.max_tokens)),
+            max_tokens_sessao=int(os.getenv("AGENTE_MAX_TOKENS_SESSAO", cls.max_tokens_sessao)),
+        )
+
+
+# === CONTABILIZAÇÃO NO ESTADO ===
+# Os nós retornam estes campos junto com "messages"; o estado do grafo deve
+# declará-los (chamadas_llm, chamadas_tools, tokens, inicio_turno).
+
+def contabilizar_llm(state: dict, response: AIMessage, inicio_chamada: Optional[float] = None) -> dict:
+    """Atualiza os contadores após uma chamada ao LLM.
+
+    Um turno novo começa quando a última mensagem é do usuário; nesse caso os
+    contadores são zerados (com checkpointer o estado sobrevive entre turnos)
+    e o turno conta a partir de `inicio_chamada` (time.time() tomado pelo nó
+    antes de chamar o modelo), para que max_segundos inclua a primeira chamada.
+    """
+    messages = state["messages"]
+    if messages and isinstance(messages[-1], HumanMessage):
+        uso = {"chamadas_llm": 0, "chamadas_tools": 0, "tokens": 0, "inicio_turno": inicio_chamada or time.time()}
+    else:
+        uso = {
+            "chamadas_llm": state.get("chamadas_llm", 0),
+            "chamadas_tools": state.get("chamadas_tools", 0),
+            "tokens": state.get("tokens", 0),
+            "inicio_turno": state.get("inicio_turno") or inicio_chamada or time.time(),
+        }
+
+    uso["chamadas_llm"] += 1
+    usage = getattr(response, "usage_metadata", None) or {}
+    uso["tokens"] += usage.get("total_tokens", 0)
+    return uso
+
+
+def contabilizar_tools(state: dict, quantidade: int) -> dict:
+    """Atualiza o contador de tools após a execução de `quantidade` chamadas."""
+    return {"chamadas_tools": state.get("chamadas_tools", 0) + quantidade}
+
+
+def verificar_sessao(orcamento: Orcamento, tokens_sessao: int) -> Optional[str]:
+    """Retorna "sessao" se a sessão já gastou o orçamento de tokens dela, senão None."""
+    if orcamento.max_tokens_sessao and tokens_sessao >= orcamento.max_tokens_sessao:
+        return "sessao"
+    return None
+
+
+def verificar_orcamento(state: dict, orcamento: Orcamento, tokens_sessao: int = 0) -> Optional[str]:
+    """Retorna o motivo do estouro se o próximo passo excederia o orçamento, senão None.
+
+    Chamada pelo roteador antes de executar as tools pedidas pelo LLM: executá-las
+    implica pelo menos mais uma chamada ao LLM. `tokens_sessao` é o consumo da
+    sessão inteira (ver comum/contabilidade.py).
+    """
+    last_message = state["messages"][-1]
+    pendentes = len(getattr(last_message, "tool_calls", None) or [])
+
+    if verificar_sessao(orcamento, tokens_sessao):
+        return "sessao"
+    if state.get("chamadas_llm", 0) >= orcamento.max_chamadas_llm:
+        return "chamadas_llm"
+    if state.get("chamadas_tools", 0) + pendentes > orcamento.max_chamadas_tools:
+        return "chamadas_tools"
+    if state.get("tokens", 0) >= orcamento.max_tokens:
+        return "tokens"
+    inicio = state.get("inicio_turno")
+    if inicio is not None and time.time() - inicio >= orcamento.max_segundos:
+        return "tempo"
+    return None
+
+
+def encerrar_por_orcamento(messages: list[AnyMessage], motivo: str) -> list[AnyMessage]:
+    """Gera a resposta final de um turno que estourou o orçamento.
+
+    As tool_calls pendentes recebem um ToolMessage para que o histórico continue
+    válido para o provedor no próximo turno.
+    """
+    last_message = messages[-1]
+    saida: list[AnyMessage] = [
+        ToolMessage(
+            content="Não executada: orçamento do turno esgotado.",
+            tool_call_id=tool_call["id"]
+        )
+        for tool_call in getattr(last_message, "tool_calls", None) or []
+    ]
+    descricao = DESCRICAO_MOTIVOS.get(motivo, motivo)
+    saida.append(AIMessage(content=MENSAGEM_ORCAMENTO_ESGOTADO.format(motivo=descricao)))
+    return saida
+
+
+# === MÉTRICAS ===
+
+class MetricasOrcamento:
+    """Agrega o consumo por turno para calibrar os limites (vazão x qualidade).
+
+    Médias e p95 usam os `janela` turnos mais recentes, para que o processo
+    possa rodar indefinidamente; `turnos` e `estouros` contam desde o início.
+    """
+
+    def __init__(self, janela: int = 1000):
+        self._lock = threading.Lock()
+        self.turnos = 0
+        self.estouros: dict[str, int] = {}
+        self.chamadas_llm: deque[int] = deque(maxlen=janela)
+        self.chamadas_tools: deque[int] = deque(maxlen=janela)
+        self.tokens: deque[int] = deque(maxlen=janela)
+        self.duracoes: deque[float] = deque(maxlen=janela)
+
+    def registrar_turno(self, state: dict, motivo: Optional[str] = None) -> None:
+        messages = state.get("messages") or []
+        if messages and isinstance(messages[-1], HumanMessage):
+            # Turno recusado antes de chamar o LLM (ex: orçamento da sessão):
+            # os contadores do estado ainda são os do turno anterior
+            state = {}
+        inicio = state.get("inicio_turno")
+        with self._lock:
+            self.turnos += 1
+            if motivo:
+                self.estouros[motivo] = self.estouros.get(motivo, 0) + 1
+            self.chamadas_llm.append(state.get("chamadas_llm", 0))
+            self.chamadas_tools.append(state.get("chamadas_tools", 0))
+            self.tokens.append(state.get("tokens", 0))
+            self.duracoes.append(time.time() - inicio if inicio else 0.0)
+
+    def resumo(self) -> dict:
+        def media(valores):
+            return sum(valores) / len(valores) if valores else 0.0
+
+        def p95(valores):
+            if not valores:
+                return 0.0
+            ordenados = sorted(valores)
+            return ordenados[min(len(ordenados) - 1, int(0.95 * len(ordenados)))]
+
+        with self._lock:
+            return {
+                "turnos": self.turnos,
+                "estouros": dict(self.estouros),
+                "chamadas_llm_media": media(self.chamadas_llm),
+                "chamadas_llm_p95": p95(self.chamadas_llm),
+                "chamadas_tools_media": media(self.chamadas_tools),
+                "tokens_media": media(self.tokens),
+                "duracao_media_s": media(self.duracoes),
+                "duracao_p95_s": p95(self.duracoes),
+            }
+
+    def exportar(self, caminho: Optional[str] = None) -> Optional[str]:
+        """Grava o resumo em JSON (por padrão em $AGENTE_METRICAS_PATH, se definida)."""
+        caminho = caminho or os.getenv("AGENTE_METRICAS_PATH")
+        if not caminho:
+            return None
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.resumo(), f, ensure_ascii=False, indent=2)
+        return caminho
+
+
+METRICAS = MetricasOrcamento()
@@ -0,0 +1,384 @@
+# /src/ch06/planejar_executar.py
+# Modo "planejar e executar" dos agentes do capítulo 6 (chatbot.py e
+# agente_react_completo.py).
+#
+# No modo ReAct cada passo é uma ida ao modelo reenviando o histórico inteiro.
+# Aqui uma única chamada produz o plano (todos os passos, com dependências), o
+# executor roda os passos, os independentes em paralelo, e o modelo só volta a
+# ser chamado para escrever a resposta final ou para replanejar quando um passo
+# falha. "Crie 3 produtos e depois liste os com menos de 5 unidades" custa duas
+# idas ao modelo (plano + resposta) em vez de três ou mais.
+#
+# Os passos executados entram no histórico como AIMessage com tool_calls e
+# ToolMessages, o mesmo formato do modo ReAct: a contabilidade, o orçamento e
+# os turnos seguintes funcionam igual nos dois modos.
+
+import json
+import operator
+import time
+from functools import partial
+from typing import Annotated, Literal, Optional, Sequence, TypedDict
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import BaseTool
+from langgraph.graph import END, START, StateGraph
+from pydantic import BaseModel, Field
+
+from orcamento import (
+    METRICAS, Orcamento, contabilizar_llm, contabilizar_tools,
+    encerrar_por_orcamento, verificar_orcamento, verificar_sessao
+)
+
+from comum.contabilidade import CONTABILIDADE
+from comum.lote_tools import invocar_tool_calls
+from comum.registro_tools import REGISTRO, tools_por_nome
+
+# Resultados de tool que disparam um replanejamento
+PREFIXOS_FALHA = ("Erro", "Não executado")
+
+
+# === SCHEMA DO PLANO ===
+
+class PassoPlano(BaseModel):
+    id: int = Field(description="Número do passo (1, 2, 3...)")
+    tool: str = Field(description="Nome da ferramenta")
+    # String JSON em vez de dict: schemas com objetos livres não são aceitos
+    # por todos os provedores no modo de saída estruturada
+    argumentos: str = Field(
+        description='Argumentos da ferramenta como objeto JSON, ex: {"nome": "Mouse", "preco": 50, "estoque": 3}'
+    )
+    depende_de: list[int] = Field(
+        default_factory=list,
+        description="Passos que precisam terminar antes deste (ex: listar depois de criar)"
+    )
+
+
+class Plano(BaseModel):
+    passos: list[PassoPlano] = Field(
+        default_factory=list,
+        description="Passos a executar; vazio se o pedido não precisa de ferramentas"
+    )
+    resposta: Optional[str] = Field(
+        default=None,
+        description="Resposta ao usuário quando não há passos a executar"
+    )
+    continuar: bool = Field(
+        default=False,
+        description="true se faltam passos que dependem dos resultados destes (ex: um ID ainda desconhecido)"
+    )
+
+
+PROMPT_PLANEJADOR = """{instrucoes}
+
+## Modo de planejamento
+Em vez de chamar as ferramentas uma a uma, monte de uma vez o plano com TODOS
+os passos necessários para atender o último pedido do usuário.
+- Cada passo usa uma das ferramentas abaixo, com os argumentos em JSON
+- Use depende_de quando um passo precisa que outro termine antes (ex: listar
+  depois de criar); passos sem dependência entre si rodam em paralelo
+- Se um passo precisar de um dado que só outro passo revela (ex: o ID de um
+  produto), planeje até esse ponto e marque continuar=true: você receberá os
+  resultados e poderá planejar o resto
+- Se o pedido não precisar de ferramentas, ou faltar informação para executá-lo,
+  não crie passos e escreva a resposta em `resposta`
+- Se já houver resultados de ferramentas para este pedido, planeje apenas o que
+  falta ou corrija o que falhou; sem nada a fazer, devolva a lista de passos vazia
+
+## Ferramentas (nome, descrição e parâmetros)
+{ferramentas}
+"""
+
+
+def criar_planejador(modelo):
+    """Modelo com saída estruturada no formato Plano.
+
+    `include_raw` mantém a AIMessage original, de onde vêm os tokens
+    contabilizados no orçamento do turno.
+    """
+    return modelo.with_structured_output(Plano, include_raw=True).with_config(callbacks=[CONTABILIDADE])
+
+
+def catalogo_tools(tools: Sequence[BaseTool]) -> str:
+    """Uma linha JSON por tool com o schema já calculado pelo registro."""
+    return "\n".join(json.dumps(REGISTRO.schema(t)["function"], ensure_ascii=False) for t in tools)
+
+
+# === ESTADO ===
+
+class EstadoPlano(TypedDict):
+    messages: Annotated[list[AnyMessage], operator.add]
+    # Consumo do turno atual (ver orcamento.py)
+    chamadas_llm: int
+    chamadas_tools: int
+    tokens: int
+    inicio_turno: float
+    # tool_call_id -> {"depende_de": [tool_call_id, ...], "erro": str | None}
+    plano: dict[str, dict]
+    continuar: bool
+    replanejamentos: int
+
+
+# === PLANEJAMENTO ===
+
+def historico_para_planejador(messages: list[AnyMessage]) -> list[AnyMessage]:
+    """Histórico com as chamadas de tools reescritas como texto.
+
+    O planejador não recebe as tools vinculadas (só o schema do plano), então
+    cada bloco de resultados vai como uma mensagem do usuário.
+    """
+    saida: list[AnyMessage] = []
+    chamadas: dict[str, dict] = {}
+    resultados: list[str] = []
+
+    def descarregar():
+        if resultados:
+            saida.append(HumanMessage(content="Resultados das ferramentas:\n" + "\n".join(resultados)))
+            resultados.clear()
+
+    for m in messages:
+        if isinstance(m, ToolMessage):
+            chamada = chamadas.get(m.tool_call_id, {"name": m.name or "?", "args": {}})
+            args = json.dumps(chamada["args"], ensure_ascii=False)
+            resultados.append(f"- {chamada['name']}({args}): {m.content}")
+            continue
+        descarregar()
+        if isinstance(m, SystemMessage):
+            continue
+        if isinstance(m, AIMessage):
+            chamadas.update({c["id"]: c for c in m.tool_calls})
+            if m.content:
+                saida.append(AIMessage(content=m.content))
+        else:
+            saida.append(m)
+    descarregar()
+    return saida
+
+
+def plano_para_mensagem(plano: Plano, prefixo: str) -> tuple[AIMessage, dict[str, dict]]:
+    """Converte o plano em uma AIMessage com tool_calls e no mapa de dependências."""
+    ids: dict[int, str] = {}
+    for passo in plano.passos:
+        ids.setdefault(passo.id, f"{prefixo}-{passo.id}")
+
+    tool_calls, dependencias = [], {}
+    for indice, passo in enumerate(plano.passos):
+        id_chamada = ids[passo.id]
+        erro = None
+        if id_chamada in dependencias:
+            id_chamada = f"{prefixo}-{passo.id}-{indice}"
+            erro = f"Erro no plano: passo {passo.id} repetido."
+        try:
+            args = json.loads(passo.argumentos or "{}")
+            if not isinstance(args, dict):
+                raise ValueError("os argumentos devem ser um objeto JSON")
+        except ValueError as e:
+            args, erro = {}, f"Erro no plano: argumentos inválidos para {passo.tool}: {e}"
+
+        tool_calls.append({"name": passo.tool, "args": args, "id": id_chamada, "type": "tool_call"})
+        dependencias[id_chamada] = {
+            # Dependências de passos inexistentes são ignoradas
+            "depende_de": [ids[d] for d in passo.depende_de if d in ids and ids[d] != id_chamada],
+            "erro": erro,
+        }
+    return AIMessage(content="", tool_calls=tool_calls), dependencias
+
+
+def no_planejar(state: EstadoPlano, planejador, prompt: str) -> dict:
+    """Chama o modelo uma vez para obter o plano do pedido (ou o que falta dele)."""
+    messages = state["messages"]
+    novo_turno = bool(messages) and isinstance(messages[-1], HumanMessage)
+    replanejamentos = 0 if novo_turno else state.get("replanejamentos", 0) + 1
+
+    inicio = time.time()
+    resultado = planejador.invoke([SystemMessage(content=prompt)] + historico_para_planejador(messages))
+    atualizacao = {
+        **contabilizar_llm(state, resultado["raw"], inicio),
+        "plano": {},
+        "continuar": False,
+        "replanejamentos": replanejamentos,
+    }
+
+    plano: Optional[Plano] = resultado["parsed"]
+    if plano is None:
+        # Plano ilegível: o nó de resposta segue no modo ReAct
+        return {**atualizacao, "messages": []}
+    if plano.passos:
+        mensagem, dependencias = plano_para_mensagem(plano, f"passo-{len(messages)}")
+        return {**atualizacao, "messages": [mensagem], "plano": dependencias, "continuar": plano.continuar}
+    if plano.resposta and novo_turno:
+        return {**atualizacao, "messages": [AIMessage(content=plano.resposta)]}
+    return {**atualizacao, "messages": []}
+
+
+# === EXECUÇÃO ===
+
+def resultado_falhou(conteudo: str) -> bool:
+    return conteudo.startswith(PREFIXOS_FALHA)
+
+
+def executar_plano(
+    tool_calls: Sequence[dict],
+    plano: dict[str, dict],
+    tools: dict[str, BaseTool],
+    max_paralelo: int = 4,
+) -> dict[str, str]:
+    """Executa as tool_calls em ondas: cada onda roda em paralelo os passos
+    cujas dependências já terminaram. Dependentes de um passo que falhou não
+    são executados. Retorna o conteúdo de cada ToolMessage por tool_call_id."""
+    resultados: dict[str, str] = {}
+    falhas: set[str] = set()
+    pendentes = list(tool_calls)
+
+    # Cada tarefa roda com uma cópia do contexto (get_config() funciona nas tools)
+    with ContextThreadPoolExecutor(max_workers=max_paralelo) as pool:
+        while pendentes:
+            prontos, bloqueados, resolvidos = [], [], 0
+            for chamada in pendentes:
+                info = plano.get(chamada["id"], {})
+                dependencias = info.get("depende_de", [])
+                falhou = next((d for d in dependencias if d in falhas), None)
+                if info.get("erro") or falhou:
+                    resultados[chamada["id"]] = info.get("erro") or f"Não executado: depende de {falhou}, que falhou."
+                    falhas.add(chamada["id"])
+                    resolvidos += 1
+                elif all(d in resultados for d in dependencias):
+                    prontos.append(chamada)
+                else:
+                    bloqueados.append(chamada)
+
+            if not prontos and not resolvidos:
+                for chamada in bloqueados:
+                    resultados[chamada["id"]] = "Erro no plano: dependência circular entre os passos."
+                break
+
+            conteudos = pool.map(lambda chamada: invocar_tool_calls(tools, [chamada])[0], prontos)
+            for chamada, conteudo in zip(prontos, conteudos):
+                resultados[chamada["id"]] = conteudo
+                if resultado_falhou(conteudo):
+                    falhas.add(chamada["id"])
+            pendentes = bloqueados
+    return resultados
+
+
+def no_executar(state: EstadoPlano, tools: dict[str, BaseTool], max_paralelo: int = 4) -> dict:
+    """Executa as tool_calls da última mensagem respeitando as dependências do plano."""
+    last_message = state["messages"][-1]
+    if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
+        return {"messages": []}
+
+    resultados = executar_plano(last_message.tool_calls, state.get("plano") or {}, tools, max_paralelo)
+    tool_messages = [
+        ToolMessage(content=resultados[chamada["id"]], tool_call_id=chamada["id"], name=chamada["name"])
+        for chamada in last_message.tool_calls
+    ]
+    return {"messages": tool_messages, **contabilizar_tools(state, len(tool_messages))}
+
+
+# === RESPOSTA ===
+
+def no_responder(state: EstadoPlano, redator, instrucoes: str) -> dict:
+    """Resposta final com o histórico completo, igual a uma ida do modo ReAct.
+
+    Se o modelo ainda pedir tools, elas são executadas na ordem pedida (cada
+    uma depende da anterior), como no modo ReAct.
+    """
+    response = redator.invoke([SystemMessage(content=instrucoes)] + state["messages"])
+    ids = [chamada["id"] for chamada in response.tool_calls]
+    plano = {
+        id_chamada: {"depende_de": ids[:indice][-1:], "erro": None}
+        for indice, id_chamada in enumerate(ids)
+    }
+    return {"messages": [response], "plano": plano, "continuar": False, **contabilizar_llm(state, response)}
+
+
+def no_orcamento_esgotado(state: EstadoPlano, orcamento: Orcamento) -> dict:
+    """Encerra o turno com uma resposta amigável quando o orçamento estoura."""
+    motivo = verificar_orcamento(state, orcamento, CONTABILIDADE.tokens_sessao_atual()) or "limite"
+    METRICAS.registrar_turno(state, motivo)
+    return {"messages": encerrar_por_orcamento(state["messages"], motivo)}
+
+
+# === ROTEAMENTO ===
+
+def iniciar_turno(state: EstadoPlano, orcamento: Orcamento) -> Literal["planejar", "orcamento"]:
+    """Recusa o turno sem chamar o modelo se a sessão já gastou o orçamento de tokens."""
+    if verificar_sessao(orcamento, CONTABILIDADE.tokens_sessao_atual()):
+        return "orcamento"
+    return "planejar"
+
+
+def rotear(state: EstadoPlano, orcamento: Orcamento) -> Literal["executar", "responder", "orcamento", "__end__"]:
+    """Após planejar ou responder: executa as tools pedidas, pede a resposta
+    final (quando não há plano) ou encerra o turno."""
+    last_message = state["messages"][-1]
+    if isinstance(last_message, AIMessage) and last_message.tool_calls:
+        if verificar_orcamento(state, orcamento, CONTABILIDADE.tokens_sessao_atual()):
+            return "orcamento"
+        return "executar"
+    if not isinstance(last_message, AIMessage):
+        return "responder"
+
+    METRICAS.registrar_turno(state)
+    return "__end__"
+
+
+def apos_executar(state: EstadoPlano, max_replanejamentos: int) -> Literal["planejar", "responder"]:
+    """Replaneja se algum passo falhou ou se o plano pediu continuação."""
+    ultimos = []
+    for m in reversed(state["messages"]):
+        if not isinstance(m, ToolMessage):
+            break
+        ultimos.append(m)
+    falhou = any(resultado_falhou(str(m.content)) for m in ultimos)
+    if (falhou or state.get("continuar")) and state.get("replanejamentos", 0) < max_replanejamentos:
+        return "planejar"
+    return "responder"
+
+
+# === GRAFO ===
+
+def criar_grafo_plano(
+    planejador,
+    redator,
+    tools: Sequence[BaseTool],
+    instrucoes: str,
+    orcamento: Orcamento,
+    checkpointer=None,
+    max_replanejamentos: int = 2,
+    max_paralelo: int = 4,
+):
+    """Grafo planejar -> executar -> responder, compilado.
+
+    Args:
+        planejador: Modelo com saída estruturada Plano (ver criar_planejador).
+        redator: Modelo com as tools vinculadas, usado na resposta final.
+        tools: As mesmas tools vinculadas ao redator.
+        instrucoes: System prompt do agente; o planejador recebe também as regras do plano.
+        orcamento: Limites por turno (ver orcamento.py).
+        max_replanejamentos: Novas idas ao planejador por turno após falhas.
+        max_paralelo: Passos independentes executados ao mesmo tempo.
+    """
+    prompt = PROMPT_PLANEJADOR.format(instrucoes=instrucoes, ferramentas=catalogo_tools(tools))
+    graph = StateGraph(EstadoPlano)
+
+    graph.add_node("planejar", partial(no_planejar, planejador=planejador, prompt=prompt))
+    graph.add_node("executar", partial(no_executar, tools=tools_por_nome(tools), max_paralelo=max_paralelo))
+    graph.add_node("responder", partial(no_responder, redator=redator, instrucoes=instrucoes))
+    graph.add_node("orcamento", partial(no_orcamento_esgotado, orcamento=orcamento))
+
+    destinos = {"executar": "executar", "responder": "responder", "orcamento": "orcamento", "__end__": END}
+    graph.add_conditional_edges(
+        START,
+        partial(iniciar_turno, orcamento=orcamento),
+        {"planejar": "planejar", "orcamento": "orcamento"}
+    )
+    graph.add_conditional_edges("planejar", partial(rotear, orcamento=orcamento), destinos)
+    graph.add_conditional_edges(
+        "executar",
+        partial(apos_executar, max_replanejamentos=max_replanejamentos),
+        {"planejar": "planejar", "responder": "responder"}
+    )
+    graph.add_conditional_edges("responder", partial(rotear, orcamento=orcamento), destinos)
+    graph.add_edge("orcamento", END)
+    return graph.compile(checkpointer=checkpointer)
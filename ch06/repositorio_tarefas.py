@@ -0,0 +1,327 @@
+# /src/ch06/repositorio_tarefas.py
+# Armazenamento de tarefas do agente ReAct (agente_react_completo.py)
+
+import heapq
+import queue
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import date
+from itertools import count
+from typing import Callable, Iterable, Iterator, Optional
+
+
+class Tarefa:
+    """Registro compacto de uma tarefa (sem __dict__ por instância)."""
+    __slots__ = ("id", "usuario_id", "titulo", "estado", "vencimento")
+
+    def __init__(self, id: int, usuario_id: int, titulo: str,
+                 estado: str = "pendente", vencimento: Optional[date] = None):
+        self.id = id
+        self.usuario_id = usuario_id
+        self.titulo = titulo
+        self.estado = estado
+        self.vencimento = vencimento
+
+    def __repr__(self) -> str:
+        return (f"Tarefa(id={self.id}, usuario_id={self.usuario_id}, titulo={self.titulo!r}, "
+                f"estado={self.estado!r}, vencimento={self.vencimento!r})")
+
+
+class RepositorioTarefasMemoria:
+    """Tarefas em memória com índices por ID, por (usuário, estado) e por vencimento.
+
+    - Busca por ID: O(1).
+    - Listagem por estado: O(k), proporcional ao resultado.
+    - Listagem por vencimento: O(log n + k) sobre a lista de datas (já
+      convertidas para `date`) ordenada do usuário em cada estado; filtrada
+      por estado (ex: só as pendentes), não passa pelas dos outros estados.
+
+    Todas as operações são protegidas por um único lock, então o mesmo
+    repositório pode ser usado por várias sessões em threads diferentes.
+    """
+
+    def __init__(self, tarefas: Iterable[dict] = ()):
+        self._lock = threading.Lock()
+        self._por_id: dict[int, Tarefa] = {}
+        # dict como conjunto ordenado: mantém a ordem de criação e remove em O(1)
+        self._por_estado: dict[tuple[int, str], dict[int, Tarefa]] = {}
+        self._estados_usuario: dict[int, set[str]] = {}
+        # Por (usuário, estado): datas ordenadas e, em paralelo, as tarefas na
+        # mesma posição (duas listas custam menos memória que uma lista de tuplas)
+        self._vencimentos: dict[tuple[int, str], tuple[list[date], list[Tarefa]]] = {}
+        self._ao_criar: list[Callable[[Tarefa], None]] = []
+
+        maior_id = 0
+        for dados in tarefas:
+            tarefa = Tarefa(**dados)
+            self._indexar(tarefa)
+            maior_id = max(maior_id, tarefa.id)
+        self._ids = count(maior_id + 1)
+
+    def _indexar(self, tarefa: Tarefa) -> None:
+        self._por_id[tarefa.id] = tarefa
+        self._por_estado.setdefault((tarefa.usuario_id, tarefa.estado), {})[tarefa.id] = tarefa
+        self._estados_usuario.setdefault(tarefa.usuario_id, set()).add(tarefa.estado)
+        self._indexar_vencimento(tarefa)
+
+    def _indexar_vencimento(self, tarefa: Tarefa) -> None:
+        if tarefa.vencimento:
+            datas, tarefas = self._vencimentos.setdefault((tarefa.usuario_id, tarefa.estado), ([], []))
+            posicao = bisect_right(datas, tarefa.vencimento)
+            datas.insert(posicao, tarefa.vencimento)
+            tarefas.insert(posicao, tarefa)
+
+    def _desindexar_vencimento(self, tarefa: Tarefa) -> None:
+        if tarefa.vencimento:
+            datas, tarefas = self._vencimentos[(tarefa.usuario_id, tarefa.estado)]
+            # Só as tarefas da mesma data são percorridas
+            posicao = bisect_left(datas, tarefa.vencimento)
+            while tarefas[posicao] is not tarefa:
+                posicao += 1
+            del datas[posicao]
+            del tarefas[posicao]
+
+    def ao_criar(self, callback: Callable[[Tarefa], None]) -> None:
+        """Registra uma função chamada a cada tarefa criada (ex: agendador de lembretes)."""
+        self._ao_criar.append(callback)
+
+    def criar(self, usuario_id: int, titulo: str, vencimento: Optional[date] = None) -> Tarefa:
+        """Cria uma tarefa pendente com um ID único."""
+        with self._lock:
+            tarefa = Tarefa(next(self._ids), usuario_id, titulo, "pendente", vencimento)
+            self._indexar(tarefa)
+        for callback in self._ao_criar:
+            callback(tarefa)
+        return tarefa
+
+    def obter(self, usuario_id: int, tarefa_id: int) -> Optional[Tarefa]:
+        """Retorna a tarefa se ela existir e pertencer ao usuário."""
+        tarefa = self._por_id.get(tarefa_id)
+        if tarefa is None or tarefa.usuario_id != usuario_id:
+            return None
+        return tarefa
+
+    def alterar_estado(self, usuario_id: int, tarefa_id: int, estado: str) -> Optional[Tarefa]:
+        """Muda o estado da tarefa, atualizando o índice por estado."""
+        with self._lock:
+            tarefa = self.obter(usuario_id, tarefa_id)
+            if tarefa is None:
+                return None
+            if tarefa.estado != estado:
+                del self._por_estado[(usuario_id, tarefa.estado)][tarefa_id]
+                self._desindexar_vencimento(tarefa)
+                tarefa.estado = estado
+                self._por_estado.setdefault((usuario_id, estado), {})[tarefa_id] = tarefa
+                self._estados_usuario[usuario_id].add(estado)
+                self._indexar_vencimento(tarefa)
+            return tarefa
+
+    def concluir(self, usuario_id: int, tarefa_id: int) -> Optional[Tarefa]:
+        return self.alterar_estado(usuario_id, tarefa_id, "concluida")
+
+    def listar(self, usuario_id: int, estado: Optional[str] = None) -> list[Tarefa]:
+        """Lista as tarefas do usuário em ordem de criação, opcionalmente por estado."""
+        with self._lock:
+            if estado:
+                return list(self._por_estado.get((usuario_id, estado), {}).values())
+            tarefas = [
+                tarefa
+                for estado_usuario in self._estados_usuario.get(usuario_id, ())
+                for tarefa in self._por_estado[(usuario_id, estado_usuario)].values()
+            ]
+        # IDs são crescentes, então ordenar por ID restaura a ordem de criação
+        tarefas.sort(key=lambda t: t.id)
+        return tarefas
+
+    def listar_por_vencimento(self, usuario_id: int, ate: Optional[date] = None,
+                              desde: Optional[date] = None, estado: Optional[str] = None) -> list[Tarefa]:
+        """Lista as tarefas com vencimento entre `desde` e `ate` (inclusive) em ordem de data,
+        opcionalmente só as de um estado."""
+        with self._lock:
+            estados = [estado] if estado else self._estados_usuario.get(usuario_id, ())
+            faixas = []
+            for estado_usuario in estados:
+                datas, tarefas = self._vencimentos.get((usuario_id, estado_usuario), ([], []))
+                inicio = 0 if desde is None else bisect_left(datas, desde)
+                fim = len(datas) if ate is None else bisect_right(datas, ate)
+                faixas.append(tarefas[inicio:fim])
+        if len(faixas) == 1:
+            return faixas[0]
+        return list(heapq.merge(*faixas, key=lambda t: t.vencimento))
+
+    def pendentes_com_vencimento(self) -> list[Tarefa]:
+        """Todas as tarefas pendentes com vencimento (usado para carregar o agendador)."""
+        with self._lock:
+            return [
+                tarefa
+                for (_, estado), (_, tarefas) in self._vencimentos.items()
+                if estado == "pendente"
+                for tarefa in tarefas
+            ]
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+
+class RepositorioTarefasSQLite:
+    """Tarefas persistidas em SQLite, compartilháveis entre processos.
+
+    Mesma interface de RepositorioTarefasMemoria. Todas as consultas filtram
+    por usuario_id, e os índices (usuario_id, estado, vencimento) e
+    (usuario_id, vencimento) mantêm cada usuário em uma faixa contígua da
+    árvore; o primeiro também resolve "pendentes vencendo até X" sem ler as
+    concluídas. O banco usa WAL para
+    que leitores não bloqueiem o escritor, e o ID vem do AUTOINCREMENT,
+    atômico mesmo com vários processos.
+    """
+
+    def __init__(self, caminho: str, tamanho_pool: int = 4):
+        self.caminho = caminho
+        self._tamanho_pool = tamanho_pool
+        self._livres: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._criadas = 0
+        self._lock = threading.Lock()
+        self._ao_criar: list[Callable[[Tarefa], None]] = []
+
+        with self._conexao() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tarefas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    usuario_id INTEGER NOT NULL,
+                    titulo TEXT NOT NULL,
+                    estado TEXT NOT NULL DEFAULT 'pendente',
+                    vencimento TEXT
+                );
+                -- (usuario_id, estado) é prefixo deste, que o substitui
+                DROP INDEX IF EXISTS idx_tarefas_usuario_estado;
+                CREATE INDEX IF NOT EXISTS idx_tarefas_usuario_estado_vencimento
+                    ON tarefas (usuario_id, estado, vencimento);
+                CREATE INDEX IF NOT EXISTS idx_tarefas_usuario_vencimento
+                    ON tarefas (usuario_id, vencimento);
+            """)
+
+    def _abrir(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False,
+                               isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _conexao(self) -> Iterator[sqlite3.Connection]:
+        """Empresta uma conexão do pool, abrindo uma nova se o pool ainda não encheu."""
+        try:
+            conn = self._livres.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                abrir = self._criadas < self._tamanho_pool
+                if abrir:
+                    self._criadas += 1
+            conn = self._abrir() if abrir else self._livres.get()
+        try:
+            yield conn
+        finally:
+            self._livres.put(conn)
+
+    @staticmethod
+    def _tarefa(linha: tuple) -> Tarefa:
+        id, usuario_id, titulo, estado, vencimento = linha
+        return Tarefa(id, usuario_id, titulo, estado,
+                      date.fromisoformat(vencimento) if vencimento else None)
+
+    def ao_criar(self, callback: Callable[[Tarefa], None]) -> None:
+        """Registra uma função chamada a cada tarefa criada por este processo."""
+        self._ao_criar.append(callback)
+
+    def criar(self, usuario_id: int, titulo: str, vencimento: Optional[date] = None) -> Tarefa:
+        with self._conexao() as conn:
+            cursor = conn.execute(
+                "INSERT INTO tarefas (usuario_id, titulo, vencimento) VALUES (?, ?, ?)",
+                (usuario_id, titulo, vencimento.isoformat() if vencimento else None)
+            )
+            tarefa = Tarefa(cursor.lastrowid, usuario_id, titulo, "pendente", vencimento)
+        for callback in self._ao_criar:
+            callback(tarefa)
+        return tarefa
+
+    def obter(self, usuario_id: int, tarefa_id: int) -> Optional[Tarefa]:
+        with self._conexao() as conn:
+            linha = conn.execute(
+                "SELECT id, usuario_id, titulo, estado, vencimento FROM tarefas "
+                "WHERE id = ? AND usuario_id = ?",
+                (tarefa_id, usuario_id)
+            ).fetchone()
+        return self._tarefa(linha) if linha else None
+
+    def alterar_estado(self, usuario_id: int, tarefa_id: int, estado: str) -> Optional[Tarefa]:
+        with self._conexao() as conn:
+            linha = conn.execute(
+                "UPDATE tarefas SET estado = ? WHERE id = ? AND usuario_id = ? "
+                "RETURNING id, usuario_id, titulo, estado, vencimento",
+                (estado, tarefa_id, usuario_id)
+            ).fetchone()
+        return self._tarefa(linha) if linha else None
+
+    def concluir(self, usuario_id: int, tarefa_id: int) -> Optional[Tarefa]:
+        return self.alterar_estado(usuario_id, tarefa_id, "concluida")
+
+    def listar(self, usuario_id: int, estado: Optional[str] = None) -> list[Tarefa]:
+        with self._conexao() as conn:
+            if estado:
+                linhas = conn.execute(
+                    "SELECT id, usuario_id, titulo, estado, vencimento FROM tarefas "
+                    "WHERE usuario_id = ? AND estado = ? ORDER BY id",
+                    (usuario_id, estado)
+                ).fetchall()
+            else:
+                linhas = conn.execute(
+                    "SELECT id, usuario_id, titulo, estado, vencimento FROM tarefas "
+                    "WHERE usuario_id = ? ORDER BY id",
+                    (usuario_id,)
+                ).fetchall()
+        return [self._tarefa(linha) for linha in linhas]
+
+    def listar_por_vencimento(self, usuario_id: int, ate: Optional[date] = None,
+                              desde: Optional[date] = None, estado: Optional[str] = None) -> list[Tarefa]:
+        # Datas ISO ordenam corretamente como texto, então o índice
+        # (usuario_id, vencimento), ou (usuario_id, estado, vencimento) com
+        # estado, resolve o intervalo
+        intervalo = ((desde or date.min).isoformat(), (ate or date.max).isoformat())
+        with self._conexao() as conn:
+            if estado:
+                linhas = conn.execute(
+                    "SELECT id, usuario_id, titulo, estado, vencimento FROM tarefas "
+                    "WHERE usuario_id = ? AND estado = ? AND vencimento BETWEEN ? AND ? "
+                    "ORDER BY vencimento",
+                    (usuario_id, estado, *intervalo)
+                ).fetchall()
+            else:
+                linhas = conn.execute(
+                    "SELECT id, usuario_id, titulo, estado, vencimento FROM tarefas "
+                    "WHERE usuario_id = ? AND vencimento BETWEEN ? AND ? "
+                    "ORDER BY vencimento",
+                    (usuario_id, *intervalo)
+                ).fetchall()
+        return [self._tarefa(linha) for linha in linhas]
+
+    def pendentes_com_vencimento(self) -> list[Tarefa]:
+        with self._conexao() as conn:
+            linhas = conn.execute(
+                "SELECT id, usuario_id, titulo, estado, vencimento FROM tarefas "
+                "WHERE estado = 'pendente' AND vencimento IS NOT NULL"
+            ).fetchall()
+        return [self._tarefa(linha) for linha in linhas]
+
+    def __len__(self) -> int:
+        with self._conexao() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tarefas").fetchone()[0]
+
+    def fechar(self) -> None:
+        """Fecha as conexões ociosas do pool."""
+        while True:
+            try:
+                self._livres.get_nowait().close()
+            except queue.Empty:
+                break
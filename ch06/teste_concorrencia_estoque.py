@@ -0,0 +1,108 @@
+# /src/ch06/teste_concorrencia_estoque.py
+# Verifica que ajustes de estoque concorrentes não perdem atualizações.
+# Uso: python teste_concorrencia_estoque.py [threads] [ajustes_por_thread]
+
+import os
+import sys
+import tempfile
+import threading
+
+import chatbot
+from chatbot import ajustar_estoque, atualizar_produto, criar_produto, get_conexao, inicializar_banco
+
+THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+AJUSTES_POR_THREAD = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+
+def ler_produto(produto_id: int) -> tuple[int, int]:
+    """Retorna (estoque, versao) do produto."""
+    conn = get_conexao()
+    linha = conn.execute("SELECT estoque, versao FROM produtos WHERE id = ?", (produto_id,)).fetchone()
+    conn.close()
+    return linha
+
+
+def rodar_em_paralelo(alvo, produto_id: int) -> None:
+    threads = [threading.Thread(target=alvo, args=(produto_id,)) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def novo_produto(estoque: int) -> int:
+    criar_produto.invoke({"nome": "teste", "preco": 1.0, "estoque": estoque})
+    conn = get_conexao()
+    produto_id = conn.execute("SELECT MAX(id) FROM produtos").fetchone()[0]
+    conn.close()
+    return produto_id
+
+
+# === ESTRATÉGIAS ===
+
+def ler_e_sobrescrever(produto_id: int) -> None:
+    """Padrão antigo: lê o estoque e grava o valor absoluto (sujeito a lost update)."""
+    for _ in range(AJUSTES_POR_THREAD):
+        estoque, _ = ler_produto(produto_id)
+        atualizar_produto.invoke({"id": produto_id, "estoque": estoque + 1})
+
+
+def ajuste_relativo(produto_id: int) -> None:
+    """Novo padrão: UPDATE ... SET estoque = estoque + ? em um único comando."""
+    for _ in range(AJUSTES_POR_THREAD):
+        ajustar_estoque.invoke({"id": produto_id, "delta": 1})
+
+
+def sobrescrever_com_versao(produto_id: int) -> None:
+    """Lê estoque e versão e regrava com concorrência otimista, repetindo em conflito."""
+    for _ in range(AJUSTES_POR_THREAD):
+        while True:
+            estoque, versao = ler_produto(produto_id)
+            resultado = atualizar_produto.invoke(
+                {"id": produto_id, "estoque": estoque + 1, "versao": versao}
+            )
+            if not resultado.startswith("Conflito"):
+                break
+
+
+def retirar(produto_id: int) -> None:
+    for _ in range(AJUSTES_POR_THREAD):
+        ajustar_estoque.invoke({"id": produto_id, "delta": -1})
+
+
+def main():
+    chatbot.DB_PATH = os.path.join(tempfile.mkdtemp(), "concorrencia.db")
+    inicializar_banco()
+    esperado = THREADS * AJUSTES_POR_THREAD
+
+    print(f"=== {THREADS} sessões x {AJUSTES_POR_THREAD} ajustes de +1 (esperado: {esperado}) ===")
+    falhas = 0
+    for nome, estrategia, obrigatorio in [
+        ("ler e sobrescrever (antigo)", ler_e_sobrescrever, False),
+        ("ajustar_estoque (relativo)", ajuste_relativo, True),
+        ("atualizar_produto com versão", sobrescrever_com_versao, True),
+    ]:
+        produto_id = novo_produto(0)
+        rodar_em_paralelo(estrategia, produto_id)
+        final, _ = ler_produto(produto_id)
+        perdidas = esperado - final
+        status = "OK" if perdidas == 0 else ("FALHA" if obrigatorio else "esperado")
+        print(f"{nome:32s} estoque final={final:6d}  atualizações perdidas={perdidas:5d}  [{status}]")
+        if obrigatorio and perdidas:
+            falhas += 1
+
+    # Guarda contra estoque negativo: mais retiradas do que unidades disponíveis
+    disponivel = esperado // 2
+    produto_id = novo_produto(disponivel)
+    rodar_em_paralelo(retirar, produto_id)
+    final, _ = ler_produto(produto_id)
+    status = "OK" if final == 0 else "FALHA"
+    print(f"{'retiradas além do disponível':32s} estoque final={final:6d}  (inicial {disponivel}, {esperado} retiradas)  [{status}]")
+    if final != 0:
+        falhas += 1
+
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
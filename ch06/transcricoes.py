@@ -0,0 +1,396 @@
+# /src/ch06/transcricoes.py
+# Transcrições de referência (golden) do agente de chatbot.py: grava sessões
+# com o modelo e depois as reproduz offline para detectar regressões no
+# número de idas ao modelo, de tool calls, no tamanho do prompt e no tempo.
+#
+# Gravar sessões reais (usa a API; os cenários ficam em transcricoes/cenarios.json):
+#   GOOGLE_API_KEY=... python transcricoes.py gravar [--apenas cadastro_e_consulta ...]
+# Gravar sem API, com o modelo simulado de benchmark_plano.py e os cenários de
+# lá. As transcrições versionadas em transcricoes/gravadas (sintetico_*, com
+# "sintetico": true) são desse tipo: cobrem o grafo, as tools, o roteador e a
+# contabilidade, mas não o comportamento do modelo real. Os cenários de
+# cenarios.json só ganham transcrição quando gravados com a API.
+#   python transcricoes.py gravar --sintetico
+# Reproduzir (offline; sai com código 1 se algum cenário regrediu ou divergiu,
+# ou se não houver transcrição para reproduzir):
+#   python transcricoes.py reproduzir [--limite tokens_prompt=0.10] [--atualizar]
+#
+# Gravação e reprodução passam pelo mesmo caminho de produção: o agente chama
+# chatbot.ROTEADOR, que escolhe o nível, cai para o outro em erro e chama o
+# modelo do nível com as tools vinculadas e a contabilidade (preparar_modelo).
+# Só o modelo de cada nível é trocado, e cada ida a ele é medida por um
+# callback (Gravador), com o nível que respondeu.
+#
+# Na reprodução, cada nível devolve as respostas gravadas, na ordem, e as
+# tools rodam de verdade em um banco vazio. Se o histórico que chega ao modelo
+# deixar de bater com o gravado (resultado de tool diferente, mais idas ao
+# modelo do que havia na gravação) ou o roteador escolher outro nível, o
+# cenário "diverge" e precisa ser regravado. Falhas de um nível durante a
+# gravação são repetidas, para o fallback seguir o mesmo caminho. Mudanças só
+# no system prompt não invalidam a gravação, mas aparecem no aviso e na
+# contagem de tokens do prompt.
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage, BaseMessage, HumanMessage, SystemMessage, message_to_dict, messages_from_dict
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+
+import chatbot
+from comum.registro_tools import REGISTRO
+
+PASTA = Path(__file__).resolve().parent / "transcricoes"
+CENARIOS_PATH = PASTA / "cenarios.json"
+GRAVADAS = PASTA / "gravadas"
+
+METRICAS = ("round_trips", "tool_calls", "tokens_prompt", "segundos")
+# Aumento relativo tolerado sobre a referência antes de acusar regressão
+LIMITES_PADRAO = {"round_trips": 0.0, "tool_calls": 0.0, "tokens_prompt": 0.05, "segundos": 0.5}
+# Folga absoluta no tempo, para o ruído de execuções muito curtas
+FOLGA_SEGUNDOS = 0.05
+
+
+class TranscricaoDivergente(Exception):
+    """O agente saiu do caminho gravado; a transcrição precisa ser regravada."""
+
+
+def assinatura(mensagens: list[BaseMessage]) -> tuple[str, str]:
+    """Hashes (system prompt, resto do histórico), ignorando ids das mensagens."""
+    sistema = hashlib.sha256()
+    historico = hashlib.sha256()
+    for m in mensagens:
+        destino = sistema if isinstance(m, SystemMessage) else historico
+        partes = [m.type, str(m.content)]
+        if isinstance(m, AIMessage):
+            partes.append(json.dumps([(c["name"], c["args"]) for c in m.tool_calls], sort_keys=True))
+        destino.update(json.dumps(partes, ensure_ascii=False).encode())
+    return sistema.hexdigest()[:16], historico.hexdigest()[:16]
+
+
+class FalhaGravada(Exception):
+    """Erro que o nível deu na gravação, repetido para o roteador cair para o outro."""
+
+
+class Gravador(BaseCallbackHandler):
+    """Mede cada ida ao modelo de um nível do roteador e guarda a resposta."""
+
+    def __init__(self):
+        # Os schemas das tools vão em toda chamada junto com as mensagens
+        schemas = [REGISTRO.schema(t) for t in chatbot.ALL_TOOLS]
+        self.tokens_tools = len(json.dumps(schemas, ensure_ascii=False)) // 4
+        self.trocas: list[dict] = []
+        self._pendentes: dict[UUID, dict] = {}
+        # Níveis que falharam antes da próxima resposta (fallback do roteador)
+        self._falhas: list[str] = []
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        nivel = (metadata or {}).get("nivel_roteador")
+        if nivel is None:
+            return
+        sistema, historico = assinatura(messages[0])
+        self._pendentes[run_id] = {
+            "nivel": nivel,
+            "sistema": sistema,
+            "historico": historico,
+            "tokens_prompt": count_tokens_approximately(messages[0]) + self.tokens_tools,
+            "inicio": time.perf_counter(),
+        }
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        troca = self._pendentes.pop(run_id, None)
+        if troca is None:
+            return
+        troca["segundos"] = time.perf_counter() - troca.pop("inicio")
+        if self._falhas:
+            troca["falhou_antes"], self._falhas = self._falhas, []
+        troca["resposta"] = message_to_dict(response.generations[0][0].message)
+        self.trocas.append(troca)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        troca = self._pendentes.pop(run_id, None)
+        if troca is not None and not isinstance(error, TranscricaoDivergente):
+            self._falhas.append(troca["nivel"])
+
+
+class ModeloTranscrito(BaseChatModel):
+    """Modelo de um nível do roteador que delega a `fonte` (gravação ou simulado)."""
+
+    fonte: Any
+    nivel: str
+    model_name: str = "transcrito"
+
+    @property
+    def _llm_type(self) -> str:
+        return "transcrito"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        resposta = self.fonte.invoke(messages, nivel=self.nivel)
+        return ChatResult(generations=[ChatGeneration(message=resposta)])
+
+    def bind_tools(self, tools, **kwargs):
+        # As tool calls vêm da fonte; os schemas só entram na conta do Gravador
+        return self
+
+
+class ModeloGravado:
+    """Devolve as respostas gravadas, na ordem, conferindo o nível e o histórico recebidos."""
+
+    def __init__(self, trocas: list[dict]):
+        self.trocas = trocas
+        self.proxima = 0
+        self.sistema_mudou = False
+        # O roteador trata a divergência como erro do nível e tenta o outro;
+        # a primeira fica guardada para a reprodução acusar
+        self.divergencia: Optional[str] = None
+
+    def divergir(self, motivo: str):
+        self.divergencia = self.divergencia or motivo
+        raise TranscricaoDivergente(self.divergencia)
+
+    def invoke(self, messages, config=None, nivel: Optional[str] = None, **kwargs):
+        if self.divergencia:
+            raise TranscricaoDivergente(self.divergencia)
+        if self.proxima >= len(self.trocas):
+            self.divergir(
+                f"o agente pediu a {self.proxima + 1}ª ida ao modelo, a gravação só tem {len(self.trocas)}"
+            )
+        troca = self.trocas[self.proxima]
+        if nivel in troca.get("falhou_antes", []):
+            raise FalhaGravada(f"nível {nivel} falhou na gravação da {self.proxima + 1}ª ida ao modelo")
+        if nivel != troca["nivel"]:
+            self.divergir(
+                f"nível {nivel} em vez de {troca['nivel']} na {self.proxima + 1}ª ida ao modelo"
+            )
+        sistema, historico = assinatura(messages)
+        if historico != troca["historico"]:
+            self.divergir(f"histórico diferente do gravado na {self.proxima + 1}ª ida ao modelo")
+        self.sistema_mudou |= sistema != troca["sistema"]
+        self.proxima += 1
+        return messages_from_dict([troca["resposta"]])[0]
+
+
+@contextmanager
+def niveis_com(fonte):
+    """Troca só o modelo de cada nível de chatbot.ROTEADOR por `fonte`."""
+    originais = chatbot.ROTEADOR.niveis
+    chatbot.ROTEADOR.niveis = {
+        nivel: chatbot.preparar_modelo(ModeloTranscrito(fonte=fonte, nivel=nivel, model_name=type(fonte).__name__))
+        for nivel in originais
+    }
+    try:
+        yield
+    finally:
+        chatbot.ROTEADOR.niveis = originais
+
+
+def executar_cenario(nome: str, turnos: list[str]) -> tuple[dict, Gravador]:
+    """Roda os turnos em um banco novo e numa thread nova; devolve as métricas."""
+    gravador = Gravador()
+    agente = chatbot.criar_agente()
+    config = {"configurable": {"thread_id": f"cenario-{nome}"}, "callbacks": [gravador]}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        db_original = chatbot.DB_PATH
+        chatbot.DB_PATH = os.path.join(pasta, f"{nome}.db")
+        try:
+            chatbot.inicializar_banco()
+            inicio = time.perf_counter()
+            respostas = []
+            for turno in turnos:
+                resultado = agente.invoke({"messages": [HumanMessage(content=turno)]}, config=config)
+                respostas.append(resultado["messages"][-1].content)
+            segundos = time.perf_counter() - inicio
+        finally:
+            chatbot.DB_PATH = db_original
+
+    metricas = {
+        "round_trips": len(gravador.trocas),
+        "tool_calls": sum(len(t["resposta"]["data"].get("tool_calls") or []) for t in gravador.trocas),
+        "tokens_prompt": sum(t["tokens_prompt"] for t in gravador.trocas),
+        "segundos": round(segundos, 4),
+    }
+    return {"metricas": metricas, "respostas": respostas}, gravador
+
+
+def reproduzir_cenario(transcricao: dict) -> tuple[dict, bool]:
+    """Reproduz uma transcrição offline; devolve (métricas, system prompt mudou)."""
+    modelo = ModeloGravado(transcricao["trocas"])
+    try:
+        with niveis_com(modelo):
+            execucao, _ = executar_cenario(transcricao["cenario"], transcricao["turnos"])
+    except Exception:
+        if modelo.divergencia:
+            raise TranscricaoDivergente(modelo.divergencia) from None
+        raise
+    if modelo.divergencia:
+        raise TranscricaoDivergente(modelo.divergencia)
+    if modelo.proxima < len(modelo.trocas):
+        raise TranscricaoDivergente(
+            f"o agente parou após {modelo.proxima} de {len(modelo.trocas)} idas ao modelo gravadas"
+        )
+    return execucao["metricas"], modelo.sistema_mudou
+
+
+def regressoes(referencia: dict, atual: dict, limites: dict[str, float]) -> list[str]:
+    """Métricas que subiram além do limite relativo (e da folga, no caso do tempo)."""
+    encontradas = []
+    for metrica in METRICAS:
+        teto = referencia[metrica] * (1 + limites[metrica])
+        if metrica == "segundos":
+            teto += FOLGA_SEGUNDOS
+        if atual[metrica] > teto:
+            encontradas.append(metrica)
+    return encontradas
+
+
+# === GRAVAR ===
+
+def cenarios_sinteticos() -> tuple[dict[str, list[str]], object]:
+    """Cenários e modelo simulado (sem latência) de benchmark_plano.py."""
+    from benchmark_plano import CENARIOS, ReActSimulado, tokens_das_tools
+
+    cenarios = {f"sintetico_{nome}": [pedido] for nome, (pedido, _) in CENARIOS.items()}
+    return cenarios, ReActSimulado(0.0, 0.0, tokens_das_tools())
+
+
+def gravar(cenarios: dict[str, list[str]], fonte=None) -> None:
+    """Grava os cenários; com `fonte`, ela responde no lugar dos modelos reais dos níveis."""
+    GRAVADAS.mkdir(parents=True, exist_ok=True)
+    descricao = type(fonte).__name__ if fonte is not None else dict(chatbot.ROTEADOR.modelos)
+    for nome, turnos in cenarios.items():
+        if fonte is not None:
+            with niveis_com(fonte):
+                execucao, gravador = executar_cenario(nome, turnos)
+        else:
+            execucao, gravador = executar_cenario(nome, turnos)
+
+        # Tempo e tokens reais ficam como registro; a referência para
+        # comparação é a primeira reprodução offline, feita logo em seguida
+        usos = [t["resposta"]["data"].get("usage_metadata") or {} for t in gravador.trocas]
+        transcricao = {
+            "cenario": nome,
+            "turnos": turnos,
+            "modelo": descricao,
+            "sintetico": fonte is not None,
+            "gravado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "gravacao": {
+                **execucao["metricas"],
+                "tokens_entrada": sum(u.get("input_tokens", 0) for u in usos),
+                "tokens_saida": sum(u.get("output_tokens", 0) for u in usos),
+            },
+            "respostas": execucao["respostas"],
+            "trocas": gravador.trocas,
+        }
+        transcricao["referencia"], _ = reproduzir_cenario(transcricao)
+        caminho = GRAVADAS / f"{nome}.json"
+        caminho.write_text(json.dumps(transcricao, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"{nome}: {execucao['metricas']['round_trips']} idas ao modelo, "
+              f"{execucao['metricas']['tool_calls']} tool calls -> {caminho}")
+
+
+# === REPRODUZIR ===
+
+def reproduzir(limites: dict[str, float], atualizar: bool = False, apenas: Optional[list[str]] = None) -> bool:
+    """Reproduz todas as transcrições gravadas; retorna True se nenhuma regrediu."""
+    caminhos = sorted(GRAVADAS.glob("*.json"))
+    if apenas:
+        caminhos = [c for c in caminhos if c.stem in apenas]
+    if not caminhos:
+        # Nada reproduzido não é um resultado "ok": o CI passaria sem testar nada
+        print(f"Nenhuma transcrição em {GRAVADAS}; grave com: python transcricoes.py gravar")
+        return False
+
+    print(f"{'cenário':34s} {'idas':>9s} {'tools':>9s} {'tokens prompt':>15s} {'segundos':>15s}  situação")
+    ok = True
+    for caminho in caminhos:
+        transcricao = json.loads(caminho.read_text(encoding="utf-8"))
+        nome, referencia = transcricao["cenario"], transcricao["referencia"]
+        try:
+            atual, sistema_mudou = reproduzir_cenario(transcricao)
+        except TranscricaoDivergente as e:
+            ok = False
+            print(f"{nome:34s} DIVERGIU: {e} (regrave o cenário)")
+            continue
+
+        piores = regressoes(referencia, atual, limites)
+        situacao = "REGREDIU: " + ", ".join(piores) if piores else "ok"
+        if sistema_mudou:
+            situacao += " (system prompt mudou desde a gravação)"
+        ok &= not piores
+        print(f"{nome:34s} "
+              f"{referencia['round_trips']:>3d} -> {atual['round_trips']:<3d}"
+              f"{referencia['tool_calls']:>3d} -> {atual['tool_calls']:<3d}"
+              f"{referencia['tokens_prompt']:>6d} -> {atual['tokens_prompt']:<6d}"
+              f"{referencia['segundos']:>6.3f} -> {atual['segundos']:<6.3f}  {situacao}")
+
+        if atualizar:
+            transcricao["referencia"] = atual
+            caminho.write_text(json.dumps(transcricao, ensure_ascii=False, indent=2), encoding="utf-8")
+    return ok
+
+
+def ler_limites(pares: list[str]) -> dict[str, float]:
+    limites = dict(LIMITES_PADRAO)
+    for par in pares:
+        metrica, _, valor = par.partition("=")
+        if metrica not in limites:
+            raise SystemExit(f"Métrica desconhecida: {metrica} (use {', '.join(METRICAS)})")
+        limites[metrica] = float(valor)
+    return limites
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcrições de referência do chatbot de produtos")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_gravar = sub.add_parser("gravar", help="grava os cenários com o modelo real")
+    p_gravar.add_argument("--cenarios", default=str(CENARIOS_PATH))
+    p_gravar.add_argument("--apenas", nargs="+", help="nomes dos cenários a gravar")
+    p_gravar.add_argument("--sintetico", action="store_true",
+                          help="usa o modelo simulado e os cenários de benchmark_plano.py (sem API)")
+    p_reproduzir = sub.add_parser("reproduzir", help="reproduz offline e compara com a referência")
+    p_reproduzir.add_argument("--limite", action="append", default=[], metavar="METRICA=FRACAO",
+                              help=f"aumento relativo tolerado (padrão: {LIMITES_PADRAO})")
+    p_reproduzir.add_argument("--atualizar", action="store_true",
+                              help="grava as métricas desta execução como nova referência")
+    p_reproduzir.add_argument("--apenas", nargs="+", help="nomes dos cenários a reproduzir")
+    args = parser.parse_args()
+
+    if args.comando == "gravar":
+        fonte = None
+        if args.sintetico:
+            cenarios, fonte = cenarios_sinteticos()
+        else:
+            with open(args.cenarios, encoding="utf-8") as f:
+                cenarios = json.load(f)
+        if args.apenas:
+            cenarios = {nome: cenarios[nome] for nome in args.apenas}
+        gravar(cenarios, fonte)
+    else:
+        if not reproduzir(ler_limites(args.limite), args.atualizar, args.apenas):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# Módulos compartilhados entre os capítulos.
+# Instalado como pacote pelo pyproject.toml (pip install -e . ou uv sync), então
+# os scripts de cada capítulo importam `comum` de qualquer pasta.
@@ -0,0 +1,237 @@
+# /src/comum/contabilidade.py
+# Contabilidade de tokens e latência das chamadas ao modelo: por sessão
+# (thread_id), por nó do grafo, por modelo (e nível do roteador) e por tool
+# cujo resultado entrou no prompt.
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import LLMResult
+from langgraph.config import get_config
+
+SEM_SESSAO = "-"
+SEM_NO = "-"
+
+
+@dataclass
+class Consumo:
+    chamadas: int = 0
+    tokens_entrada: float = 0
+    tokens_saida: float = 0
+    tokens_cache: float = 0
+    segundos: float = 0.0
+
+    def somar(self, entrada: int, saida: int, cache: int, segundos: float, fracao: float = 1.0) -> None:
+        self.chamadas += 1
+        self.tokens_entrada += entrada * fracao
+        self.tokens_saida += saida * fracao
+        self.tokens_cache += cache * fracao
+        self.segundos += segundos * fracao
+
+    @property
+    def tokens(self) -> float:
+        return self.tokens_entrada + self.tokens_saida
+
+    def como_dict(self) -> dict:
+        return {**{k: round(v, 3) for k, v in asdict(self).items()}, "tokens": round(self.tokens, 3)}
+
+
+def tools_do_prompt(mensagens: list[BaseMessage]) -> list[str]:
+    """Nomes das tools cujos resultados (ToolMessages no fim do prompt) alimentam esta chamada."""
+    finais: list[ToolMessage] = []
+    indice = len(mensagens) - 1
+    while indice >= 0 and isinstance(mensagens[indice], ToolMessage):
+        finais.append(mensagens[indice])
+        indice -= 1
+    if not finais:
+        return []
+
+    # Os ToolMessages do tutorial não trazem `name`: vem da tool_call correspondente
+    nomes_por_id: dict[str, str] = {}
+    if indice >= 0 and isinstance(mensagens[indice], AIMessage):
+        nomes_por_id = {chamada["id"]: chamada["name"] for chamada in mensagens[indice].tool_calls}
+    return [m.name or nomes_por_id.get(m.tool_call_id, "?") for m in reversed(finais)]
+
+
+class Contabilidade(BaseCallbackHandler):
+    """Callback que agrega o usage_metadata de cada resposta do modelo.
+
+    A sessão e o nó vêm dos metadados da execução: o LangGraph preenche
+    `thread_id` (do configurable) e `langgraph_node`; fora de grafos use
+    config() para informar os dois. Os tokens de uma chamada que recebeu
+    resultados de tools são divididos igualmente entre essas tools (cada
+    uma conta a chamada inteira em `chamadas`).
+    """
+
+    raise_error = False
+
+    def __init__(self, max_sessoes: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._pendentes: dict[UUID, tuple[float, str, str, str, list[str]]] = {}
+        self.total = Consumo()
+        # LRU: acima de max_sessoes (padrão: $CONTABILIDADE_MAX_SESSOES ou
+        # 10000) a sessão usada há mais tempo é descartada, e com ela o
+        # consumo que o max_tokens_sessao consultaria
+        self.max_sessoes = max_sessoes or int(os.getenv("CONTABILIDADE_MAX_SESSOES", "10000"))
+        self.por_sessao: OrderedDict[str, Consumo] = OrderedDict()
+        self.sessoes_descartadas = 0
+        self.por_no: dict[str, Consumo] = {}
+        # "nível:modelo" do modelo que respondeu (com fallback, o de fato usado)
+        self.por_modelo: dict[str, Consumo] = {}
+        self.por_tool: dict[str, Consumo] = {}
+        self.erros = 0
+        self._exportador: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+
+    def config(self, thread_id: str = SEM_SESSAO, no: str = SEM_NO) -> dict:
+        """Config para invoke fora de um grafo (ex: os loops do capítulo 3)."""
+        return {"callbacks": [self], "metadata": {"thread_id": thread_id, "no": no}}
+
+    # === CALLBACKS ===
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        sessao = str(metadata.get("thread_id") or SEM_SESSAO)
+        no = metadata.get("langgraph_node") or metadata.get("no") or SEM_NO
+        modelo = str(metadata.get("ls_model_name") or (serialized or {}).get("name") or "?")
+        if metadata.get("nivel_roteador"):
+            modelo = f"{metadata['nivel_roteador']}:{modelo}"
+        tools = tools_do_prompt(messages[0]) if messages else []
+        with self._lock:
+            self._pendentes[run_id] = (time.perf_counter(), sessao, no, modelo, tools)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            pendente = self._pendentes.pop(run_id, None)
+        if pendente is None:
+            return
+        inicio, sessao, no, modelo, tools = pendente
+        segundos = time.perf_counter() - inicio
+
+        entrada = saida = cache = 0
+        for geracoes in response.generations:
+            for geracao in geracoes:
+                uso = getattr(getattr(geracao, "message", None), "usage_metadata", None) or {}
+                entrada += uso.get("input_tokens", 0)
+                saida += uso.get("output_tokens", 0)
+                cache += (uso.get("input_token_details") or {}).get("cache_read", 0)
+
+        with self._lock:
+            self.total.somar(entrada, saida, cache, segundos)
+            self.por_sessao.setdefault(sessao, Consumo()).somar(entrada, saida, cache, segundos)
+            self.por_sessao.move_to_end(sessao)
+            while len(self.por_sessao) > self.max_sessoes:
+                self.por_sessao.popitem(last=False)
+                self.sessoes_descartadas += 1
+            self.por_no.setdefault(no, Consumo()).somar(entrada, saida, cache, segundos)
+            self.por_modelo.setdefault(modelo, Consumo()).somar(entrada, saida, cache, segundos)
+            for tool in tools:
+                self.por_tool.setdefault(tool, Consumo()).somar(entrada, saida, cache, segundos, 1 / len(tools))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._pendentes.pop(run_id, None)
+            self.erros += 1
+
+    # === CONSULTA ===
+
+    def tokens_sessao(self, thread_id: Optional[str]) -> int:
+        with self._lock:
+            consumo = self.por_sessao.get(str(thread_id or SEM_SESSAO))
+            return int(consumo.tokens) if consumo else 0
+
+    def encerrar_sessao(self, thread_id: Optional[str]) -> None:
+        """Esquece o consumo de uma sessão que não será mais usada (o total continua)."""
+        with self._lock:
+            self.por_sessao.pop(str(thread_id or SEM_SESSAO), None)
+
+    def tokens_sessao_atual(self) -> int:
+        """Consumo da sessão em execução; só pode ser chamada de dentro de um nó ou roteador do grafo."""
+        return self.tokens_sessao(get_config().get("configurable", {}).get("thread_id"))
+
+    def resumo(self, max_sessoes: int = 20) -> dict:
+        """Totais, por nó, por tool e as `max_sessoes` sessões que mais gastaram."""
+        with self._lock:
+            sessoes = sorted(self.por_sessao.items(), key=lambda item: item[1].tokens, reverse=True)
+            return {
+                "momento": datetime.now().isoformat(timespec="seconds"),
+                "total": self.total.como_dict(),
+                "erros": self.erros,
+                "sessoes": len(self.por_sessao),
+                "sessoes_descartadas": self.sessoes_descartadas,
+                "por_sessao": {k: v.como_dict() for k, v in sessoes[:max_sessoes]},
+                "por_no": {k: v.como_dict() for k, v in self.por_no.items()},
+                "por_modelo": {k: v.como_dict() for k, v in self.por_modelo.items()},
+                "por_tool": {k: v.como_dict() for k, v in self.por_tool.items()},
+            }
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._pendentes.clear()
+            self.total = Consumo()
+            self.por_sessao.clear()
+            self.sessoes_descartadas = 0
+            self.por_no.clear()
+            self.por_modelo.clear()
+            self.por_tool.clear()
+            self.erros = 0
+
+    # === EXPORTAÇÃO ===
+
+    def exportar(self, caminho: Optional[str] = None) -> Optional[str]:
+        """Acrescenta o resumo atual como uma linha JSON (padrão: $CONTABILIDADE_PATH)."""
+        caminho = caminho or os.getenv("CONTABILIDADE_PATH")
+        if not caminho:
+            return None
+        linha = json.dumps(self.resumo(), ensure_ascii=False)
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+        return caminho
+
+    def iniciar_exportacao(self, caminho: Optional[str] = None, intervalo: Optional[float] = None) -> bool:
+        """Exporta o resumo a cada `intervalo` segundos (padrão: $CONTABILIDADE_INTERVALO ou 60)
+        em uma thread de fundo. Retorna False se não houver caminho configurado."""
+        caminho = caminho or os.getenv("CONTABILIDADE_PATH")
+        if not caminho or self._exportador is not None:
+            return False
+        intervalo = intervalo or float(os.getenv("CONTABILIDADE_INTERVALO", "60"))
+
+        def executar():
+            while not self._parar.wait(intervalo):
+                try:
+                    self.exportar(caminho)
+                except OSError as e:
+                    print(f"Aviso: falha ao exportar a contabilidade: {e}")
+
+        self._parar.clear()
+        self._exportador = threading.Thread(target=executar, name="exportar-contabilidade", daemon=True)
+        self._exportador.start()
+        return True
+
+    def parar_exportacao(self, caminho: Optional[str] = None) -> None:
+        """Para a thread de exportação e grava um último resumo."""
+        if self._exportador is not None:
+            self._parar.set()
+            self._exportador.join()
+            self._exportador = None
+        self.exportar(caminho)
+
+
+CONTABILIDADE = Contabilidade()
@@ -0,0 +1,137 @@
+# /src/comum/lote_tools.py
+# Execução de várias chamadas da mesma tool com uma única validação dos argumentos.
+
+from typing import NamedTuple, Optional, Sequence
+
+from langchain_core.callbacks import CallbackManager
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ensure_config, patch_config, set_config_context
+from langchain_core.tools import BaseTool
+from pydantic import ValidationError
+
+from comum.registro_tools import REGISTRO
+
+
+class ResultadoItem(NamedTuple):
+    ok: bool
+    conteudo: str
+
+
+def _erros_por_item(erro: ValidationError) -> dict[int, str]:
+    """Agrupa os erros de validação da lista pelo índice do item."""
+    erros: dict[int, list[str]] = {}
+    for detalhe in erro.errors():
+        indice, *campo = detalhe["loc"]
+        local = ".".join(str(parte) for parte in campo) or "argumentos"
+        erros.setdefault(indice, []).append(f"{local}: {detalhe['msg']}")
+    return {indice: "; ".join(mensagens) for indice, mensagens in erros.items()}
+
+
+def _gerenciador_callbacks(tool: BaseTool, config: RunnableConfig) -> CallbackManager:
+    """Os mesmos callbacks que tool.invoke usaria (os do config e os da tool)."""
+    return CallbackManager.configure(
+        config.get("callbacks"),
+        tool.callbacks,
+        tool.verbose,
+        config.get("tags"),
+        tool.tags,
+        config.get("metadata"),
+        tool.metadata,
+    )
+
+
+def invocar_lote(
+    tool: BaseTool,
+    lista_args: Sequence[dict],
+    config: Optional[RunnableConfig] = None,
+    ids: Optional[Sequence[Optional[str]]] = None,
+) -> list[ResultadoItem]:
+    """Executa `tool` para cada dicionário de argumentos, na ordem recebida.
+
+    Os argumentos são validados juntos por um TypeAdapter(list[args_schema])
+    guardado no registro, e a função da tool é chamada direto com os valores
+    validados (sem refazer a validação do invoke a cada item). Itens inválidos
+    ou que levantam exceção viram ResultadoItem(ok=False, ...) sem interromper os demais.
+
+    Cada item dispara on_tool_start e on_tool_end/on_tool_error como no
+    invoke, com os callbacks de `config` (padrão: o config do nó em execução)
+    e `ids` como tool_call_id.
+    """
+    config = ensure_config(config)
+    ids = list(ids) if ids is not None else [None] * len(lista_args)
+    validador = REGISTRO.validador_lote(tool)
+    if validador is None or tool.func is None:
+        return [_invocar_um(tool, args, config) for args in lista_args]
+
+    erros: dict[int, str] = {}
+    try:
+        validados = validador.validate_python(lista_args)
+    except ValidationError as e:
+        # Segunda passada só com os itens válidos
+        erros = _erros_por_item(e)
+        validos = [args for i, args in enumerate(lista_args) if i not in erros]
+        validados = iter(validador.validate_python(validos))
+
+    campos = tuple(tool.args_schema.model_fields)
+    gerenciador = _gerenciador_callbacks(tool, config)
+    resultados = []
+    for i, args in enumerate(lista_args):
+        execucao = gerenciador.on_tool_start(
+            {"name": tool.name, "description": tool.description},
+            str(args),
+            inputs=args,
+            tool_call_id=ids[i],
+        )
+        if i in erros:
+            execucao.on_tool_error(ValueError(erros[i]), tool_call_id=ids[i])
+            resultados.append(ResultadoItem(False, f"Erro ao executar {tool.name}: {erros[i]}"))
+            continue
+        modelo = next(validados) if erros else validados[i]
+        try:
+            # Config do item como contexto: get_config() na tool e callbacks filhos
+            with set_config_context(patch_config(config, callbacks=execucao.get_child())) as contexto:
+                resultado = contexto.run(tool.func, **{campo: getattr(modelo, campo) for campo in campos})
+        except Exception as e:
+            execucao.on_tool_error(e, tool_call_id=ids[i])
+            resultados.append(ResultadoItem(False, f"Erro ao executar {tool.name}: {e}"))
+            continue
+        execucao.on_tool_end(resultado, name=tool.name)
+        resultados.append(ResultadoItem(True, str(resultado)))
+    return resultados
+
+
+def _invocar_um(tool: BaseTool, args: dict, config: Optional[RunnableConfig] = None) -> ResultadoItem:
+    try:
+        return ResultadoItem(True, str(tool.invoke(args, config)))
+    except Exception as e:
+        return ResultadoItem(False, f"Erro ao executar {tool.name}: {e}")
+
+
+def invocar_tool_calls(
+    tools_por_nome: dict[str, BaseTool],
+    tool_calls: Sequence[dict],
+    config: Optional[RunnableConfig] = None,
+) -> list[str]:
+    """Conteúdo das ToolMessages de uma lista de tool_calls, na mesma ordem.
+
+    Chamadas consecutivas da mesma tool (ex: várias criar_tarefa em uma
+    importação) são executadas em um único lote. Chamadas a tools diferentes
+    não são reordenadas, para preservar os efeitos colaterais na ordem pedida.
+    """
+    conteudos: list[str] = []
+    inicio = 0
+    while inicio < len(tool_calls):
+        nome = tool_calls[inicio]["name"]
+        fim = inicio
+        while fim < len(tool_calls) and tool_calls[fim]["name"] == nome:
+            fim += 1
+
+        tool = tools_por_nome.get(nome)
+        if tool is None:
+            conteudos.extend(f"Erro ao executar {nome}: tool desconhecida" for _ in range(fim - inicio))
+        else:
+            lote = [chamada["args"] for chamada in tool_calls[inicio:fim]]
+            ids = [chamada.get("id") for chamada in tool_calls[inicio:fim]]
+            conteudos.extend(item.conteudo for item in invocar_lote(tool, lote, config, ids))
+        inicio = fim
+    return conteudos
@@ -0,0 +1,160 @@
+# /src/comum/modelos.py
+# Fábrica única de clientes do modelo: configuração lida uma vez do ambiente,
+# instâncias em cache e conexão HTTP compartilhada.
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+# Campos que definem o cliente HTTP (google.genai.Client) por baixo do modelo.
+# Criar o cliente custa ~60 ms; instâncias que diferem só no resto
+# (temperatura, limites, timeout...) são cópias rasas de uma instância base e
+# compartilham o mesmo cliente e o mesmo pool de conexões.
+CAMPOS_CLIENTE = {"google_api_key", "base_url", "api_version", "additional_headers", "client_args", "credentials"}
+
+
+@dataclass(frozen=True)
+class ConfigModelos:
+    timeout: Optional[float]
+    max_retries: Optional[int]
+    aquecer: bool
+
+    @classmethod
+    def do_ambiente(cls) -> "ConfigModelos":
+        """GOOGLE_TIMEOUT, GOOGLE_MAX_RETRIES e GOOGLE_AQUECER=1 para aquecer a
+        conexão ao criar. O nome do modelo é lido por chamada (ver nome_modelo)."""
+        load_dotenv()
+        timeout = os.getenv("GOOGLE_TIMEOUT")
+        max_retries = os.getenv("GOOGLE_MAX_RETRIES")
+        return cls(
+            timeout=float(timeout) if timeout else 30.0,
+            max_retries=int(max_retries) if max_retries else 3,
+            aquecer=os.getenv("GOOGLE_AQUECER", "0") == "1",
+        )
+
+
+CONFIG = ConfigModelos.do_ambiente()
+
+_lock = threading.Lock()
+_instancias: dict[tuple, ChatGoogleGenerativeAI] = {}
+# Uma instância "base" por (modelo, campos do cliente): dona do cliente HTTP
+_bases: dict[tuple, ChatGoogleGenerativeAI] = {}
+ESTATISTICAS = {"clientes_criados": 0, "instancias": 0, "reaproveitados": 0}
+
+
+def _congelar(valor):
+    if isinstance(valor, dict):
+        return tuple(sorted((chave, _congelar(v)) for chave, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def nome_modelo(padrao: str, variavel: str = "GOOGLE_MODEL", modelo: Optional[str] = None) -> str:
+    """`modelo`, se dado; senão a variável de ambiente do módulo; senão `padrao`.
+
+    Cada módulo mantém a própria variável (os de ch01/ch02 leem google_model,
+    os de ch03 em diante GOOGLE_MODEL), então definir uma não troca o modelo
+    dos outros.
+    """
+    return modelo or os.getenv(variavel) or padrao
+
+
+def obter_modelo(
+    padrao: str = "gemini-2.5-flash-lite",
+    temperature: Optional[float] = None,
+    modelo: Optional[str] = None,
+    variavel: str = "GOOGLE_MODEL",
+    **opcoes,
+) -> ChatGoogleGenerativeAI:
+    """Cliente do modelo em cache por (modelo, temperatura, opções).
+
+    Args:
+        padrao: Modelo usado quando nem `modelo` nem a variável `variavel` estão definidos.
+        temperature: Temperatura (None = padrão do provedor).
+        modelo: Força um modelo específico, ignorando o ambiente.
+        variavel: Variável de ambiente com o nome do modelo.
+        **opcoes: Demais parâmetros do ChatGoogleGenerativeAI (max_output_tokens, timeout...).
+    """
+    nome = nome_modelo(padrao, variavel, modelo)
+    opcoes.setdefault("timeout", CONFIG.timeout)
+    opcoes.setdefault("max_retries", CONFIG.max_retries)
+    if temperature is not None:
+        opcoes["temperature"] = temperature
+
+    chave = (nome, _congelar(opcoes))
+    with _lock:
+        instancia = _instancias.get(chave)
+        if instancia is not None:
+            ESTATISTICAS["reaproveitados"] += 1
+            return instancia
+
+        _validar_geracao(opcoes)
+        do_cliente = {k: v for k, v in opcoes.items() if k in CAMPOS_CLIENTE}
+        chave_base = (nome, _congelar(do_cliente))
+        base = _bases.get(chave_base)
+        nova_base = base is None
+        if nova_base:
+            # Só o modelo e o cliente: os demais campos ficam nos padrões do provedor
+            base = ChatGoogleGenerativeAI(model=nome, **do_cliente)
+            _bases[chave_base] = base
+            ESTATISTICAS["clientes_criados"] += 1
+
+        # Cópia rasa: compartilha o google.genai.Client (e o pool HTTP) da base
+        instancia = base.model_copy(update={k: v for k, v in opcoes.items() if k not in CAMPOS_CLIENTE})
+        _instancias[chave] = instancia
+        ESTATISTICAS["instancias"] += 1
+
+    if CONFIG.aquecer and nova_base:
+        aquecer(instancia)
+    return instancia
+
+
+def _validar_geracao(opcoes: dict) -> None:
+    """As validações do construtor que a cópia não refaz."""
+    temperatura = opcoes.get("temperature")
+    if temperatura is not None and not 0 <= temperatura <= 2.0:
+        raise ValueError("temperature must be in the range [0.0, 2.0]")
+    top_p = opcoes.get("top_p")
+    if top_p is not None and not 0 <= top_p <= 1:
+        raise ValueError("top_p must be in the range [0.0, 1.0]")
+    top_k = opcoes.get("top_k")
+    if top_k is not None and top_k <= 0:
+        raise ValueError("top_k must be positive")
+    desconhecidas = set(opcoes) - set(ChatGoogleGenerativeAI.model_fields)
+    if desconhecidas:
+        raise ValueError(f"opções desconhecidas: {sorted(desconhecidas)}")
+
+
+def aquecer(instancia: ChatGoogleGenerativeAI, em_segundo_plano: bool = True):
+    """Abre a conexão (DNS + TCP + TLS) antes da primeira pergunta.
+
+    Faz uma consulta de metadados do modelo, que não gera tokens. Em segundo
+    plano devolve a thread; senão, os segundos gastos.
+    """
+
+    def executar() -> float:
+        inicio = time.perf_counter()
+        try:
+            instancia.client.models.get(model=instancia.model)
+        except Exception as e:
+            print(f"Aviso: aquecimento da conexão falhou: {e}")
+        return time.perf_counter() - inicio
+
+    if not em_segundo_plano:
+        return executar()
+    thread = threading.Thread(target=executar, name="aquecer-modelo", daemon=True)
+    thread.start()
+    return thread
+
+
+def limpar_cache() -> None:
+    """Descarta as instâncias em cache (os clientes são fechados quando coletados)."""
+    with _lock:
+        _instancias.clear()
+        _bases.clear()
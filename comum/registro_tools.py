@@ -0,0 +1,118 @@
+# /src/comum/registro_tools.py
+# Registro de tools do processo: schemas calculados uma vez e modelos com
+# tools vinculadas reaproveitados entre módulos e agentes.
+
+import threading
+import time
+from typing import Optional, Sequence
+
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, TypeAdapter
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+class RegistroTools:
+    """Cache de schemas por tool e de `bind_tools` por (modelo, conjunto de tools).
+
+    Tools (StructuredTool) não são hasheáveis, então as chaves usam id() e o
+    registro guarda uma referência a cada objeto para que o id não seja reutilizado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: dict[int, BaseTool] = {}
+        self._schemas: dict[int, dict] = {}
+        self._validadores: dict[int, Optional[TypeAdapter]] = {}
+        self._vinculados: dict[tuple, object] = {}
+        self._referencias: list[object] = []
+        self.estatisticas = {
+            "schemas_gerados": 0,
+            "schemas_reaproveitados": 0,
+            "vinculos_criados": 0,
+            "vinculos_reaproveitados": 0,
+            "segundos_gerando": 0.0,
+        }
+
+    def schema(self, tool: BaseTool) -> dict:
+        """Schema da tool no formato aceito pelos provedores (OpenAI/Gemini)."""
+        chave = id(tool)
+        with self._lock:
+            if chave in self._schemas:
+                self.estatisticas["schemas_reaproveitados"] += 1
+                return self._schemas[chave]
+
+        inicio = time.perf_counter()
+        schema = convert_to_openai_tool(tool)
+        duracao = time.perf_counter() - inicio
+
+        with self._lock:
+            self._tools[chave] = tool
+            self._schemas[chave] = schema
+            self.estatisticas["schemas_gerados"] += 1
+            self.estatisticas["segundos_gerando"] += duracao
+        return schema
+
+    def validador_lote(self, tool: BaseTool) -> Optional[TypeAdapter]:
+        """TypeAdapter que valida uma lista de argumentos da tool de uma vez.
+
+        None quando a tool não tem um modelo Pydantic como args_schema (nesse
+        caso o lote cai no invoke item a item).
+        """
+        chave = id(tool)
+        with self._lock:
+            if chave in self._validadores:
+                return self._validadores[chave]
+
+        schema = tool.args_schema
+        validador = None
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            validador = TypeAdapter(list[schema])
+
+        with self._lock:
+            self._tools[chave] = tool
+            return self._validadores.setdefault(chave, validador)
+
+    def por_nome(self, tools: Sequence[BaseTool]) -> dict[str, BaseTool]:
+        for t in tools:
+            self.schema(t)
+        return {t.name: t for t in tools}
+
+    def vincular(self, modelo, tools: Sequence[BaseTool]):
+        """Equivalente a `modelo.bind_tools(tools)`, reaproveitando o resultado."""
+        chave = (id(modelo), tuple(id(t) for t in tools))
+        with self._lock:
+            if chave in self._vinculados:
+                self.estatisticas["vinculos_reaproveitados"] += 1
+                return self._vinculados[chave]
+
+        inicio = time.perf_counter()
+        vinculado = modelo.bind_tools([self.schema(t) for t in tools])
+        duracao = time.perf_counter() - inicio
+
+        with self._lock:
+            vinculado = self._vinculados.setdefault(chave, vinculado)
+            self._referencias.append(modelo)
+            self.estatisticas["vinculos_criados"] += 1
+            self.estatisticas["segundos_gerando"] += duracao
+        return vinculado
+
+    def resumo(self) -> dict:
+        """Estatísticas com a estimativa de tempo economizado pelos reaproveitamentos."""
+        with self._lock:
+            resumo = dict(self.estatisticas)
+        gerados = resumo["schemas_gerados"] + resumo["vinculos_criados"]
+        reaproveitados = resumo["schemas_reaproveitados"] + resumo["vinculos_reaproveitados"]
+        custo_medio = resumo["segundos_gerando"] / gerados if gerados else 0.0
+        resumo["segundos_economizados_estimados"] = custo_medio * reaproveitados
+        return resumo
+
+
+REGISTRO = RegistroTools()
+
+
+def vincular_tools(modelo, tools: Sequence[BaseTool]):
+    return REGISTRO.vincular(modelo, tools)
+
+
+def tools_por_nome(tools: Sequence[BaseTool]) -> dict[str, BaseTool]:
+    return REGISTRO.por_nome(tools)
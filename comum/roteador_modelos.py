@@ -0,0 +1,294 @@
+# /src/comum/roteador_modelos.py
+# Escolha do modelo por turno: pedidos simples vão para o nível leve (mais
+# rápido e barato), pedidos com vários passos ou ambíguos para o forte. A
+# decisão usa só características baratas do pedido e do histórico, sem outra
+# ida ao modelo. Em timeout ou erro a chamada cai para o outro nível, e a
+# latência de cada nível (média e p95) fica registrada para calibrar o limiar
+# e os timeouts.
+#
+# Sem ROTEADOR_MODELO_*, o nível padrão do agente usa o modelo configurado
+# para o módulo (GOOGLE_MODEL ou o padrão dele) e o outro nível, o padrão de
+# MODELOS_PADRAO.
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.runnables.config import ensure_config
+
+from comum.modelos import nome_modelo, obter_modelo
+
+NIVEIS = ("leve", "forte")
+MODELOS_PADRAO = {"leve": "gemini-2.5-flash-lite", "forte": "gemini-2.5-flash"}
+
+# Sequência de ações no mesmo pedido ("crie ... e depois liste ...")
+CONECTORES = re.compile(r"\b(?:e depois|depois|em seguida|então|também|além disso|por fim)\b|;", re.IGNORECASE)
+# Referências que só o histórico resolve ("aumente o estoque dele")
+REFERENCIAS = re.compile(
+    r"\b(?:ele|ela|eles|elas|dele|dela|deles|delas|esse|essa|esses|essas|isso|"
+    r"aquele|aquela|aquilo|mesmo|mesma|último|última|anterior)\b",
+    re.IGNORECASE,
+)
+# Radicais de verbos de ação; cada radical distinto conta como uma operação pedida
+ACOES = re.compile(
+    r"\b(cri|cadastr|list|mostr|atualiz|exclu|remov|apag|registr|ajust|vend|"
+    r"calcul|some|conclu|marqu|adicion|aument|diminu)\w*",
+    re.IGNORECASE,
+)
+NUMEROS = re.compile(r"\d+(?:[.,]\d+)?")
+PREFIXOS_FALHA = ("Erro", "Não executado")
+
+
+@dataclass(frozen=True)
+class ConfigRoteador:
+    """Níveis, limiar e timeouts do roteamento."""
+    # Desativado, todo turno usa o nível padrão do agente (fallback e métricas continuam)
+    ativo: bool = True
+    # Pontuação a partir da qual o turno vai para o nível forte
+    limiar: float = 2.0
+    # None: ver criar_roteador
+    modelo_leve: Optional[str] = None
+    modelo_forte: Optional[str] = None
+    timeout_leve: float = 15.0
+    timeout_forte: float = 30.0
+    # Tentativas do cliente antes de cair para o outro nível
+    max_retries: int = 1
+    # Chamadas mais recentes por nível usadas no p95
+    janela: int = 1000
+
+    @classmethod
+    def do_ambiente(cls) -> "ConfigRoteador":
+        """Lê as variáveis ROTEADOR_*, usando os padrões se ausentes."""
+        return cls(
+            ativo=os.getenv("ROTEADOR_ATIVO", "1") == "1",
+            limiar=float(os.getenv("ROTEADOR_LIMIAR", cls.limiar)),
+            modelo_leve=os.getenv("ROTEADOR_MODELO_LEVE") or None,
+            modelo_forte=os.getenv("ROTEADOR_MODELO_FORTE") or None,
+            timeout_leve=float(os.getenv("ROTEADOR_TIMEOUT_LEVE", cls.timeout_leve)),
+            timeout_forte=float(os.getenv("ROTEADOR_TIMEOUT_FORTE", cls.timeout_forte)),
+            max_retries=int(os.getenv("ROTEADOR_MAX_RETRIES", cls.max_retries)),
+            janela=int(os.getenv("ROTEADOR_JANELA", cls.janela)),
+        )
+
+    def modelo(self, nivel: str) -> Optional[str]:
+        return self.modelo_leve if nivel == "leve" else self.modelo_forte
+
+    def timeout(self, nivel: str) -> float:
+        return self.timeout_leve if nivel == "leve" else self.timeout_forte
+
+
+# === CARACTERÍSTICAS DO TURNO ===
+
+def caracteristicas(messages: list[BaseMessage]) -> dict[str, int]:
+    """Características do pedido atual (última mensagem do usuário) e do turno até aqui."""
+    inicio = len(messages) - 1
+    while inicio >= 0 and not isinstance(messages[inicio], HumanMessage):
+        inicio -= 1
+    pedido = str(messages[inicio].content) if inicio >= 0 else ""
+    turno = messages[inicio + 1:]
+
+    return {
+        "palavras": len(pedido.split()),
+        "acoes": len({radical.lower() for radical in ACOES.findall(pedido)}),
+        "conectores": len(CONECTORES.findall(pedido)),
+        "numeros": len(NUMEROS.findall(pedido)),
+        # Só contam se houver conversa anterior para resolver a referência
+        "referencias": len(REFERENCIAS.findall(pedido)) if inicio > 1 else 0,
+        "rodadas_tools": sum(1 for m in turno if isinstance(m, AIMessage) and m.tool_calls),
+        "falhas": sum(1 for m in turno if isinstance(m, ToolMessage) and str(m.content).startswith(PREFIXOS_FALHA)),
+    }
+
+
+def pontuar(c: dict[str, int]) -> float:
+    """Quanto maior, mais o turno parece precisar do nível forte."""
+    pontos = 0.0
+    pontos += c["palavras"] > 25                    # pedido longo
+    pontos += 2 * (c["acoes"] > 1)                  # mais de uma operação: vários passos
+    pontos += min(c["conectores"], 2)               # várias ações encadeadas
+    pontos += c["numeros"] >= 4                     # muitos valores para distribuir entre tools
+    pontos += c["referencias"] > 0                  # ambíguo sem o histórico
+    pontos += max(c["rodadas_tools"] - 1, 0)        # o laço de tools está ficando longo
+    pontos += 2 * (c["falhas"] > 0)                 # uma tool falhou neste turno
+    return pontos
+
+
+# === MÉTRICAS ===
+
+def _p95(valores) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(0.95 * len(ordenados)))]
+
+
+class MetricasRoteador:
+    """Escolhas, fallbacks e latência por nível (janela das chamadas mais recentes)."""
+
+    def __init__(self, janela: int = 1000):
+        self._lock = threading.Lock()
+        self.janela = janela
+        self.escolhas: dict[str, int] = {}
+        self.chamadas: dict[str, int] = {}
+        self.erros: dict[str, int] = {}
+        self.fallbacks: dict[str, int] = {}
+        # Tokens das respostas por nível que efetivamente respondeu
+        self.tokens: dict[str, int] = {}
+        # nível -> tipo da exceção -> ocorrências, e a mensagem da mais recente
+        self.erros_por_tipo: dict[str, dict[str, int]] = {}
+        self.ultimo_erro: dict[str, str] = {}
+        self.latencias: dict[str, deque] = {}
+        # pontuação -> nível -> turnos, para ver onde o limiar está cortando
+        self.por_pontuacao: dict[float, dict[str, int]] = {}
+
+    def registrar_escolha(self, nivel: str, pontos: float) -> None:
+        with self._lock:
+            self.escolhas[nivel] = self.escolhas.get(nivel, 0) + 1
+            contagem = self.por_pontuacao.setdefault(pontos, {})
+            contagem[nivel] = contagem.get(nivel, 0) + 1
+
+    def registrar_chamada(
+        self, nivel: str, segundos: float, ok: bool, fallback: bool = False,
+        erro: Optional[Exception] = None, tokens: int = 0,
+    ) -> None:
+        with self._lock:
+            self.chamadas[nivel] = self.chamadas.get(nivel, 0) + 1
+            self.tokens[nivel] = self.tokens.get(nivel, 0) + tokens
+            if not ok:
+                self.erros[nivel] = self.erros.get(nivel, 0) + 1
+            if erro is not None:
+                tipos = self.erros_por_tipo.setdefault(nivel, {})
+                tipos[type(erro).__name__] = tipos.get(type(erro).__name__, 0) + 1
+                self.ultimo_erro[nivel] = f"{type(erro).__name__}: {erro}"
+            if fallback:
+                self.fallbacks[nivel] = self.fallbacks.get(nivel, 0) + 1
+            # Só as que deram certo: o p95 serve para calibrar os timeouts
+            if ok:
+                self.latencias.setdefault(nivel, deque(maxlen=self.janela)).append(segundos)
+
+    def resumo(self) -> dict:
+        with self._lock:
+            niveis = {}
+            for nivel in self.chamadas:
+                latencias = self.latencias.get(nivel) or [0.0]
+                niveis[nivel] = {
+                    "chamadas": self.chamadas.get(nivel, 0),
+                    "erros": self.erros.get(nivel, 0),
+                    "erros_por_tipo": dict(self.erros_por_tipo.get(nivel, {})),
+                    "ultimo_erro": self.ultimo_erro.get(nivel),
+                    "fallbacks_recebidos": self.fallbacks.get(nivel, 0),
+                    "tokens": self.tokens.get(nivel, 0),
+                    "latencia_media_s": sum(latencias) / len(latencias),
+                    "latencia_p95_s": _p95(latencias),
+                }
+            return {
+                "escolhas": dict(self.escolhas),
+                "niveis": niveis,
+                "por_pontuacao": {str(p): dict(c) for p, c in sorted(self.por_pontuacao.items())},
+            }
+
+    def exportar(self, caminho: Optional[str] = None) -> Optional[str]:
+        """Grava o resumo em JSON (por padrão em $ROTEADOR_METRICAS_PATH, se definida)."""
+        caminho = caminho or os.getenv("ROTEADOR_METRICAS_PATH")
+        if not caminho:
+            return None
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.resumo(), f, ensure_ascii=False, indent=2)
+        return caminho
+
+
+# === ROTEADOR ===
+
+class RoteadorModelos:
+    """Substitui o modelo do agente: escolhe o nível a cada chamada e cai para o
+    outro em caso de erro (inclusive o timeout do cliente).
+
+    A escolha depende só do pedido e do que já aconteceu no turno, então as
+    idas seguintes do mesmo turno ficam no mesmo nível, a não ser que o laço
+    de tools se alongue ou uma tool falhe, e aí o turno sobe para o forte.
+    """
+
+    def __init__(self, niveis: dict, config: ConfigRoteador, padrao: str = "forte",
+                 modelos: Optional[dict[str, str]] = None):
+        self.niveis = niveis
+        self.config = config
+        self.padrao = padrao
+        # nível -> nome do modelo, para relatórios e transcrições
+        self.modelos = modelos or {}
+        self.metricas = MetricasRoteador(config.janela)
+
+    def escolher(self, messages: list[BaseMessage]) -> tuple[str, float]:
+        if not self.config.ativo:
+            return self.padrao, 0.0
+        pontos = pontuar(caracteristicas(messages))
+        return ("forte" if pontos >= self.config.limiar else "leve"), pontos
+
+    def invoke(self, messages, config=None, **kwargs):
+        nivel, pontos = self.escolher(messages)
+        self.metricas.registrar_escolha(nivel, pontos)
+        # Config do nó em execução (callbacks, thread_id, nó) mais o nível
+        config = ensure_config(config)
+
+        ordem = [nivel] + [n for n in NIVEIS if n != nivel and n in self.niveis]
+        for tentativa, nome in enumerate(ordem):
+            inicio = time.perf_counter()
+            # O nível que de fato responde vai nos metadados da execução (a
+            # contabilidade soma por nível) e na resposta (response_metadata)
+            config_nivel = {**config, "metadata": {**config.get("metadata", {}), "nivel_roteador": nome}}
+            try:
+                resposta = self.niveis[nome].invoke(messages, config_nivel, **kwargs)
+            except Exception as e:
+                # A queda para o outro nível aparece nas métricas (erros_por_tipo,
+                # ultimo_erro e fallbacks_recebidos do nível seguinte)
+                self.metricas.registrar_chamada(nome, time.perf_counter() - inicio, ok=False, erro=e)
+                if tentativa == len(ordem) - 1:
+                    raise
+                continue
+            uso = getattr(resposta, "usage_metadata", None) or {}
+            self.metricas.registrar_chamada(
+                nome, time.perf_counter() - inicio, ok=True, fallback=tentativa > 0,
+                tokens=uso.get("total_tokens", 0),
+            )
+            if isinstance(getattr(resposta, "response_metadata", None), dict):
+                resposta.response_metadata["nivel_roteador"] = nome
+            return resposta
+
+
+def criar_roteador(
+    padrao: str = "forte",
+    preparar: Callable = lambda modelo: modelo,
+    config: Optional[ConfigRoteador] = None,
+    **opcoes,
+) -> RoteadorModelos:
+    """Roteador com um modelo por nível, vindos da fábrica (comum/modelos.py).
+
+    Args:
+        padrao: Nível usado quando o roteamento está desativado.
+        preparar: Aplicado a cada modelo (ex: vincular as tools e os callbacks).
+        config: Padrão: lida das variáveis ROTEADOR_*.
+        **opcoes: Demais parâmetros dos modelos (temperature...).
+
+    O modelo de cada nível vem de ROTEADOR_MODELO_LEVE/FORTE; sem elas, o
+    nível `padrao` usa GOOGLE_MODEL (como o modelo do módulo) e o outro,
+    MODELOS_PADRAO.
+    """
+    config = config or ConfigRoteador.do_ambiente()
+    modelos = {
+        nivel: config.modelo(nivel) or (nome_modelo(MODELOS_PADRAO[nivel]) if nivel == padrao else MODELOS_PADRAO[nivel])
+        for nivel in NIVEIS
+    }
+    niveis = {
+        nivel: preparar(obter_modelo(
+            modelo=modelos[nivel],
+            timeout=config.timeout(nivel),
+            max_retries=config.max_retries,
+            **opcoes,
+        ))
+        for nivel in NIVEIS
+    }
+    return RoteadorModelos(niveis, config, padrao, modelos)